@@ -1,6 +1,7 @@
 import glfw
 import sys
 from OpenGL.GL import *
+from pyglutils import ShaderUtils
 
 class Main:
     """ GLSL sample:
@@ -157,7 +158,7 @@ class Main:
     def run(self):
         self.loop()
         if bool(glDeleteProgram):
-            glDeleteProgram(self.shader_program) 
+            ShaderUtils.delete_program(self.shader_program) 
         glfw.destroy_window(self.window)
         glfw.terminate()
         glfw.set_error_callback(None)
\ No newline at end of file
@@ -55,8 +55,10 @@ class Main:
 
         self.create_buffers()
         
-        self.shader_program = ShaderUtils.load_program_directory(PATH+"shaders/lvl1basic/p01start/p06depthbuffer/start")
-        self.shader_program2 = ShaderUtils.load_program_directory(PATH+"shaders/lvl1basic/p01start/p06depthbuffer/start2")
+        # both programs are compiled by the driver at once, wait for them before the first use
+        programs = [ShaderUtils.load_program_directory_async(PATH+"shaders/lvl1basic/p01start/p06depthbuffer/start"),
+                    ShaderUtils.load_program_directory_async(PATH+"shaders/lvl1basic/p01start/p06depthbuffer/start2")]
+        self.shader_program, self.shader_program2 = ShaderUtils.wait_programs(programs)
         
         # Shader program set
         glUseProgram(self.shader_program)
@@ -149,7 +151,7 @@ class Main:
     def run(self):
         self.loop()
         if bool(glDeleteProgram):
-            glDeleteProgram(self.shader_program) 
+            ShaderUtils.delete_program(self.shader_program) 
         glfw.destroy_window(self.window)
         glfw.terminate()
         glfw.set_error_callback(None)
\ No newline at end of file
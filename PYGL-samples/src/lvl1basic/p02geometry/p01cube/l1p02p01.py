@@ -1,4 +1,4 @@
-from transforms.Camera import Camera
+from transforms.CameraController import CameraController
 from transforms import Mat4PerspRH
 from pyglutils import ShaderUtils, OGLUtils, OGLTextRenderer, OGLBuffers
 from OpenGL.GL import *
@@ -29,7 +29,7 @@ class Main:
         self.render_line = False
         self.render_front = False
         self.render_back = False
-        self.cam = Camera()
+        self.cam = CameraController()
         self.proj = Mat4PerspRH(math.pi / 4, 1, 0.01, 1000.0)
 
         # Initialize GLFW. Most GLFW functions will not work before doing this.
@@ -232,7 +232,7 @@ class Main:
             # set the current shader to be used
             glUseProgram(self.shader_program) 
             
-            glUniformMatrix4fv(self.loc_mat, 1, False, self.cam.view.mul_mat4(self.proj).to_4x4array())
+            ShaderUtils.uniform_mat4(self.loc_mat, self.cam.view.mul_mat4(self.proj))
             
             # bind and draw
             self.buffers.draw(GL_TRIANGLES, self.shader_program)
@@ -249,7 +249,7 @@ class Main:
     def run(self):
         self.loop()
         if bool(glDeleteProgram):
-            glDeleteProgram(self.shader_program) 
+            ShaderUtils.delete_program(self.shader_program) 
         glfw.destroy_window(self.window)
         glfw.terminate()
         glfw.set_error_callback(None)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from transforms.Camera import Camera
+from transforms.CameraController import CameraController
 from transforms import Mat4PerspRH
 from pyglutils import ShaderUtils, OGLUtils, OGLTextRenderer, OGLBuffers
 from OpenGL.GL import *
@@ -27,7 +27,7 @@ class Main:
         self.render_line = False
         self.mode = 0
 
-        self.cam = Camera()
+        self.cam = CameraController()
         self.proj = Mat4PerspRH(math.pi / 4, 1, 0.01, 1000.0)
 
         # Initialize GLFW. Most GLFW functions will not work before doing this.
@@ -191,7 +191,7 @@ class Main:
             # set the current shader to be used
             glUseProgram(self.shader_program)
 
-            glUniformMatrix4fv(self.loc_mat, 1, False, self.cam.view.mul_mat4(self.proj).to_4x4array())
+            ShaderUtils.uniform_mat4(self.loc_mat, self.cam.view.mul_mat4(self.proj))
 
             text = __name__ + ": [LMB] self.camera, WSAD"
 
@@ -264,7 +264,7 @@ class Main:
     def run(self):
         self.loop()
         if bool(glDeleteProgram):
-            glDeleteProgram(self.shader_program) 
+            ShaderUtils.delete_program(self.shader_program) 
         glfw.destroy_window(self.window)
         glfw.terminate()
         glfw.set_error_callback(None)
@@ -1,5 +1,6 @@
-from transforms.Camera import Camera
-from transforms import Mat4PerspRH, Mat4
+from transforms.CameraController import CameraController
+from transforms import Mat4PerspRH, Mat4, Frustum
+from transforms.BVH import screen_ray
 from pyglutils import ShaderUtils, OGLUtils, OGLTextRenderer, OGLModelOBJ
 from OpenGL.GL import *
 import math
@@ -25,7 +26,7 @@ class Main:
         self.oy = 0
         
         self.render_line = True
-        self.cam = Camera()
+        self.cam = CameraController()
         self.proj = Mat4PerspRH(math.pi / 4, self.height / self.width, 0.01, 1000.0)
         self.swapYZ = Mat4().from_raw_rows(
                 (1, 0, 0, 0),
@@ -74,12 +75,16 @@ class Main:
         #self.shader_program = ShaderUtils.loadProgram("/lvl1basic/p02geometry/p03obj/teapot")
                 
         # obj files are in  /res/obj/...
-        self.model = OGLModelOBJ(PATH+"res/obj/ducky.obj")
+        self.model = OGLModelOBJ(PATH+"res/obj/ducky.obj", indexed = True)
         #model = new OGLModelOBJ(PATH+"res/obj/teapot.obj")
         #model= new ModelOBJ(PATH+"res/obj/ElephantBody.obj")
         #model= new ModelOBJ(PATH+"res/obj/TexturedCube.obj")
 
         self.buffers = self.model.get_buffers()
+        self.frustum = Frustum()
+        # ray picking of the model triangles, the hierarchy is cached next to the model file
+        self.bvh = self.model.get_bvh()
+        self.picked = None
 
         glClearColor(0.2, 0.2, 0.2, 1.0)
 
@@ -131,6 +136,12 @@ class Main:
             self.mouse_button1 = True
             self.ox, self.oy = glfw.get_cursor_pos(window)
         
+        if button==glfw.MOUSE_BUTTON_2 and action == glfw.PRESS and self.bvh is not None:
+            x, y = glfw.get_cursor_pos(window)
+            # ray in the model space, the matrix is the same as in the shader
+            ray = screen_ray(x, y, self.width, self.height, self.swapYZ.mul_mat4(self.cam.view).mul_mat4(self.proj))
+            self.picked = self.bvh.intersect_ray(ray)
+
         if button==glfw.MOUSE_BUTTON_1 and action == glfw.RELEASE:
             self.mouse_button1 = False
             x,y = glfw.get_cursor_pos(window)
@@ -170,10 +181,18 @@ class Main:
             # set the current shader to be used
             glUseProgram(self.shader_program) 
             
-            glUniformMatrix4fv(self.loc_mat, 1, False, self.swapYZ.mul_mat4(self.cam.view).mul_mat4(self.proj).to_4x4array())
-
-            # bind and draw
-            self.buffers.draw(self.model.get_topology(), self.shader_program)
+            view_proj = self.cam.view.mul_mat4(self.proj)
+            ShaderUtils.uniform_mat4(self.loc_mat, self.swapYZ.mul_mat4(view_proj))
+
+            # skip the model when its bounding box is outside the view frustum
+            self.frustum.reset_stats()
+            self.frustum.update(view_proj)
+            if self.frustum.test_boxes(self.model.get_aabb().transform(self.swapYZ))[0]:
+                # bind and draw
+                self.buffers.draw(self.model.get_topology(), self.shader_program)
+            text += ", " + self.frustum.stats_string()
+            if self.picked is not None:
+                text += f", [RMB] picked triangle {self.picked[1]}"
         
             self.text_renderer.add_str2d(3, 20, text)
             self.text_renderer.add_str2d(self.width-90, self.height-3, " (c) PGRF UHK")
@@ -189,7 +208,7 @@ class Main:
     def run(self):
         self.loop()
         if bool(glDeleteProgram):
-            glDeleteProgram(self.shader_program) 
+            ShaderUtils.delete_program(self.shader_program) 
         glfw.destroy_window(self.window)
         glfw.terminate()
         glfw.set_error_callback(None)
\ No newline at end of file
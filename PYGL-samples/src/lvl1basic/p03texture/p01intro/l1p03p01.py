@@ -1,4 +1,4 @@
-from transforms.Camera import Camera
+from transforms.CameraController import CameraController
 from transforms import Mat4PerspRH, Mat4Scale
 from pyglutils import ShaderUtils, OGLUtils, OGLRenderTarget, OGLTexture2D, OGLTextRenderer, OGLBuffers
 from OpenGL.GL import *
@@ -29,7 +29,7 @@ class Main:
         self.depth_test = True
         self.cCW = True
         self.render_line = False
-        self.cam = Camera()
+        self.cam = CameraController()
         self.proj = Mat4PerspRH(math.pi / 4, 1, 0.01, 1000.0)
     
 
@@ -228,7 +228,7 @@ class Main:
             glUseProgram(self.shader_program) 
             
             glBindTexture(GL_TEXTURE_2D, self.id)
-            glUniformMatrix4fv(self.loc_mat, 1, False, self.cam.view.mul_mat4(self.proj).to_4x4array())
+            ShaderUtils.uniform_mat4(self.loc_mat, self.cam.view.mul_mat4(self.proj))
             
             # bind and draw
             self.buffers.draw(GL_TRIANGLES, self.shader_program)
@@ -247,7 +247,7 @@ class Main:
     def run(self):
         self.loop()
         if bool(glDeleteProgram):
-            glDeleteProgram(self.shader_program) 
+            ShaderUtils.delete_program(self.shader_program) 
         glfw.destroy_window(self.window)
         glfw.terminate()
         glfw.set_error_callback(None)
@@ -1,6 +1,7 @@
-from transforms.Camera import Camera
+from transforms.CameraController import CameraController
 from transforms import Mat4PerspRH
-from pyglutils import ShaderUtils, OGLUtils, OGLTexture2D, OGLTextRenderer, OGLBuffers
+from pyglutils import ShaderUtils, OGLUtils, OGLTexture2D, OGLTextRenderer, OGLBuffers, OGLTextureLoader
+from pyglutils.OGLTexture2D import MIPMAPS_BOX
 from OpenGL.GL import *
 import math
 import sys
@@ -28,7 +29,7 @@ class Main:
         self.depth_test = True
         self.cCW = True
         self.render_line = False
-        self.cam = Camera()
+        self.cam = CameraController()
         self.proj = Mat4PerspRH(math.pi / 4, 1, 0.01, 1000.0)
     
 
@@ -65,6 +66,11 @@ class Main:
         
         glClearColor(0.2, 0.2, 0.2, 1.0)
 
+        # images are decoded in the background while buffers and shaders are created
+        # the plane is seen at grazing angles, so textures get mip levels and anisotropic filtering
+        texture_loader = OGLTextureLoader(mipmaps = MIPMAPS_BOX, anisotropy = 8)
+        texture_loader.load_all([PATH+"res/textures/mosaic.jpg", PATH+"res/textures/testTexture.jpg"])
+
         self.create_buffers()
         
         self.shader_program = ShaderUtils.load_program_directory(PATH+"shaders/lvl1basic/p03texture/p03multiple/texture")
@@ -74,9 +80,10 @@ class Main:
         self.loc_mat = glGetUniformLocation(self.shader_program, "mat")
         self.loc_height = glGetUniformLocation(self.shader_program, "height")
 
-        self.texture1 = OGLTexture2D().from_file(PATH+"res/textures/mosaic.jpg")
-        self.texture2 = OGLTexture2D().from_file(PATH+"res/textures/testTexture.jpg")
+        self.texture1 = texture_loader.texture(PATH+"res/textures/mosaic.jpg")
+        self.texture2 = texture_loader.texture(PATH+"res/textures/testTexture.jpg")
         self.texture2.flip_y()
+        texture_loader.shutdown()
 
         self.cam = self.cam.with_position((5, 5, 2.5)).with_azimuth(math.pi * 1.25).with_zenith(math.pi * -0.125)
         
@@ -209,7 +216,7 @@ class Main:
             # set the current shader to be used
             glUseProgram(self.shader_program) 
             
-            glUniformMatrix4fv(self.loc_mat, 1, False, self.cam.view.mul_mat4(self.proj).to_4x4array())
+            ShaderUtils.uniform_mat4(self.loc_mat, self.cam.view.mul_mat4(self.proj))
             
             glUniform1f(self.loc_height, self.height)
             
@@ -221,6 +228,7 @@ class Main:
             
             self.texture_viewer.view(self.texture1.textureID, -1, -0.5, 0.5)
             self.texture_viewer.view(self.texture2.textureID, -1, -1, 0.5)
+            self.texture_viewer.view(self.texture1.textureID, -1, 0, 0.5, level = 2) # mip level with a quarter of the width
             
             self.text_renderer.add_str2d(3, 20, text)
             self.text_renderer.add_str2d(self.width-90, self.height-3, " (c) PGRF UHK")
@@ -236,7 +244,7 @@ class Main:
     def run(self):
         self.loop()
         if bool(glDeleteProgram):
-            glDeleteProgram(self.shader_program) 
+            ShaderUtils.delete_program(self.shader_program) 
         glfw.destroy_window(self.window)
         glfw.terminate()
         glfw.set_error_callback(None)
\ No newline at end of file
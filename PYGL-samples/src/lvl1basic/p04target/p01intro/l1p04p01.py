@@ -4,7 +4,7 @@ import glfw
 import sys
 import math
 from pyglutils import ShaderUtils, OGLTexture2D, OGLBuffers, OGLTextRenderer
-from transforms import Mat4Scale, Mat4PerspRH, Camera
+from transforms import Mat4Scale, Mat4PerspRH, CameraController
 from __main__ import PATH
 
 
@@ -31,7 +31,7 @@ class Main:
         self.ox = 0
         self.oy = 0
         
-        self.cam = Camera((5, 5, 2.5), math.pi * 1.25, math.pi * -0.125)
+        self.cam = CameraController((5, 5, 2.5), math.pi * 1.25, math.pi * -0.125)
         self.proj = Mat4PerspRH(math.pi / 4, 1, 0.1, 100.0)
     
         # Initialize GLFW. Most GLFW functions will not work before doing self.
@@ -286,7 +286,7 @@ class Main:
             self.texture.bind_slot(self.shaderProgram, "textureID", 0) 
             
             scale = Mat4Scale(self.width / self.height, 1, 1)
-            glUniformMatrix4fv(self.locMat, 1, False, self.cam.view.mul_mat4(self.proj).mul_mat4(scale).to_4x4array())
+            ShaderUtils.uniform_mat4(self.locMat, self.cam.view.mul_mat4(self.proj).mul_mat4(scale))
             
             # bindand draw
             self.buffers.draw(GL_TRIANGLES, self.shaderProgram) 
@@ -302,7 +302,7 @@ class Main:
             self.bind_color_buffer_as_texture() 
             #bindDepthBufferAsTexture() 
             
-            glUniformMatrix4fv(self.locMat, 1, False, self.cam.view.mul_mat4(self.proj).to_4x4array())
+            ShaderUtils.uniform_mat4(self.locMat, self.cam.view.mul_mat4(self.proj))
             
             self.buffers.draw(GL_TRIANGLES, self.shaderProgram) 
             
@@ -326,7 +326,7 @@ class Main:
             self.loop() 
             print("End")
             if bool(glDeleteProgram):
-                glDeleteProgram(self.shaderProgram) 
+                ShaderUtils.delete_program(self.shaderProgram) 
             glfw.destroy_window(self.window)
             glfw.terminate()
             glfw.set_error_callback(None)
\ No newline at end of file
@@ -1,5 +1,5 @@
-from transforms import Mat4PerspRH, Mat4Scale
-from transforms.Camera import Camera
+from transforms import Mat4PerspRH, Transform
+from transforms.CameraController import CameraController
 from pyglutils import ShaderUtils, OGLUtils, OGLRenderTarget, OGLTexture2D, OGLTextRenderer, OGLBuffers
 from OpenGL.GL import *
 import math
@@ -25,8 +25,10 @@ class Main:
         self.ox = 0
         self.oy = 0
     
-        self.cam = Camera()
+        self.cam = CameraController()
         self.proj = Mat4PerspRH(math.pi / 4, 1, 1, 10.0)
+        self.proj_aspect = Transform()
+        self.view_proj_aspect = Transform()
         
         # Initialize GLFW. Most GLFW functions will not work before doing this.
         if not glfw.init():
@@ -215,7 +217,9 @@ class Main:
             
             self.texture.bind_slot(self.shader_program, "textureID", 0)
             
-            glUniformMatrix4fv(self.locMat, 1, False, self.cam.view.mul_mat4(self.proj).mul_mat4(Mat4Scale(self.width / self.height, 1, 1)).to_4x4array())
+            # projection * aspect scale is folded again only after resize
+            self.proj_aspect.reset().projection(self.proj).scale(self.width / self.height, 1, 1)
+            ShaderUtils.uniform_mat4(self.locMat, self.view_proj_aspect.reset().view(self.cam).mul(self.proj_aspect))
             
             # bind and draw
             self.buffers.draw(GL_TRIANGLES, self.shader_program)
@@ -233,7 +237,7 @@ class Main:
             # use the depth buffer from the previous draw as a texture for the next
             #self.render_target.bind_depth_texture(self.shader_program, "textureID", 0)
 
-            glUniformMatrix4fv(self.locMat, 1, False, self.cam.view.mul_mat4(self.proj).to_4x4array())
+            ShaderUtils.uniform_mat4(self.locMat, self.cam.view.mul_mat4(self.proj))
             self.buffers.draw(GL_TRIANGLES, self.shader_program)
             
             text = __name__ + ": [LMB] camera, WSAD"
@@ -263,7 +267,7 @@ class Main:
     def run(self):
         self.loop() 
         if bool(glDeleteProgram):
-            glDeleteProgram(self.shader_program) 
+            ShaderUtils.delete_program(self.shader_program) 
         glfw.destroy_window(self.window)
         glfw.terminate()
         glfw.set_error_callback(None)
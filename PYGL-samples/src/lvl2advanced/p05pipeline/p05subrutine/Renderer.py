@@ -5,7 +5,7 @@ import math
 from OpenGL.GL import *
 from pyglutils import ShaderUtils, OGLBuffers, OGLUtils, OGLTextRenderer
 import time as tm
-from transforms.Camera import Camera
+from transforms.CameraController import CameraController
 from __main__ import PATH
 
 
@@ -23,7 +23,7 @@ class Renderer(Abstract_renderer):
         self.function1 = 0
         self.function2 = 0
     
-        self.cam = Camera()
+        self.cam = CameraController()
         self.model = Mat4Scale(5, 5, 1)
     
         self.subroutine_color = [None]*3
@@ -168,7 +168,7 @@ class Renderer(Abstract_renderer):
         glUniformSubroutinesuiv(GL_FRAGMENT_SHADER, 1, self.subroutine_color[self.function1 % len(self.subroutine_color)])
         glUniformSubroutinesuiv(GL_VERTEX_SHADER, 1, self.s[self.function2 % len(self.s)])
         
-        glUniformMatrix4fv(self.locMat, 1, False,self.model.mul_mat4(self.cam.view).mul_mat4(self.proj).to_4x4array())
+        ShaderUtils.uniform_mat4(self.locMat, self.model.mul_mat4(self.cam.view).mul_mat4(self.proj))
         
         glUniform1i(self.locTime, (int)(self.time - currentTime))
         text = "[LMB] camera, WSAD"
@@ -1,5 +1,5 @@
 from lvl2advanced.p01gui.p01simple.AbstractRenderer import Abstract_renderer
-from pyglutils import OGLBuffers, OGLUtils, ShaderUtils, OGLTexture2D, OGLTextRenderer
+from pyglutils import OGLBuffers, OGLUtils, ShaderUtils, OGLTexture2D, OGLTextRenderer, OGLTextureLoader
 import glfw
 from OpenGL.GL import *
 from __main__ import PATH
@@ -82,11 +82,15 @@ class Renderer(Abstract_renderer):
             print("GL_MAX_COMPUTE_WORK_GROUP_SIZE [" , dim , "] : " , val[0])
 
         
+        # both images are decoded at once
+        texture_loader = OGLTextureLoader()
+        texture_loader.load_all([PATH+"res/textures/bricks.jpg", PATH+"res/textures/bricksn.png"])
         try:
-            self.texture1 = OGLTexture2D().from_file(PATH+"res/textures/bricks.jpg")
-            self.texture2 = OGLTexture2D().from_file(PATH+"res/textures/bricksn.png")
+            self.texture1 = texture_loader.texture(PATH+"res/textures/bricks.jpg")
+            self.texture2 = texture_loader.texture(PATH+"res/textures/bricksn.png")
         except Exception as e:
             print("ERROR",e)
+        texture_loader.shutdown()
         self.textureViewer = OGLTexture2D.Viewer()
         self.textRenderer = OGLTextRenderer(self.width, self.height)
 
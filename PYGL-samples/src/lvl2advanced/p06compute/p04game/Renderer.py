@@ -2,9 +2,16 @@ from lvl2advanced.p01gui.p01simple.AbstractRenderer import Abstract_renderer
 import glfw
 from pyglutils import OGLTexture2D, ShaderUtils, OGLUtils, OGLTextRenderer, OGLTexImageFloat
 import sys
+import numpy as np
 from OpenGL.GL import *
 from __main__ import PATH
 
+# (x, y) offsets of live cells from the cursor
+GLIDER = np.array([(-1, 0), (1, 0), (1, 1), (0, 1), (1, -1)])
+CROSS = np.array([(0, 0), (1, 0), (0, 1), (-1, 0), (0, -1)])
+# color of a newborn cell in computeLife
+LIVE_CELL = (1.0, 0.5, 0.5, 1.0)
+
 class Renderer(Abstract_renderer):
     """ author: PGRF FIM UHK
         version: 2.0-PY
@@ -79,11 +86,7 @@ class Renderer(Abstract_renderer):
             x = texImageIn.get_width()/2
             y = texImageIn.get_height()/2
             #glider shape
-            texImageIn.set_pixel_component(x-1, y, 0, 1.0) #only red color
-            texImageIn.set_pixel_component(x+1, y, 0, 1.0) #only red color
-            texImageIn.set_pixel_component(x+1, y+1, 0, 1.0) #only red color
-            texImageIn.set_pixel_component(x, y+1, 0, 1.0) #only red color
-            texImageIn.set_pixel_component(x+1, y-1, 0, 1.0) #only red color
+            texImageIn.set_pixels(x + GLIDER[:, 0], y + GLIDER[:, 1], 1.0, component = 0) #only red color
 
         
         self.texture_in = OGLTexture2D().from_tex(texImageIn)
@@ -161,37 +164,28 @@ class Renderer(Abstract_renderer):
         
         if self.mouse_down > 0: #add new generator
             #print("[" + mouseX + "," + mouseY + "]")
-            # get image as a copy of input texture
-            texImageIn = self.texture_in.get_tex_image(OGLTexImageFloat.Format(4))
-            x = 2 * self.mouseX * texImageIn.width / self.width
-            y = 2 * self.mouseY * texImageIn.height / self.height
-            if x > 0 and x <texImageIn.width-1 and y > 0 and y <texImageIn.height-1:
+            x = int(2 * self.mouseX * self.texture_in.width / self.width)
+            y = int(2 * self.mouseY * self.texture_in.height / self.height)
+            if x > 0 and x < self.texture_in.width-1 and y > 0 and y < self.texture_in.height-1:
+                # only the touched texels are streamed to the input texture, no readback
                 if (self.mouse_down == 2):#cross shape		
-                    texImageIn.set_pixel_component(x, y, 0, 1.0) #only red color
-                    texImageIn.set_pixel_component(x+1, y, 0, 1.0) #only red color
-                    texImageIn.set_pixel_component(x, y+1, 0, 1.0) #only red color
-                    texImageIn.set_pixel_component(x-1, y, 0, 1.0) #only red color
-                    texImageIn.set_pixel_component(x, y-1, 0, 1.0) #only red color
+                    self.texture_in.stream_pixels(OGLTexImageFloat.Format(4), x + CROSS[:, 0], y + CROSS[:, 1], LIVE_CELL)
                 
                 if (self.mouse_down == 1):#glider shape
-                    texImageIn.set_pixel_component(x-1, y, 0, 1.0) #only red color
-                    texImageIn.set_pixel_component(x+1, y, 0, 1.0) #only red color
-                    texImageIn.set_pixel_component(x+1, y+1, 0, 1.0) #only red color
-                    texImageIn.set_pixel_component(x, y+1, 0, 1.0) #only red color
-                    texImageIn.set_pixel_component(x+1, y-1, 0, 1.0) #only red color
-            
-            # update input texture from the image
-            self.texture_in.set_tex_image(texImageIn)
+                    self.texture_in.stream_pixels(OGLTexImageFloat.Format(4), x + GLIDER[:, 0], y + GLIDER[:, 1], LIVE_CELL)
         
         
         #draw textures
 
+        #all three textures are drawn together by end_batch
+        self.texture_viewer.begin_batch()
         #show original texture in right up corner
         self.texture_viewer.view(self.texture.textureID,0,0)
         #show input texture in left up corner
         self.texture_viewer.view(self.texture_in.textureID,-1,0)
         #show output texture in right down corner
         self.texture_viewer.view(self.texture_out.textureID, 0, -1)
+        self.texture_viewer.end_batch()
         
         
         text = __name__ + ": [LMB] new life, [n] -start/stop, [m] - step, [i] - reset, [c]lear, ESC - exit "
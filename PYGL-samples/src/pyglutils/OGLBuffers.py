@@ -1,6 +1,7 @@
 import numpy as np
 from OpenGL.GL import *
 from transforms import Vec2D, Vec3D
+from . import ShaderUtils
 
 class Attrib:
     def __init__(self, name, dimension, normalize = False, offsetInFloats = None):
@@ -24,14 +25,34 @@ class VertexBuffer:
     def to_string(self):
         return(str(self))
     
+def interleave(streams):
+    """Interleave several attribute streams into data of a single vertex buffer
+
+    Args:
+        streams (list): (name, data, dimension) for each attribute, data hold dimension floats per vertex
+
+    Returns:
+        tuple: float32 array of shape (vertex count, floats per vertex) and list of Attrib with offsets
+    """
+    arrays = []
+    attributes = []
+    offset = 0
+    for name, data, dimension in streams:
+        arrays.append(np.asarray(data, dtype = np.float32).reshape(-1, dimension))
+        attributes.append(Attrib(name, dimension, offsetInFloats = offset))
+        offset += dimension
+    return np.hstack(arrays), attributes
+
 class OGLBuffers:
     
     def __init__(self, vertexData, floatsPerVertex, attributes, indexData = None):
         self.indexCount = -1
         self.vertexCount = -1
         self.vertexBuffers = []
-        self.attribArrays = []
+        self.vertexArrays = {} # shader program id -> (ShaderProgram, VAO with attribute setup for that program)
         self.indexBuffer = 0
+        self.indexType = GL_UNSIGNED_INT
+        self.indexSize = 4
         
         self.add_vertex_buffer(vertexData, attributes, floatsPerVertex)
         if indexData is not None:
@@ -62,26 +83,57 @@ class OGLBuffers:
             print("Warning: GLBuffers.addVertexBuffer: vertex count differs from the first one.")
 
         self.vertexBuffers.append(VertexBuffer(bufferID, floatsPerVertex * 4, attributes))
+        self.delete_vertex_arrays()
+
+    def add_interleaved_vertex_buffer(self, streams):
+        """Add one vertex buffer holding interleaved data of the given (name, data, dimension) streams"""
+        data, attributes = interleave(streams)
+        self.add_vertex_buffer(data, attributes)
 
     def set_index_buffer(self, data):
+        # uint16 arrays are kept as they are (half the size), everything else is uploaded as uint32
         self.indexCount = len(data)
-        indexBufferBuffer = np.array(data, dtype = np.uint32)
+        if isinstance(data, np.ndarray) and data.dtype == np.uint16:
+            indexBufferBuffer = data
+            self.indexType = GL_UNSIGNED_SHORT
+            self.indexSize = 2
+        else:
+            indexBufferBuffer = np.array(data, dtype = np.uint32)
+            self.indexType = GL_UNSIGNED_INT
+            self.indexSize = 4
+        self.delete_vertex_arrays()
+        if self.indexBuffer != 0:
+            glDeleteBuffers(1, [self.indexBuffer])
         self.indexBuffer = glGenBuffers(1)
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.indexBuffer)
-        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indexBufferBuffer, GL_STATIC_DRAW)
+        # element buffer binding is part of VAO state, upload through a binding point no VAO records,
+        # the buffer is attached to the VAOs when they are created
+        glBindBuffer(GL_COPY_WRITE_BUFFER, self.indexBuffer)
+        glBufferData(GL_COPY_WRITE_BUFFER, indexBufferBuffer, GL_STATIC_DRAW)
+        glBindBuffer(GL_COPY_WRITE_BUFFER, 0)
 
     def bind(self, shaderProgram):
-        if self.attribArrays is not None:
-            for attrib in self.attribArrays:
-                glDisableVertexAttribArray(attrib)
-        self.attribArrays = []
+        program = ShaderUtils.get_program(shaderProgram)
+        entry = self.vertexArrays.get(int(shaderProgram))
+        if entry is not None and entry[0] is not program:
+            # the program was forgotten by ShaderUtils (deleted) and its id reused
+            self.delete_vertex_arrays(shaderProgram)
+            entry = None
+        if entry is None:
+            vertexArray = self.create_vertex_array(program)
+        else:
+            vertexArray = entry[1]
+        glBindVertexArray(vertexArray)
+
+    def create_vertex_array(self, shaderProgram):
+        """Create VAO recording attribute pointers of all vertex buffers for the given shader program"""
+        vertexArray = glGenVertexArrays(1)
+        glBindVertexArray(vertexArray)
         for vb in self.vertexBuffers:
             glBindBuffer(GL_ARRAY_BUFFER, vb.id)
             offset = 0
             for j in range(0, len(vb.attributes)):
-                location = glGetAttribLocation(shaderProgram, vb.attributes[j].name)
+                location = ShaderUtils.get_attrib_location(shaderProgram, vb.attributes[j].name)
                 if (location >= 0): # due to optimization GLSL on a graphic card
-                    self.attribArrays.append(location)
                     glEnableVertexAttribArray(location)
                     if vb.attributes[j].offset < 0:
                         ofst = offset
@@ -90,17 +142,24 @@ class OGLBuffers:
                     glVertexAttribPointer(location, vb.attributes[j].dimension, GL_FLOAT, vb.attributes[j].normalize, vb.stride, ctypes.c_void_p(ofst))
                 
                 offset += 4 * vb.attributes[j].dimension
-            
 
         if self.indexBuffer != 0:
             glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.indexBuffer)
+        glBindVertexArray(0)
+        self.vertexArrays[int(shaderProgram)] = (ShaderUtils.get_program(shaderProgram), vertexArray)
+        return vertexArray
 
+    def delete_vertex_arrays(self, shaderProgram = None):
+        """Delete cached VAOs of the given shader program or all of them"""
+        if shaderProgram is not None:
+            programs = [int(shaderProgram)] if int(shaderProgram) in self.vertexArrays else []
+        else:
+            programs = list(self.vertexArrays.keys())
+        for program in programs:
+            glDeleteVertexArrays(1, [self.vertexArrays.pop(program)[1]])
 
     def unbind(self):
-        if self.attribArrays is not None:
-            for attrib in self.attribArrays:
-                glDisableVertexAttribArray(attrib)
-            self.attribArrays = None
+        glBindVertexArray(0)
 
     def draw(self, topology, shaderProgram, count = None, start = 0):
         if count is None:
@@ -109,7 +168,7 @@ class OGLBuffers:
             if self.indexBuffer == 0:
                 glDrawArrays(topology, 0, int(self.vertexCount))
             else:
-                glDrawElements(topology, self.indexCount, GL_UNSIGNED_INT, None)
+                glDrawElements(topology, self.indexCount, self.indexType, None)
             self.unbind()
         else:
             glUseProgram(shaderProgram)
@@ -117,7 +176,7 @@ class OGLBuffers:
             if self.indexBuffer == 0 :
                 glDrawArrays(topology, start, count)
             else:
-                glDrawElements(topology, count, GL_UNSIGNED_INT, ctypes.c_void_p(start * 4))
+                glDrawElements(topology, count, self.indexType, ctypes.c_void_p(start * self.indexSize))
             self.unbind()
 
     def to_string(self):
@@ -1,16 +1,41 @@
 from . import OGLBuffers
+from transforms import AABB, BoundingSphere, BVH
 from OpenGL.GL import *
+import numpy as np
+import os
+
+OBJ_CACHE_EXTENSION = ".cache.npz"
+BVH_CACHE_EXTENSION = ".bvh.npz"
+OBJ_CACHE_VERSION = 1
+
+# line kinds of the bulk parser
+OBJ_LINE_V = 1
+OBJ_LINE_VT = 2
+OBJ_LINE_VN = 3
+OBJ_LINE_F = 4
 
 
 class OBJLoader:
-    def __init__(self, model_path):
+    def __init__(self, model_path, fast = True, use_cache = True):
+        """Read OBJ model
+
+        Args:
+            model_path (String): path to the OBJ file
+            fast (bool, optional): bulk NumPy parser, data are stored as arrays. Defaults to True.
+            use_cache (bool, optional): store parsed arrays to a sidecar file next to the model
+                and reuse them while the model file is unchanged (fast parser only). Defaults to True.
+        """
         self.vData = []  # List of Vertex Coordinates f32
         self.vtData = [] # List of Texture Coordinates f32
         self.vnData = [] # List of Normal Coordinates f32
         self.fv = [] # Face Vertex Indices i32
         self.ft = [] # Face Texture Indices i32
         self.fn = [] # Face Normal Indices i32
-        self.load_obj_model(model_path)
+        self.cache_key = None # identifies the file content read, fast parser only
+        if fast:
+            self.load_obj_model_fast(model_path, use_cache)
+        else:
+            self.load_obj_model(model_path)
         self.set_face_render_type()
     
     def load_obj_model(self, model_path):
@@ -40,7 +65,161 @@ class OBJLoader:
         except Exception as e:
             print("Failed to find or read OBJ: ", model_path)
             print(e)
-   
+
+    def load_obj_model_fast(self, model_path, use_cache = True):
+        """Read OBJ model by tokenizing the whole file at once with NumPy
+
+        vData, vtData and vnData are float32 arrays with one row per record,
+        fv, ft and fn are (triangles, 3) int arrays of 1-based indices, 0 where missing.
+        Polygons are triangulated as fans, same as in load_obj_model.
+        """
+        try:
+            print("Reading model file ", model_path, end = "")
+            stat = os.stat(model_path)
+            key = np.array([stat.st_mtime_ns, stat.st_size, OBJ_CACHE_VERSION], dtype=np.int64)
+            self.cache_key = key
+            cache_path = model_path + OBJ_CACHE_EXTENSION
+            if use_cache and self.read_cache(cache_path, key):
+                print(" ... cache ", cache_path, "... read")
+                return
+
+            with open(model_path, "rb") as f:
+                self.process_bulk_data(np.frombuffer(f.read(), dtype=np.uint8))
+            print("OBJ model: ", model_path, "... read")
+
+            if use_cache:
+                self.write_cache(cache_path, key)
+        except Exception as e:
+            print("Failed to find or read OBJ: ", model_path)
+            print(e)
+
+    def process_bulk_data(self, data):
+        """Split file bytes to lines, classify them by their prefix and parse each record type as one block"""
+        ends = np.flatnonzero(data == ord("\n")) + 1
+        if len(ends) == 0 or ends[-1] != len(data):
+            ends = np.append(ends, len(data))
+        starts = np.concatenate(([0], ends[:-1]))
+        lengths = ends - starts
+
+        padded = np.concatenate((data, np.zeros(3, dtype=np.uint8)))
+        c0 = padded[starts]
+        c1 = padded[starts + 1]
+        c2 = padded[starts + 2]
+        blank1 = (c1 == ord(" ")) | (c1 == ord("\t"))
+        blank2 = (c2 == ord(" ")) | (c2 == ord("\t"))
+        line_kind = np.zeros(len(starts), dtype=np.uint8)
+        line_kind[(c0 == ord("v")) & blank1] = OBJ_LINE_V
+        line_kind[(c0 == ord("v")) & (c1 == ord("t")) & blank2] = OBJ_LINE_VT
+        line_kind[(c0 == ord("v")) & (c1 == ord("n")) & blank2] = OBJ_LINE_VN
+        line_kind[(c0 == ord("f")) & blank1] = OBJ_LINE_F
+
+        # blank out the record prefixes, only numbers stay in the blocks
+        work = data.copy()
+        work[starts[line_kind != 0]] = ord(" ")
+        work[starts[(line_kind == OBJ_LINE_VT) | (line_kind == OBJ_LINE_VN)] + 1] = ord(" ")
+        byte_kind = np.repeat(line_kind, lengths)
+
+        self.vData = self.process_float_block(work[byte_kind == OBJ_LINE_V], lengths[line_kind == OBJ_LINE_V], 3)
+        self.vtData = self.process_float_block(work[byte_kind == OBJ_LINE_VT], lengths[line_kind == OBJ_LINE_VT], 2)
+        self.vnData = self.process_float_block(work[byte_kind == OBJ_LINE_VN], lengths[line_kind == OBJ_LINE_VN], 3)
+        self.process_face_block(work[byte_kind == OBJ_LINE_F], lengths[line_kind == OBJ_LINE_F], line_kind)
+
+    def token_counts(self, block, lengths):
+        """Returns number of whitespace separated tokens on each line of the block"""
+        blank = (block == ord(" ")) | (block == ord("\t")) | (block == ord("\r")) | (block == ord("\n"))
+        token_start = ~blank & np.concatenate(([True], blank[:-1]))
+        line = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+        return np.bincount(line[token_start], minlength=len(lengths))
+
+    def process_float_block(self, block, lengths, components):
+        """Parse all lines of one record type at once, returns (len(lengths), components) float32 array"""
+        result = np.zeros((len(lengths), components), dtype=np.float32)
+        if len(lengths) == 0:
+            return result
+        values = np.fromstring(block.tobytes(), dtype=np.float32, sep=" ")
+        counts = self.token_counts(block, lengths)
+        if (counts == counts[0]).all():
+            values = values.reshape(-1, counts[0])[:, :components]
+            result[:, :values.shape[1]] = values
+            return result
+        # records with differing number of values (e.g. "v x y z" and "v x y z w")
+        offsets = np.cumsum(counts) - counts
+        for j in range(components):
+            valid = counts > j
+            result[valid, j] = values[offsets[valid] + j]
+        return result
+
+    def process_face_block(self, block, lengths, line_kind):
+        """Parse all face lines at once and triangulate polygons as fans"""
+        counts = self.token_counts(block, lengths)
+        corner_count = int(counts.sum())
+        if corner_count == 0:
+            self.fv = self.ft = self.fn = np.zeros((0, 3), dtype=np.int32)
+            return
+
+        # every corner is "v", "v/vt", "v//vn" or "v/vt/vn", missing indices are stored as 0
+        text = block.tobytes().replace(b"//", b"/0/")
+        values = np.fromstring(text.replace(b"/", b" "), dtype=np.int64, sep=" ")
+        fields = values.size // corner_count
+        if values.size == corner_count * fields and 1 <= fields <= 3 and text.count(b"/") == corner_count * (fields - 1):
+            indices = np.zeros((corner_count, 3), dtype=np.int64)
+            indices[:, :fields] = values.reshape(-1, fields)
+        else:
+            # mixed corner formats in one file
+            indices = np.zeros((corner_count, 3), dtype=np.int64)
+            for i, corner in enumerate(text.split()):
+                for j, value in enumerate(corner.split(b"/")[:3]):
+                    indices[i, j] = int(value)
+
+        if (indices < 0).any():
+            # relative indices count back from the last record read before the face line
+            face_line = np.flatnonzero(line_kind == OBJ_LINE_F)
+            corner_line = np.repeat(face_line, counts)
+            for column, kind in enumerate((OBJ_LINE_V, OBJ_LINE_VT, OBJ_LINE_VN)):
+                negative = indices[:, column] < 0
+                defined = np.cumsum(line_kind == kind)[corner_line[negative]]
+                indices[negative, column] += defined + 1
+
+        # triangle fan (0, k, k + 1) for k in 1 .. count - 2 of each polygon, points and lines are skipped
+        starts = np.cumsum(counts) - counts
+        triangles = np.maximum(counts - 2, 0)
+        polygon = np.repeat(np.arange(len(counts)), triangles)
+        k = np.arange(triangles.sum()) - np.repeat(np.cumsum(triangles) - triangles, triangles) + 1
+        first = starts[polygon]
+        corner_ids = np.stack((first, first + k, first + k + 1), axis=1)
+
+        self.fv = indices[:, 0][corner_ids].astype(np.int32)
+        self.ft = indices[:, 1][corner_ids].astype(np.int32)
+        self.fn = indices[:, 2][corner_ids].astype(np.int32)
+
+    def read_cache(self, cache_path, key):
+        """Load parsed arrays from the sidecar cache, returns False if missing or stale"""
+        if not os.path.isfile(cache_path):
+            return False
+        try:
+            with np.load(cache_path) as cache:
+                if not np.array_equal(cache["key"], key):
+                    return False
+                self.vData = cache["v"]
+                self.vtData = cache["vt"]
+                self.vnData = cache["vn"]
+                self.fv = cache["fv"]
+                self.ft = cache["ft"]
+                self.fn = cache["fn"]
+            return True
+        except Exception:
+            return False
+
+    def write_cache(self, cache_path, key):
+        """Store parsed arrays as an uncompressed npz next to the model"""
+        try:
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, key = key, v = self.vData, vt = self.vtData, vn = self.vnData, fv = self.fv, ft = self.ft, fn = self.fn)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print("Unable to write OBJ cache: ", cache_path)
+            print(e)
 
     def process_data(self, read:str):
         s = read.split()
@@ -123,50 +302,111 @@ class OGLModelOBJ:
     def get_tex_coords_buffer(self):
         return self.tex_coords_buffer
 
+    def get_index_buffer(self):
+        return self.index_buffer
+
     def get_buffers(self):
         return self.buffer
 
     def get_topology(self):
         return self.topology
 
-    def __init__(self, model_path):
+    def get_aabb(self):
+        return self.aabb
+
+    def get_bounding_sphere(self):
+        return self.bounding_sphere
+
+    def get_bvh(self):
+        """Returns BVH of the model triangles in model space, built on the first call
+
+        With use_cache the hierarchy is stored next to the model (as the parsed OBJ data)
+        and loaded while the model file is unchanged. Triangle indices of its queries
+        are the indices of triangles in the draw order of the buffers.
+        """
+        if self.bvh is None and self.vertices_buffer is not None:
+            cache_path = self.model_path + BVH_CACHE_EXTENSION
+            key = self.cache_key if self.use_cache else None
+            if key is not None:
+                self.bvh = BVH.load(cache_path, key)
+            if self.bvh is None:
+                self.bvh = BVH.from_mesh(self.vertices_buffer, self.index_buffer)
+                if key is not None:
+                    self.bvh.save(cache_path, key)
+        return self.bvh
+
+    def __init__(self, model_path, fast = True, use_cache = True, indexed = False):
+        """Load OBJ model and create its OGLBuffers
+
+        Args:
+            model_path (String): path to the OBJ file
+            fast (bool, optional): use bulk NumPy parser. Defaults to True.
+            use_cache (bool, optional): use sidecar cache of the parsed file. Defaults to True.
+            indexed (bool, optional): weld identical (v, vt, vn) corners into unique vertices
+                stored in one interleaved buffer drawn with an index buffer. Defaults to False.
+        """
         self.vertices_buffer = None
         self.normals_buffer = None
         self.tex_coords_buffer = None
+        self.index_buffer = None
+        self.reuse_ratio = 1
+        self.aabb = None
+        self.bounding_sphere = None
+        self.bvh = None
         
-        loader = OBJLoader(model_path) 
+        loader = OBJLoader(model_path, fast, use_cache) 
         self.topology = loader.topology
-        
-        print(len(loader.fv), len(loader.fv[0]))
-        if loader.fv[0][0] > 0:
-            self.vertices_buffer = []
-
-            c3 = 1
-            for i in range(0, len(loader.fv)):
-                for j in range(0,len(loader.fv[i])):
-                    c0 = loader.vData[loader.fv[i][j] - 1][0] # x
-                    c1 = loader.vData[loader.fv[i][j] - 1][1] # y
-                    c2 = loader.vData[loader.fv[i][j] - 1][2] # z
-                    self.vertices_buffer.append((c0,c1,c2,c3))
-
-        if loader.ft[0][0] > 0:
-            self.tex_coords_buffer = []
-            for i in range(0,len(loader.ft)):
-                for j in range(0, len(loader.ft[i])):
-                    self.tex_coords_buffer.append(loader.vtData[loader.ft[i][j] - 1][0])
-                    self.tex_coords_buffer.append(loader.vtData[loader.ft[i][j] - 1][1])
-
-        if loader.fn[0][0] > 0:
-            self.normals_buffer = []
-
-            for i in range(0, len(loader.fn)):
-                for j in range(0,len(loader.fn[i])):
-                    c0 = loader.vnData[loader.fn[i][j] - 1][0] # x
-                    c1 = loader.vnData[loader.fn[i][j] - 1][1] # y
-                    c2 = loader.vnData[loader.fn[i][j] - 1][2] # z
-                    self.normals_buffer.append((c0,c1,c2))
-    
-        self.buffer = self.to_ogl_buffers(self.vertices_buffer, self.normals_buffer, self.tex_coords_buffer)
+        self.model_path = model_path
+        self.use_cache = use_cache
+        self.cache_key = loader.cache_key
+
+        fv = np.asarray(loader.fv, dtype=np.int64).reshape(-1, 3)
+        ft = np.asarray(loader.ft, dtype=np.int64).reshape(-1, 3)
+        fn = np.asarray(loader.fn, dtype=np.int64).reshape(-1, 3)
+        if len(fv) > 0 and fv[0][0] > 0:
+            # (x, y, z, 1) for every triangle corner
+            self.vertices_buffer = np.ones((fv.size, 4), dtype=np.float32)
+            self.vertices_buffer[:, :3] = self.to_array(loader.vData, 3)[fv.reshape(-1) - 1]
+
+        if len(ft) > 0 and ft[0][0] > 0:
+            self.tex_coords_buffer = self.to_array(loader.vtData, 2)[ft.reshape(-1) - 1]
+
+        if len(fn) > 0 and fn[0][0] > 0:
+            self.normals_buffer = self.to_array(loader.vnData, 3)[fn.reshape(-1) - 1]
+
+        if self.vertices_buffer is not None:
+            # model space bounds, computed once, transform them by model matrices for culling
+            self.aabb = AABB.from_vertices(self.vertices_buffer)
+            self.bounding_sphere = BoundingSphere.from_vertices(self.vertices_buffer)
+
+        if indexed and self.vertices_buffer is not None:
+            self.weld_vertices(fv, ft, fn)
+            self.buffer = self.to_indexed_ogl_buffers(self.vertices_buffer, self.normals_buffer, self.tex_coords_buffer, self.index_buffer)
+        else:
+            self.buffer = self.to_ogl_buffers(self.vertices_buffer, self.normals_buffer, self.tex_coords_buffer)
+
+    def weld_vertices(self, fv, ft, fn):
+        """Keep only unique (v, vt, vn) corners in the vertex buffers and create the index buffer"""
+        corners = fv.size
+        # unique (v, vt, vn) rows, no packed scalar key that could overflow on large models
+        key = np.stack((fv.reshape(-1), ft.reshape(-1), fn.reshape(-1)), axis=1)
+        _, first, inverse = np.unique(key, axis=0, return_index=True, return_inverse=True)
+        # number unique vertices in order of their first use, keeps neighbouring triangles close in memory
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        unique_corners = first[order]
+
+        self.vertices_buffer = self.vertices_buffer[unique_corners]
+        if self.tex_coords_buffer is not None:
+            self.tex_coords_buffer = self.tex_coords_buffer[unique_corners]
+        if self.normals_buffer is not None:
+            self.normals_buffer = self.normals_buffer[unique_corners]
+
+        index_type = np.uint16 if len(unique_corners) <= 65536 else np.uint32
+        self.index_buffer = rank[inverse.reshape(-1)].astype(index_type)
+        self.reuse_ratio = corners / max(len(unique_corners), 1)
+        print("Indexed model: ", len(unique_corners), "unique vertices of", corners, "corners, reuse ratio", round(self.reuse_ratio, 2))
 
     
     def to_ogl_buffers(self, verticesBuf, normalsBuf, texCoordsBuf):
@@ -185,3 +425,19 @@ class OGLModelOBJ:
             buffers.add_vertex_buffer(normalsBuf, attributesNormal)
             
         return buffers
+
+    def to_indexed_ogl_buffers(self, verticesBuf, normalsBuf, texCoordsBuf, indexBuf):
+        # one interleaved buffer, position, texture coordinates and normal of a vertex next to each other
+        streams = [("inPosition", verticesBuf, 4)]
+        if texCoordsBuf is not None:
+            streams.append(("inTexCoord", texCoordsBuf, 2))
+        if normalsBuf is not None:
+            streams.append(("inNormal", normalsBuf, 3))
+        vertexData, attributes = OGLBuffers.interleave(streams)
+        return OGLBuffers.OGLBuffers(vertexData, None, attributes, indexBuf)
+
+    def to_array(self, data, components):
+        """Returns loader data as (records, components) float32 array"""
+        if isinstance(data, np.ndarray):
+            return data[:, :components]
+        return np.array([row[:components] for row in data], dtype=np.float32).reshape(-1, components)
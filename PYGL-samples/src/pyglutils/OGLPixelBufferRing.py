@@ -0,0 +1,107 @@
+from OpenGL.GL import *
+import numpy as np
+
+class OGLPixelBufferRing:
+    """Ring of pixel buffer objects (PBO) for asynchronous texture transfers
+
+    Each transfer uses the next buffer of the ring and is fenced by glFenceSync,
+    the buffer is reused only after the GPU signalled the fence. With 2 or 3
+    buffers the application fills one buffer while the GPU copies from the others.
+
+    GL_PIXEL_UNPACK_BUFFER rings serve uploads (write, then glTexSubImage2D with a
+    buffer offset), GL_PIXEL_PACK_BUFFER rings serve readbacks (glGetTexImage into
+    the buffer, read later when ready).
+    """
+
+    def __init__(self, target, size = 0, count = 3):
+        """Creates the buffers
+
+        Args:
+            target: GL_PIXEL_UNPACK_BUFFER for uploads or GL_PIXEL_PACK_BUFFER for readbacks
+            size (int, optional): initial capacity of each buffer in bytes, grows when needed. Defaults to 0.
+            count (int, optional): number of buffers in the ring. Defaults to 3.
+        """
+        self.target = target
+        self.usage = GL_STREAM_DRAW if target == GL_PIXEL_UNPACK_BUFFER else GL_STREAM_READ
+        self.ids = np.atleast_1d(glGenBuffers(count))
+        self.fences = [None] * count
+        self.capacity = [0] * count
+        self.index = count - 1
+        # number of times a busy buffer was orphaned instead of waited for
+        self.orphaned_count = 0
+        for slot in range(count):
+            self.allocate(slot, size)
+        glBindBuffer(self.target, 0)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def allocate(self, slot, size):
+        """Gives the buffer new storage of at least size bytes, the old one is released by the driver
+        once the GPU is done with it (orphaning)"""
+        glBindBuffer(self.target, self.ids[slot])
+        size = max(size, self.capacity[slot])
+        if size > 0:
+            glBufferData(self.target, size, None, self.usage)
+        self.capacity[slot] = size
+        self.delete_fence(slot)
+
+    def delete_fence(self, slot):
+        if self.fences[slot] is not None:
+            glDeleteSync(self.fences[slot])
+            self.fences[slot] = None
+
+    def is_ready(self, slot, timeout = 0):
+        """Returns True if the GPU finished the commands fenced on the buffer
+
+        Args:
+            slot (int): index of the buffer in the ring
+            timeout (int, optional): nanoseconds to wait for the fence. Defaults to 0 (poll).
+        """
+        if self.fences[slot] is None:
+            return True
+        result = glClientWaitSync(self.fences[slot], GL_SYNC_FLUSH_COMMANDS_BIT, timeout)
+        if result == GL_ALREADY_SIGNALED or result == GL_CONDITION_SATISFIED:
+            self.delete_fence(slot)
+            return True
+        return False
+
+    def acquire(self, size):
+        """Binds the next buffer of the ring with capacity of at least size bytes and returns its index
+
+        A buffer still used by the GPU is orphaned, so the call never waits.
+        """
+        self.index = (self.index + 1) % len(self)
+        slot = self.index
+        if not self.is_ready(slot) or size > self.capacity[slot]:
+            if self.fences[slot] is not None:
+                self.orphaned_count += 1
+            self.allocate(slot, size)
+        else:
+            glBindBuffer(self.target, self.ids[slot])
+        return slot
+
+    def write(self, data):
+        """Copies contiguous array data to the next buffer, leaves it bound and returns its index"""
+        slot = self.acquire(data.nbytes)
+        glBufferSubData(self.target, 0, data.nbytes, data)
+        return slot
+
+    def fence(self, slot):
+        """Fences the commands issued since the buffer was acquired, call after the transfer using it"""
+        self.delete_fence(slot)
+        self.fences[slot] = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+    def read(self, slot, out):
+        """Copies the beginning of the buffer to the contiguous array out, waits for the fence if needed"""
+        self.is_ready(slot, GL_TIMEOUT_IGNORED)
+        glBindBuffer(self.target, self.ids[slot])
+        glGetBufferSubData(self.target, 0, out.nbytes, out)
+        glBindBuffer(self.target, 0)
+        return out
+
+    def delete(self):
+        for slot in range(len(self)):
+            self.delete_fence(slot)
+        glDeleteBuffers(len(self), self.ids)
+        self.ids = np.zeros(0, dtype=np.uint32)
@@ -1,4 +1,3 @@
-import copy
 from OpenGL.GL import *
 import numpy as np
 
@@ -47,7 +46,7 @@ class Format():
 
 class FormatDepth(Format):
     def __init__(self):
-        super(1)
+        super().__init__(1)
 
     def get_internal_format(self):
         return GL_DEPTH_COMPONENT
@@ -60,7 +59,7 @@ class FormatDepth(Format):
 
 class FormatIntensity(Format):
     def __init__(self):
-        super(1)
+        super().__init__(1)
     
     def get_internal_format(self):
         return 1
@@ -70,16 +69,24 @@ class FormatIntensity(Format):
 
     def get_pixel_type(self):
         return GL_FLOAT
+
 class OGLTexImageFloat():
+    """Float image (texture data) of width x height x depth pixels
+
+    The data are one contiguous float32 buffer that is uploaded to OpenGL as it is,
+    pixels is a (depth, height, width, components) view of the same memory, so the
+    image can be edited by whole-array operations (flipY, fill, stamp, sample)
+    instead of pixel by pixel.
+    """
     def __init__(self):
         pass
 
     def from_component_count_no_depth(self, width:int, height:int, component_count:int, data = None):
-        self.from_format(width, height, 1, OGLTexImageFloat.Format(component_count),data)
+        self.from_format(width, height, 1, Format(component_count), data)
         return self
 
     def from_component_count(self, width:int, height:int, depth:int, component_count:int, data = None):
-        self.from_format(width, height, depth, OGLTexImageFloat.Format(component_count), data)
+        self.from_format(width, height, depth, Format(component_count), data)
         return self
 
     def from_format_no_depth(self, width:int, height:int, format, data = None):
@@ -92,11 +99,17 @@ class OGLTexImageFloat():
         self.depth = depth
         self.format = format
         if data is None:
-            self.data = np.zeros(width*height*depth*format.get_component_count())
+            self.data = format.new_buffer(width, height, depth)
         else:
-            self.data = np.array(data, dtype=np.float32)
+            # float32 data are used as they are, other types are converted
+            self.data = np.ascontiguousarray(data, dtype=np.float32).reshape(-1)
         return self
 
+    @property
+    def pixels(self):
+        """(depth, height, width, components) view of the data, writes change the image"""
+        return self.data.reshape(self.depth, self.height, self.width, self.format.get_component_count())
+
     def get_width(self):
         return self.width
 
@@ -107,8 +120,9 @@ class OGLTexImageFloat():
         return self.depth
 
     def set_data_buffer(self, buffer):
-        if len(buffer) == self.width * self.height * self.depth * self.format.get_component_count():
-            self.data = copy.deepcopy(buffer)
+        """Sets the image data, a contiguous float32 array is shared without copying"""
+        if buffer is not None and np.size(buffer) == self.width * self.height * self.depth * self.format.get_component_count():
+            self.data = np.ascontiguousarray(buffer, dtype=np.float32).reshape(-1)
 
     def get_data_buffer(self):
         return self.get_data()
@@ -119,24 +133,6 @@ class OGLTexImageFloat():
     def get_data(self):
         return self.data
 
-    def to_OGL_tex_image_byte(self, component_count = None):
-        if component_count is None:
-            component_count = self.format.get_component_count()
-        #array = np.zeros((self.width * self.height * component_count* self.height),dtype=np.ubyte)
-        array = self.data*255
-        #for (int z = 0 z < depth z++)
-        #    for (int y = 0 y < height y++)
-        #        for (int x = 0 x < width x++)
-        #            for (int i = 0 i < componentCount i++)
-        #                array[z * width * height * componentCount + y * width * componentCount + x * componentCount
-        #                        + i] = (byte) (Math
-        #                                .min(data[z * width * height * format.getComponentCount()
-        #                                        + y * width * format.getComponentCount()
-        #                                       + x * format.getComponentCount() + i % format.getComponentCount()], 1.0)
-        #                                * 255.0)
-
-        return OGLTexImageByte(self.width, self.height, self.depth, OGLTexImageByte.Format(component_count), array)
-
     def set_pixel(self, x, y, value):
         self.set_voxel_component(x, y, 0, 0, value)
 
@@ -147,31 +143,123 @@ class OGLTexImageFloat():
         self.set_voxel_component(x, y, z, 0, value)
 
     def set_voxel_component(self, x, y, z, component, value):
+        x, y, z, component = int(x), int(y), int(z), int(component)
         if x >= 0 and x < self.width and y >= 0 and y < self.height and z >= 0 and z < self.depth and component >= 0 \
             and component < self.format.get_component_count():
-            self.data[int((z * self.width * self.height + y * self.width + x) * self.format.get_component_count() + component)] = value
+            self.pixels[z, y, x, component] = value
 
-    def get_pixel(self, x, y):
-        return self.get_voxel(x, y, 0, 0)
-
-    def get_pixel(self, x, y, component):
+    def get_pixel(self, x, y, component = 0):
         return self.get_voxel(x, y, 0, component)
 
-    def get_voxel(self, x, y, z):
-        return self.get_voxel(x, y, z, 0)
-
-    def get_voxel(self, x, y, z, component):
+    def get_voxel(self, x, y, z, component = 0):
+        x, y, z, component = int(x), int(y), int(z), int(component)
         value = 0
         if x >= 0 and x < self.width and y >= 0 and y < self.height and z >= 0 and z < self.depth and component >= 0 \
             and component < self.format.get_component_count():
-            value = self.data[(z * self.width * self.height + y * self.width + x) * self.format.get_component_count() + component]
+            value = self.pixels[z, y, x, component]
         return value
 
     def flipY(self):
-        for z in range(0,self.depth):
-            for y in range(0,int(self.height/2)):
-                for x in range(0,self.width):
-                    for i in range(0, self.format.get_component_count()):
-                        value = self.get_voxel(x, y, z, i)
-                        self.set_voxel(x, y, z, i, self.get_voxel(x, self.height - y, z, i))
-                        self.set_voxel(x, self.height - y, z, i, value)
+        """Mirrors rows of all layers in place"""
+        pixels = self.pixels
+        pixels[:] = pixels[:, ::-1]
+
+    def component_slice(self, component):
+        if component is None:
+            return slice(None)
+        return component
+
+    def fill(self, value, x = 0, y = 0, width = None, height = None, z = None, component = None):
+        """Sets all pixels of a rectangle (the whole image by default) to the given value
+
+        Args:
+            value: number, or a sequence with one value per component
+            x, y: corner of the rectangle, the rectangle is clipped to the image
+            width, height (optional): rectangle size, up to the image border by default
+            z (optional): layer, all layers by default
+            component (optional): only this component is set, all components by default
+        """
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        x1 = self.width if width is None else min(int(x) + int(width), self.width)
+        y1 = self.height if height is None else min(int(y) + int(height), self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        layers = slice(None) if z is None else int(z)
+        self.pixels[layers, y0:y1, x0:x1, self.component_slice(component)] = value
+
+    def stamp(self, x, y, pattern, z = 0, component = None, blend = None):
+        """Writes a pattern to the image, e.g. a brush or a shape of cells
+
+        Args:
+            x, y: image position of pattern element [0, 0], the pattern is clipped to the image
+            pattern: (h, w) array applied to all (or the given) components, or (h, w, components) array
+            z (optional): layer. Defaults to 0.
+            component (optional): only this component is written, all components by default
+            blend (optional): NumPy function combining the image and the pattern, e.g. np.maximum
+                or np.add, the pattern replaces the pixels when None
+        """
+        pattern = np.asarray(pattern, dtype=np.float32)
+        x, y = int(x), int(y)
+        h, w = pattern.shape[:2]
+        # clip the pattern to the image
+        px0, py0 = max(-x, 0), max(-y, 0)
+        px1, py1 = min(w, self.width - x), min(h, self.height - y)
+        if px1 <= px0 or py1 <= py0:
+            return
+        part = pattern[py0:py1, px0:px1]
+        if part.ndim == 2 and component is None:
+            part = part[..., None]
+        target = self.pixels[int(z), y + py0:y + py1, x + px0:x + px1, self.component_slice(component)]
+        if blend is None:
+            target[...] = part
+        else:
+            target[...] = blend(target, part)
+
+    def set_pixels(self, xs, ys, value, z = 0, component = None):
+        """Sets pixels at the given arrays of coordinates, coordinates outside the image are skipped
+
+        Args:
+            xs, ys: integer arrays (or sequences) of N pixel coordinates
+            value: number or a sequence with one value per component, the same for all pixels,
+                or one value per pixel: (N,) with a single component given, (N, components) otherwise
+            z (optional): layer. Defaults to 0.
+            component (int, optional): only this component is set, all components by default
+        """
+        xs = np.asarray(xs).astype(np.int64).reshape(-1)
+        ys = np.asarray(ys).astype(np.int64).reshape(-1)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        value = np.asarray(value, dtype=np.float32)
+        # a 1D value is per pixel only for a single component, otherwise it holds the components
+        if value.ndim == 2 or (value.ndim == 1 and component is not None and value.shape[0] == len(xs)):
+            value = value[inside]
+        self.pixels[int(z), ys[inside], xs[inside], self.component_slice(component)] = value
+
+    def sample(self, u, v, z = 0, component = None):
+        """Bilinear sampling at normalized texture coordinates, clamped to the edge as GL_CLAMP_TO_EDGE
+
+        Args:
+            u, v: coordinates from [0,1], numbers or arrays of the same shape,
+                pixel centers are at (x + 0.5) / width, (y + 0.5) / height as in OpenGL
+            z (optional): layer. Defaults to 0.
+            component (optional): only this component is sampled, all components by default
+
+        Returns:
+            array of shape u.shape + (components,), or u.shape with component given
+        """
+        u = np.asarray(u, dtype=np.float32)
+        v = np.asarray(v, dtype=np.float32)
+        image = self.pixels[int(z)][..., self.component_slice(component)]
+        fx = np.clip(u * self.width - 0.5, 0, self.width - 1)
+        fy = np.clip(v * self.height - 0.5, 0, self.height - 1)
+        x0 = np.floor(fx).astype(np.int64)
+        y0 = np.floor(fy).astype(np.int64)
+        x1 = np.minimum(x0 + 1, self.width - 1)
+        y1 = np.minimum(y0 + 1, self.height - 1)
+        tx = fx - x0
+        ty = fy - y0
+        if image.ndim == 3:
+            tx = tx[..., None]
+            ty = ty[..., None]
+        top = image[y0, x0] * (1 - tx) + image[y0, x1] * tx
+        bottom = image[y1, x0] * (1 - tx) + image[y1, x1] * tx
+        return top * (1 - ty) + bottom * ty
@@ -2,17 +2,22 @@ from OpenGL.GL import *
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 from . import ShaderUtils, OGLBuffers
-from transforms import Mat4Scale, Mat4Transl, Mat4RotZ
+from transforms import Transform
 import math
+from collections import OrderedDict
             
 class OGLTextRenderer:
-    def __init__(self, width, height, font = None):
+    def __init__(self, width, height, font = None, atlas = False, cache_budget = 1 << 20):
         """Create TextRenderer object
 
         Args:
             width (int):  width of output rendering frame
             height (int): height of output rendering frame
             font (String, optional): font. Defaults to arial.
+            atlas (bool, optional): rasterize glyphs once into an atlas texture and draw
+                every string as one batch of glyph quads. Defaults to False.
+            cache_budget (int, optional): memory budget in bytes of textures of already drawn strings
+                kept for reuse, 0 rasterizes every string on every call. Defaults to 1 MiB.
         """
         self.textureID = -1
         w = width
@@ -33,6 +38,15 @@ class OGLTextRenderer:
         else:
             self.font = font
 
+        self.cache = None
+        if cache_budget > 0:
+            self.cache = StringTextureCache(cache_budget)
+
+        self.atlas = None
+        if atlas:
+            self.atlas = GlyphAtlas(self.font)
+            self.atlas_viewer = AtlasViewer()
+
     def resize(self, width, height):
         """Update size of output rendering frame
         Args:
@@ -45,12 +59,16 @@ class OGLTextRenderer:
             return
         self.width = width
         self.height = height
-        if not glIsTexture(self.textureID): self.textureID = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, self.textureID)
+        if not glIsTexture(self.textureID): self.textureID = self.new_texture()
+
+    def new_texture(self):
+        textureID = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, textureID)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        return textureID
 
     def add_str2d(self, x, y, s):
         """Draw string on 2D coordinates of the raster frame
@@ -60,32 +78,93 @@ class OGLTextRenderer:
             y (int): y position of string in range < 0, height-1 > of raster frame
             s (String): string to draw
         """
-        if s != "":
-            h = math.ceil(self.font.size/8)*8
-            w = int(len(s)*(self.font.size*0.67))
-            self.img = Image.new("RGB", (w,h))
-            draw = ImageDraw.Draw(self.img)
-            draw.rectangle((0, 0, w, h), fill = (0,0,0,0))
-            draw.rectangle((0, 0, w, h), fill = self.bgColor)
-            draw.text((0, 0), s, fill=self.color, font=self.font)
+        if s != "" and self.atlas is not None:
+            self.add_str2d_atlas(x, y, s)
+        elif s != "":
+            if self.cache is not None:
+                key = (s, self.font, tuple(self.color), tuple(self.bgColor))
+                entry = self.cache.get(key)
+                if entry is None:
+                    textureID = self.new_texture()
+                    w, h = self.rasterize(s, textureID)
+                    entry = self.cache.put(key, textureID, w, h)
+                textureID, w, h = entry
+            else:
+                textureID = self.textureID
+                w, h = self.rasterize(s, textureID)
+            glViewport(-self.width, -self.height, 2*self.width, 2*self.height)
 
-            glBindTexture(GL_TEXTURE_2D, self.textureID)
-            img = np.asarray(self.img.convert("RGBA"),dtype=np.ubyte) #convert("RGB")
-            img = np.flipud(img)
-            glBindTexture(GL_TEXTURE_2D, self.textureID)
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+            self.viewer.view(textureID, x/self.width, 1-y/self.height, w/self.width, h/self.height, self.rotationAngle, self.scale)
 
-            #glTexImage2D(GL_TEXTURE_2D,0,GL_RGBA,self.width,self,self.height,0,GL_RGBA,GL_UNSIGNED_BYTE,img)
-            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, w, h, GL_RGBA, GL_UNSIGNED_BYTE, img)
-            glViewport(-self.width, -self.height, 2*self.width, 2*self.height)
+    def rasterize(self, s, textureID):
+        """Draw string with PIL and upload it to the texture, returns its width and height"""
+        h = math.ceil(self.font.size/8)*8
+        w = int(len(s)*(self.font.size*0.67))
+        self.img = Image.new("RGB", (w,h))
+        draw = ImageDraw.Draw(self.img)
+        draw.rectangle((0, 0, w, h), fill = (0,0,0,0))
+        draw.rectangle((0, 0, w, h), fill = self.bgColor)
+        draw.text((0, 0), s, fill=self.color, font=self.font)
+
+        img = np.asarray(self.img.convert("RGBA"),dtype=np.ubyte) #convert("RGB")
+        img = np.flipud(img)
+        glBindTexture(GL_TEXTURE_2D, textureID)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, w, h, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+
+        #glTexImage2D(GL_TEXTURE_2D,0,GL_RGBA,self.width,self,self.height,0,GL_RGBA,GL_UNSIGNED_BYTE,img)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, w, h, GL_RGBA, GL_UNSIGNED_BYTE, img)
+        return w, h
 
-            self.viewer.view(self.textureID, x/self.width, 1-y/self.height, w/self.width, h/self.height, self.rotationAngle, self.scale)
+    def add_str2d_atlas(self, x, y, s):
+        """Draw string as glyph quads textured from the atlas, one draw call per string"""
+        if self.atlas_viewer.batching and any(c not in self.atlas.glyphs for c in s):
+            # queued strings use texture coordinates of the current atlas layout
+            glViewport(0, 0, self.width, self.height)
+            self.atlas_viewer.flush()
+        glyphs = self.atlas.glyph_indices(s)
+        advance = self.atlas.advances[glyphs]
+        left = np.cumsum(advance) - advance
+        right = left + advance
+        h = self.atlas.height
+        u0, v0, u1, v1 = self.atlas.uv[glyphs].T
+
+        # two triangles per glyph (bottom left, bottom right, top left), (top left, bottom right, top right)
+        # in y-up pixel coordinates relative to the bottom left corner of the string
+        lx = np.stack((left, right, left, left, right, right), axis=1)
+        ly = np.tile(np.array([0, 0, h, h, 0, h], dtype=np.float32), (len(glyphs), 1))
+        tu = np.stack((u0, u1, u0, u0, u1, u1), axis=1)
+        tv = np.stack((v1, v1, v0, v0, v1, v0), axis=1)
+
+        cos = math.cos(self.rotationAngle) * self.scale
+        sin = math.sin(self.rotationAngle) * self.scale
+        px = x + lx * cos - ly * sin
+        py = y - lx * sin - ly * cos
+        vertices = np.stack((2 * px / self.width - 1, 1 - 2 * py / self.height, tu, tv), axis=-1)
+
+        glViewport(0, 0, self.width, self.height)
+        self.atlas_viewer.view(self.atlas.textureID, vertices.reshape(-1, 4).astype(np.float32), self.color, self.bgColor)
+
+    def begin_batch(self):
+        """Following strings are drawn with the shader program and state set once,
+        strings of the glyph atlas are collected and drawn together by end_batch"""
+        self.viewer.begin_batch()
+        if self.atlas is not None:
+            self.atlas_viewer.begin_batch()
+
+    def end_batch(self):
+        """Draw strings collected since begin_batch, returns number of draw calls"""
+        draw_calls = self.viewer.end_batch()
+        if self.atlas is not None:
+            glViewport(0, 0, self.width, self.height)
+            draw_calls += self.atlas_viewer.end_batch()
+        return draw_calls
                 
  
 class Viewer:
 
     def __init__(self):
         self.buffers = self.create_buffers()
+        self.transform = Transform()
         
         self.SHADER_FRAG_SRC = [
                 "#version 330\n", 
@@ -109,7 +188,12 @@ class Viewer:
         ]
 
         self.shaderProgram = ShaderUtils.load_program_src(self.SHADER_VERT_SRC, self.SHADER_FRAG_SRC)
-        self.locMat = glGetUniformLocation(self.shaderProgram, "matTrans")
+        self.locMat = ShaderUtils.get_uniform_location(self.shaderProgram, "matTrans")
+        self.locTexture = ShaderUtils.get_uniform_location(self.shaderProgram, "drawTexture")
+
+        self.batching = False
+        self.saved_program = None # program to restore, None when the state is not set
+        self.draw_calls = 0 # since begin_batch
 
     def create_buffers(self):
         vertexBufferData = [
@@ -123,27 +207,254 @@ class Viewer:
 
         return OGLBuffers.OGLBuffers(vertexBufferData, None, attributes, indexBufferData)
 
+    def begin_batch(self):
+        """Following views share the shader program and state, set by the first of them"""
+        self.batching = True
+        self.draw_calls = 0
+
+    def end_batch(self):
+        """Restore the state changed since begin_batch, returns number of draw calls"""
+        self.batching = False
+        self.end_state()
+        return self.draw_calls
+
+    def begin_state(self):
+        #glPushAttrib(GL_DEPTH_BUFFER_BIT|GL_ENABLE_BIT)
+        self.saved_program = glGetIntegerv(GL_CURRENT_PROGRAM)
+        glUseProgram(self.shaderProgram)
+        glActiveTexture(GL_TEXTURE0)
+        glEnable(GL_TEXTURE_2D)
+        glEnable(GL_BLEND)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_CULL_FACE)
+        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glUniform1i(self.locTexture, 0)
+
+    def end_state(self):
+        if self.saved_program is None:
+            return
+        glDisable(GL_TEXTURE_2D)
+        glDisable(GL_BLEND)
+        glUseProgram(self.saved_program)
+        self.saved_program = None
+        #glPopAttrib()
+
     def view(self, textureID, x, y, w, h, rotationAngle, scale):
+        if self.saved_program is None:
+            if not glIsProgram(self.shaderProgram):
+                return
+            self.begin_state()
+        # folded again only when the string placement changes
+        self.transform.reset().scale(w * scale, h * scale, 1).rotate_z(rotationAngle).translate(x, y, 0)
+        ShaderUtils.uniform_mat4(self.locMat, self.transform)
+        glBindTexture(GL_TEXTURE_2D, textureID)
+        self.buffers.draw(GL_TRIANGLE_STRIP, self.shaderProgram)
+        self.draw_calls += 1
+        if not self.batching:
+            self.end_state()
+
+
+class StringTextureCache:
+    """Least recently used cache of uploaded string textures limited by memory budget in bytes"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.entries = OrderedDict() # key -> (textureID, width, height)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns (textureID, width, height) of cached string or None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, textureID, width, height):
+        """Store texture of a string, least recently used textures are deleted to stay within budget"""
+        self.entries[key] = (textureID, width, height)
+        self.bytes += width * height * 4
+        while self.bytes > self.budget and len(self.entries) > 1:
+            _, (oldID, oldWidth, oldHeight) = self.entries.popitem(last = False)
+            glDeleteTextures(1, [oldID])
+            self.bytes -= oldWidth * oldHeight * 4
+            self.evictions += 1
+        return self.entries[key]
+
+    def clear(self):
+        """Delete all cached textures"""
+        for textureID, _, _ in self.entries.values():
+            glDeleteTextures(1, [textureID])
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.bytes, "budget": self.budget,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class GlyphAtlas:
+    """Glyphs of a font rasterized once into a single-channel texture,
+    characters missing in the atlas are added on first use
+    """
+    ATLAS_WIDTH = 512
+
+    def __init__(self, font, chars = None):
+        self.font = font
+        self.height = math.ceil(font.size/8)*8 # same line height as OGLTextRenderer.add_str2d
+        self.textureID = glGenTextures(1)
+        if chars is None:
+            chars = [chr(c) for c in range(32, 127)]
+        self.build(chars)
+
+    def build(self, chars):
+        """Rasterize given characters and upload the atlas texture"""
+        self.chars = list(dict.fromkeys(chars))
+        self.glyphs = {c: i for i, c in enumerate(self.chars)}
+        advances = [max(int(math.ceil(self.font.getlength(c))), 1) for c in self.chars]
+
+        # rows of glyph cells, one pixel gap between cells keeps linear filtering from bleeding
+        positions = []
+        x = y = 0
+        for advance in advances:
+            if x + advance > self.ATLAS_WIDTH:
+                x = 0
+                y += self.height + 1
+            positions.append((x, y))
+            x += advance + 1
+        atlas_height = 1
+        while atlas_height < y + self.height:
+            atlas_height *= 2
+
+        img = Image.new("L", (self.ATLAS_WIDTH, atlas_height), 0)
+        for c, advance, position in zip(self.chars, advances, positions):
+            cell = Image.new("L", (advance, self.height), 0)
+            ImageDraw.Draw(cell).text((0, 0), c, fill=255, font=self.font)
+            img.paste(cell, position)
+
+        self.advances = np.array(advances, dtype=np.float32)
+        pos = np.array(positions, dtype=np.float32)
+        self.uv = np.stack((pos[:, 0] / self.ATLAS_WIDTH, pos[:, 1] / atlas_height,
+                (pos[:, 0] + self.advances) / self.ATLAS_WIDTH, (pos[:, 1] + self.height) / atlas_height), axis=1)
+
+        glBindTexture(GL_TEXTURE_2D, self.textureID)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_R8, self.ATLAS_WIDTH, atlas_height, 0, GL_RED, GL_UNSIGNED_BYTE, np.asarray(img, dtype=np.ubyte))
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+    def glyph_indices(self, s):
+        """Returns atlas indices of characters of the string"""
+        missing = [c for c in s if c not in self.glyphs]
+        if len(missing) > 0:
+            self.build(self.chars + missing)
+        return np.fromiter((self.glyphs[c] for c in s), dtype=np.int64, count=len(s))
+
+
+class AtlasViewer:
+
+    def __init__(self):
+        self.SHADER_FRAG_SRC = [
+                "#version 330\n", 
+                "in vec2 texCoords;", 
+                "in vec4 color;", 
+                "in vec4 bgColor;", 
+                "out vec4 fragColor;", 
+                "uniform sampler2D drawTexture;", 
+                "void main() {", 
+                "     fragColor = mix(bgColor, color, texture(drawTexture, texCoords).r);", 
+                "}"
+        ]
+        self.SHADER_VERT_SRC = [
+                "#version 330\n", 
+                "in vec2 inPosition;", 
+                "in vec2 inTexCoord;", 
+                "in vec4 inColor;", 
+                "in vec4 inBgColor;", 
+                "out vec2 texCoords;", 
+                "out vec4 color;", 
+                "out vec4 bgColor;", 
+                "void main() {", 
+                "    gl_Position = vec4(inPosition , 0.0f, 1.0f);", 
+                "   texCoords = inTexCoord;", 
+                "   color = inColor;", 
+                "   bgColor = inBgColor;", 
+                "}"
+        ]
+
+        self.shaderProgram = ShaderUtils.load_program_src(self.SHADER_VERT_SRC, self.SHADER_FRAG_SRC)
+        self.locTexture = ShaderUtils.get_uniform_location(self.shaderProgram, "drawTexture")
+
+        # streamed buffer of (x, y, u, v, color, bgColor) vertices, refilled for every batch
+        self.vertexBuffer = glGenBuffers(1)
+        self.vertexArray = glGenVertexArrays(1)
+        glBindVertexArray(self.vertexArray)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertexBuffer)
+        for name, size, offset in (("inPosition", 2, 0), ("inTexCoord", 2, 8), ("inColor", 4, 16), ("inBgColor", 4, 32)):
+            location = ShaderUtils.get_attrib_location(self.shaderProgram, name)
+            if location >= 0:
+                glEnableVertexAttribArray(location)
+                glVertexAttribPointer(location, size, GL_FLOAT, False, 48, ctypes.c_void_p(offset))
+        glBindVertexArray(0)
+
+        self.textureID = None
+        self.strings = [] # vertices of strings queued since begin_batch
+        self.batching = False
+        self.draw_calls = 0 # since begin_batch
+
+    def begin_batch(self):
+        """Following views are collected and drawn with one draw call by end_batch"""
+        self.batching = True
+        self.draw_calls = 0
+
+    def end_batch(self):
+        """Draw strings collected since begin_batch, returns number of draw calls"""
+        self.batching = False
+        self.flush()
+        return self.draw_calls
+
+    def view(self, textureID, vertices, color, bgColor):
+        """Queue (x, y, u, v) vertices of a string, drawn right away when not batching"""
+        colored = np.empty((len(vertices), 12), dtype=np.float32)
+        colored[:, 0:4] = vertices
+        colored[:, 4:8] = np.array(color, dtype=np.float32) / 255
+        colored[:, 8:12] = np.array(bgColor, dtype=np.float32) / 255
+        self.textureID = textureID
+        self.strings.append(colored)
+        if not self.batching:
+            self.flush()
+
+    def flush(self):
+        """Draw all queued strings"""
+        if len(self.strings) == 0:
+            return
+        vertices = np.concatenate(self.strings)
+        self.strings = []
         if glIsProgram(self.shaderProgram):
-            #glPushAttrib(GL_DEPTH_BUFFER_BIT|GL_ENABLE_BIT)
             sp = glGetIntegerv(GL_CURRENT_PROGRAM)
             glUseProgram(self.shaderProgram)
             glActiveTexture(GL_TEXTURE0)
-            glEnable(GL_TEXTURE_2D)
             glEnable(GL_BLEND)
             glDisable(GL_DEPTH_TEST)
             glDisable(GL_CULL_FACE)
             glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
             glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-            scale_mat = Mat4Scale(w,h,1)
-            scale_scale_mat = Mat4Scale(scale)
-            rot_mat = Mat4RotZ(rotationAngle)
-            transl_mat = Mat4Transl(x,y,0)
-            glUniformMatrix4fv(self.locMat, 1, False, scale_mat.mul_mat4(scale_scale_mat).mul_mat4(rot_mat).mul_mat4(transl_mat).to_4x4array())
-            glBindTexture(GL_TEXTURE_2D, textureID)
-            glUniform1i(glGetUniformLocation(self.shaderProgram, "drawTexture"), 0)
-            self.buffers.draw(GL_TRIANGLE_STRIP, self.shaderProgram)
-            glDisable(GL_TEXTURE_2D)
+            glBindTexture(GL_TEXTURE_2D, self.textureID)
+            glUniform1i(self.locTexture, 0)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vertexBuffer)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STREAM_DRAW)
+            glBindVertexArray(self.vertexArray)
+            glDrawArrays(GL_TRIANGLES, 0, len(vertices))
+            self.draw_calls += 1
+            glBindVertexArray(0)
             glDisable(GL_BLEND)
             glUseProgram(sp)
-            #glPopAttrib()
\ No newline at end of file
@@ -1,16 +1,121 @@
 from OpenGL.GL import *
 from OpenGL.GLU import *
-from . import ShaderUtils, OGLBuffers, OGLTexImageFloat
+from OpenGL.GL.EXT.texture_compression_s3tc import GL_COMPRESSED_RGBA_S3TC_DXT5_EXT
+from . import ShaderUtils, OGLBuffers, OGLTexImageFloat, OGLPixelBufferRing, OGLUtils
 from PIL import Image
+from collections import deque
 import numpy as np
-from transforms import Vec2D, Mat4Scale, Mat4Transl
+from transforms import Vec2D
+
+# buffers in the pixel buffer rings of a texture (triple buffering)
+PIXEL_BUFFER_COUNT = 3
+
+# mip chain options of from_rgba and from_file
+MIPMAPS_NONE = 0
+MIPMAPS_GPU = 1      # glGenerateMipmap
+MIPMAPS_BOX = 2      # 2x2 average on the CPU
+MIPMAPS_LANCZOS = 3  # PIL Lanczos resampling of the base level on the CPU
+
+# compression name -> (internal format by number of used channels, OpenGL version with the formats in core, extension)
+COMPRESSED_FORMATS = {
+    "bptc": ({1: GL_COMPRESSED_RGBA_BPTC_UNORM, 2: GL_COMPRESSED_RGBA_BPTC_UNORM, 3: GL_COMPRESSED_RGBA_BPTC_UNORM,
+        4: GL_COMPRESSED_RGBA_BPTC_UNORM}, 420, "GL_ARB_texture_compression_bptc"),
+    # red (and green) only, e.g. height or normal maps
+    "rgtc": ({1: GL_COMPRESSED_RED_RGTC1, 2: GL_COMPRESSED_RG_RGTC2}, 300, "GL_ARB_texture_compression_rgtc"),
+    "s3tc": ({1: GL_COMPRESSED_RGBA_S3TC_DXT5_EXT, 2: GL_COMPRESSED_RGBA_S3TC_DXT5_EXT, 3: GL_COMPRESSED_RGBA_S3TC_DXT5_EXT,
+        4: GL_COMPRESSED_RGBA_S3TC_DXT5_EXT}, None, "GL_EXT_texture_compression_s3tc"),
+}
+
+extensions = None
+
+def is_supported(version, extension):
+    """Returns True if the current OpenGL has the given version or extension"""
+    global extensions
+    if extensions is None:
+        extensions = OGLUtils.get_extensions().split()
+    return (version is not None and OGLUtils.get_version_OpenGL() >= version) or extension in extensions
+
+def compressed_internal_format(compression, channels = 4):
+    """Returns internal format of the compression name from COMPRESSED_FORMATS for data using
+    the given number of channels (red, green, blue, alpha), GL_RGBA8 when not supported"""
+    if compression is None:
+        return GL_RGBA8
+    if compression not in COMPRESSED_FORMATS:
+        print("Unknown texture compression: ", compression)
+        return GL_RGBA8
+    internalFormats, version, extension = COMPRESSED_FORMATS[compression]
+    if channels not in internalFormats:
+        print("Texture compression", compression, "cannot store", channels, "channels, not compressed")
+        return GL_RGBA8
+    if not is_supported(version, extension):
+        print("Texture compression not supported: ", compression)
+        return GL_RGBA8
+    return internalFormats[channels]
+
+def mip_level_size(width, height, level):
+    return max(1, width >> level), max(1, height >> level)
+
+def mip_level_count(width, height):
+    return max(width, height).bit_length()
+
+def box_downsample(data):
+    """Returns (height/2, width/2, 4) ubyte average of 2x2 blocks, an odd last row or column is dropped"""
+    h, w = data.shape[0], data.shape[1]
+    w2, h2 = mip_level_size(w, h, 1)
+    s = data.astype(np.uint16)
+    s = s[0:2*h2:2] + s[1:2*h2:2] if h > 1 else s * 2
+    s = s[:, 0:2*w2:2] + s[:, 1:2*w2:2] if w > 1 else s * 2
+    return ((s + 2) >> 2).astype(np.ubyte)
+
+def mip_chain(data, mipmaps = MIPMAPS_BOX):
+    """Returns list of (height, width, 4) ubyte arrays of all mip levels, the first is data
+
+    Args:
+        data: (height, width, 4) ubyte RGBA data of the base level
+        mipmaps (int, optional): MIPMAPS_BOX builds each level from the previous one,
+            MIPMAPS_LANCZOS resamples the base level. Defaults to MIPMAPS_BOX.
+    """
+    h, w = data.shape[0], data.shape[1]
+    levels = [data]
+    if mipmaps == MIPMAPS_LANCZOS:
+        image = Image.fromarray(np.ascontiguousarray(data), "RGBA")
+    for level in range(1, mip_level_count(w, h)):
+        if mipmaps == MIPMAPS_LANCZOS:
+            levels.append(np.asarray(image.resize(mip_level_size(w, h, level), Image.LANCZOS), dtype=np.ubyte))
+        else:
+            levels.append(box_downsample(levels[-1]))
+    return levels
 
 class OGLTexture2D:
+
+    # bytes moved between the application and OpenGL by this texture, see transfer_stats
+    last_transfer_bytes = 0
+    bytes_uploaded = 0
+    bytes_read_back = 0
+    # bytes of buffers that had to be converted to the pixel type before an upload
+    bytes_converted = 0
+    # pixel buffer rings for streaming, created on first use
+    upload_ring = None
+    pack_ring = None
+    # (buffer index, width, height) of readbacks in flight
+    readbacks = ()
+    # number of mip levels and internal format of textures created by from_rgba
+    levels = 1
+    mipmaps = MIPMAPS_NONE
+    internal_format = GL_RGBA8
+    # base level data kept by from_rgba with keep_data
+    rgba = None
     
     class Viewer: #implements OGLTexture.Viewer
         def __init__(self, shaderProgram = None):
             self.buffers = self.create_buffers()
             self.shaderProgram = shaderProgram 
+            self.batch = None
+            self.batching = False
+            # SpriteBatch draws with its own shader, a custom one is used for single views only
+            self.customShader = shaderProgram is not None
+            self.draw_calls = 0 # since begin_batch with a custom shader
+            self.saved_program = None # restored by end_batch with a custom shader
             
             self.SHADER_VERT_SRC = [
                     "#version 330\n", 
@@ -38,8 +143,9 @@ class OGLTexture2D:
             if shaderProgram == None:
                 self.shaderProgram = ShaderUtils.load_program_src(self.SHADER_VERT_SRC, self.SHADER_FRAG_SRC)
                 
-            self.locMat = glGetUniformLocation(self.shaderProgram, "matTrans")
-            self.locLevel = glGetUniformLocation(self.shaderProgram, "level")
+            self.locMat = ShaderUtils.get_uniform_location(self.shaderProgram, "matTrans")
+            self.locLevel = ShaderUtils.get_uniform_location(self.shaderProgram, "level")
+            self.locTexture = ShaderUtils.get_uniform_location(self.shaderProgram, "drawTexture")
         
         def create_buffers(self):
             vertexBufferData = [
@@ -54,27 +160,172 @@ class OGLTexture2D:
             return OGLBuffers.OGLBuffers(vertexBufferData, None, attributes, indexBufferData)
         
         def view(self, textureID, x = -1, y = -1, scale = 1, aspectXY = 1, level = -1):
-            self.view_vec2d(textureID, Vec2D(x, y), Vec2D(scale*aspectXY, scale), level)
-        
+            if self.batching:
+                self.batch.view(textureID, x, y, scale, aspectXY, level)
+            else:
+                self.view_vec2d(textureID, Vec2D(x, y), Vec2D(scale*aspectXY, scale), level)
+
+        def begin_batch(self):
+            """Following view calls are collected and drawn together by end_batch,
+            with a custom shader program they are drawn one by one right away,
+            the program is set once for all of them"""
+            self.draw_calls = 0
+            if self.customShader:
+                if glIsProgram(self.shaderProgram):
+                    self.saved_program = glGetIntegerv(GL_CURRENT_PROGRAM)
+                    glUseProgram(self.shaderProgram)
+                return
+            if self.batch is None:
+                self.batch = OGLTexture2D.SpriteBatch()
+            self.batching = True
+
+        def end_batch(self):
+            """Draw textures collected since begin_batch, returns number of draw calls"""
+            if self.saved_program is not None:
+                glUseProgram(self.saved_program)
+                self.saved_program = None
+            if not self.batching:
+                return self.draw_calls
+            self.batching = False
+            return self.batch.flush()
 
         def view_vec2d(self, textureID, xy, scale, level):
-            if glIsProgram(self.shaderProgram):
+            if self.batching:
+                self.batch.view(textureID, xy.x, xy.y, scale.y, scale.x / scale.y, level)
+            elif self.saved_program is not None or glIsProgram(self.shaderProgram):
                 #glPushAttrib(GL_DEPTH_BUFFER_BIT|GL_ENABLE_BIT)
-                sp = glGetIntegerv(GL_CURRENT_PROGRAM)
-                glUseProgram(self.shaderProgram)
+                # inside a batch the program is already set by begin_batch
+                single = self.saved_program is None
+                if single:
+                    sp = glGetIntegerv(GL_CURRENT_PROGRAM)
+                    glUseProgram(self.shaderProgram)
                 glActiveTexture(GL_TEXTURE0)
                 glEnable(GL_TEXTURE_2D)
-                scale_mat = Mat4Scale(scale.x, scale.y, 1)
-                transl_mat = Mat4Transl(xy.x, xy.y, 0)
-                glUniformMatrix4fv(self.locMat, 1, False, scale_mat.mul_mat4(transl_mat).to_4x4array())
+                # Mat4Scale(scale.x, scale.y, 1).mul_mat4(Mat4Transl(xy.x, xy.y, 0))
+                mat = np.array([[scale.x, 0, 0, 0], [0, scale.y, 0, 0], [0, 0, 1, 0], [xy.x, xy.y, 0, 1]], dtype=np.float32)
+                glUniformMatrix4fv(self.locMat, 1, False, mat)
                 glUniform1i(self.locLevel, int(level))
                 glBindTexture(GL_TEXTURE_2D, textureID)
-                glUniform1i(glGetUniformLocation(self.shaderProgram, "drawTexture"), 0)
+                glUniform1i(self.locTexture, 0)
                 self.buffers.draw(GL_TRIANGLE_STRIP, self.shaderProgram)
+                self.draw_calls += 1
                 glDisable(GL_TEXTURE_2D)
-                glUseProgram(sp)
+                if single:
+                    glUseProgram(sp)
                 #glPopAttrib()
 
+    class SpriteBatch:
+        """Collects textured quads of a frame into one streamed vertex buffer (position, texture
+        coordinates, texture slot, level) and draws them with as few draw calls as possible.
+        Up to MAX_TEXTURES different textures are bound to texture units for one draw call,
+        quads keep their order.
+        """
+        MAX_TEXTURES = 8
+
+        # corners of the unit quad as two triangles
+        CORNERS = np.array([[0, 0], [1, 0], [0, 1], [0, 1], [1, 0], [1, 1]], dtype=np.float32)
+
+        def __init__(self):
+            self.SHADER_VERT_SRC = [
+                    "#version 330\n", 
+                    "in vec2 inPosition;\n", 
+                    "in vec2 inTexCoord;\n", 
+                    "in float inSlot;\n", 
+                    "in float inLevel;\n", 
+                    "out vec2 texCoords;\n", 
+                    "flat out int slot;\n", 
+                    "flat out float level;\n", 
+                    "void main() {\n", 
+                    "    gl_Position = vec4(inPosition , 0.0f, 1.0f);\n", 
+                    "    texCoords = inTexCoord;\n", 
+                    "    slot = int(inSlot);\n", 
+                    "    level = inLevel;\n", 
+                    "}"]
+
+            # samplers of an array may only be indexed by a constant expression
+            self.SHADER_FRAG_SRC = [
+                    "#version 330\n", 
+                    "in vec2 texCoords;\n", 
+                    "flat in int slot;\n", 
+                    "flat in float level;\n", 
+                    "out vec4 fragColor;\n", 
+                    f"uniform sampler2D drawTexture[{self.MAX_TEXTURES}];\n", 
+                    "void main() {\n"]
+            for i in range(self.MAX_TEXTURES):
+                self.SHADER_FRAG_SRC += [
+                    f"     if (slot == {i})\n", 
+                    f"         fragColor = level >= 0 ? textureLod(drawTexture[{i}], texCoords, level) : texture(drawTexture[{i}], texCoords);\n"]
+            self.SHADER_FRAG_SRC += ["}"]
+
+            self.shaderProgram = ShaderUtils.load_program_src(self.SHADER_VERT_SRC, self.SHADER_FRAG_SRC)
+            self.locTexture = ShaderUtils.get_uniform_location(self.shaderProgram, "drawTexture")
+
+            self.vertexBuffer = glGenBuffers(1)
+            self.vertexArray = glGenVertexArrays(1)
+            glBindVertexArray(self.vertexArray)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vertexBuffer)
+            for name, size, offset in (("inPosition", 2, 0), ("inTexCoord", 2, 8), ("inSlot", 1, 16), ("inLevel", 1, 20)):
+                location = ShaderUtils.get_attrib_location(self.shaderProgram, name)
+                if location >= 0:
+                    glEnableVertexAttribArray(location)
+                    glVertexAttribPointer(location, size, GL_FLOAT, False, 24, ctypes.c_void_p(offset))
+            glBindVertexArray(0)
+
+            self.quads = []
+            self.draw_calls = 0 # of the last flush
+            self.quad_count = 0 # of the last flush
+
+        def view(self, textureID, x = -1, y = -1, scale = 1, aspectXY = 1, level = -1):
+            """Queue texture quad, same parameters as Viewer.view"""
+            self.quads.append((int(textureID), x, y, scale * aspectXY, scale, level))
+
+        def flush(self):
+            """Draw all queued quads, returns number of draw calls"""
+            self.quad_count = len(self.quads)
+            self.draw_calls = 0
+            if len(self.quads) == 0:
+                return 0
+
+            # texture slot of each quad, new draw call whenever all texture units are taken
+            batches = [] # (first quad, textures bound to units)
+            slots = []
+            units = {}
+            for i, quad in enumerate(self.quads):
+                if quad[0] not in units:
+                    if len(units) == self.MAX_TEXTURES:
+                        units = {}
+                    if len(units) == 0:
+                        batches.append((i, units))
+                    units[quad[0]] = len(units)
+                slots.append(units[quad[0]])
+
+            data = np.array([quad[1:] for quad in self.quads], dtype=np.float32)
+            vertices = np.empty((len(self.quads), 6, 6), dtype=np.float32)
+            vertices[:, :, 0:2] = data[:, None, 0:2] + self.CORNERS[None, :, :] * data[:, None, 2:4]
+            vertices[:, :, 2:4] = self.CORNERS
+            vertices[:, :, 4] = np.array(slots, dtype=np.float32)[:, None]
+            vertices[:, :, 5] = data[:, None, 4]
+
+            sp = glGetIntegerv(GL_CURRENT_PROGRAM)
+            glUseProgram(self.shaderProgram)
+            glUniform1iv(self.locTexture, self.MAX_TEXTURES, np.arange(self.MAX_TEXTURES, dtype=np.int32))
+            glBindBuffer(GL_ARRAY_BUFFER, self.vertexBuffer)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STREAM_DRAW)
+            glBindVertexArray(self.vertexArray)
+            for b, (first, units) in enumerate(batches):
+                last = batches[b + 1][0] if b + 1 < len(batches) else len(self.quads)
+                for textureID, unit in units.items():
+                    glActiveTexture(GL_TEXTURE0 + unit)
+                    glBindTexture(GL_TEXTURE_2D, textureID)
+                glDrawArrays(GL_TRIANGLES, first * 6, (last - first) * 6)
+                self.draw_calls += 1
+            glBindVertexArray(0)
+            glActiveTexture(GL_TEXTURE0)
+            glUseProgram(sp)
+
+            self.quads = []
+            return self.draw_calls
+
         #def finalize() throws Throwable {
         #    super.finalize()
         #    //if (glIsProgram(shaderProgram))
@@ -104,12 +355,16 @@ class OGLTexture2D:
                 image.get_format().get_pixel_type(),  image.get_data_buffer())
         return self
 
-    def from_raw(self, width, height, internalFormat, pixelFormat, pixelType, buffer):
+    def from_raw(self, width, height, internalFormat, pixelFormat, pixelType, buffer, mipmaps = MIPMAPS_NONE):
+        """Creates the texture from raw data, mipmaps may be MIPMAPS_GPU only"""
         self.width = width
         self.height = height
         
         self.textureID = glGenTextures(1)
         glBindTexture(GL_TEXTURE_2D, self.textureID)
+        if buffer is not None:
+            buffer = self.gl_array(buffer, np.float32 if pixelType == GL_FLOAT else np.ubyte)
+            self.count_transfer(buffer.nbytes, 0)
         if (pixelType == GL_FLOAT):
             glTexImage2D(GL_TEXTURE_2D, 0, internalFormat, width, height, 0, pixelFormat, pixelType, buffer)
         if (pixelType == GL_UNSIGNED_BYTE):
@@ -118,10 +373,16 @@ class OGLTexture2D:
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        if mipmaps == MIPMAPS_GPU:
+            self.mipmaps = mipmaps
+            self.generate_mipmaps()
+            self.set_filtering()
         
         return self
     
-    def from_file(self, fileName):
+    def from_file(self, fileName, mipmaps = MIPMAPS_NONE, compression = None, anisotropy = None, channels = 4,
+            keep_data = False):
+        """Creates the texture from the image file, see from_rgba for the options"""
         print("Reading texture file ", fileName, end="... ")
         
         self.image = Image.open(fileName)
@@ -130,24 +391,115 @@ class OGLTexture2D:
         data = np.asarray(self.image.convert("RGBA"),dtype=np.ubyte)
         
         print("OK [" + str(w) + "x" + str(h) + "]")
+        return self.from_rgba(data, mipmaps, compression, anisotropy, channels, keep_data)
 
-        self.width = w
-        self.height = h
+    def from_rgba(self, data, mipmaps = MIPMAPS_NONE, compression = None, anisotropy = None, channels = 4,
+            keep_data = False):
+        """Creates the texture from RGBA data, e.g. decoded by OGLTextureLoader
+
+        Args:
+            data: (height, width, 4) ubyte array, or list of such arrays of all mip levels (see mip_chain)
+            mipmaps (int, optional): MIPMAPS_NONE, MIPMAPS_GPU, MIPMAPS_BOX or MIPMAPS_LANCZOS,
+                ignored when data hold the levels. Defaults to MIPMAPS_NONE.
+            compression (str, optional): key of COMPRESSED_FORMATS, the driver compresses the data
+                on upload, GL_RGBA8 is used when not supported. Defaults to None.
+            anisotropy (float, optional): maximal anisotropy of the sampling, see set_filtering. Defaults to None.
+            channels (int, optional): number of channels holding data, e.g. 1 for a height map,
+                "rgtc" compression keeps red (and green) only and requires 1 or 2. Defaults to 4.
+            keep_data (bool, optional): keep a copy of the base level in rgba, e.g. for repeated flip_y,
+                otherwise no reference to data (possibly memory mapped) outlives the upload. Defaults to False.
+        """
+        levels = list(data) if isinstance(data, (list, tuple)) else [data]
+        self.height = levels[0].shape[0]
+        self.width = levels[0].shape[1]
+        self.internal_format = compressed_internal_format(compression, channels)
+        # mipmaps of compressed formats cannot be rendered by glGenerateMipmap
+        if mipmaps == MIPMAPS_GPU and self.internal_format != GL_RGBA8:
+            mipmaps = MIPMAPS_BOX
+        if len(levels) == 1 and mipmaps in (MIPMAPS_BOX, MIPMAPS_LANCZOS):
+            levels = mip_chain(levels[0], mipmaps)
+        elif len(levels) > 1 and mipmaps not in (MIPMAPS_BOX, MIPMAPS_LANCZOS):
+            mipmaps = MIPMAPS_BOX
+        self.mipmaps = mipmaps
         self.textureID = glGenTextures(1)
         
-        glBindTexture(GL_TEXTURE_2D, self.textureID)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.width, self.height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        self.upload_rgba(levels)
+        self.rgba = np.array(levels[0], dtype=np.ubyte) if keep_data else None
+        self.levels = len(levels)
+        if mipmaps == MIPMAPS_GPU:
+            self.generate_mipmaps()
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        self.set_filtering(anisotropy = anisotropy)
         return self
 
-    def flip_y(self):
-        self.image = self.image.transpose(Image.FLIP_TOP_BOTTOM)
-        data = np.asarray(self.image.convert("RGBA"),dtype=np.ubyte)
+    def upload_rgba(self, levels):
+        """Uploads the given mip levels"""
+        glBindTexture(GL_TEXTURE_2D, self.textureID)
+        for level, data in enumerate(levels):
+            data = self.gl_array(data, np.ubyte)
+            glTexImage2D(GL_TEXTURE_2D, level, self.internal_format, data.shape[1], data.shape[0], 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+            self.count_transfer(data.nbytes, 0)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(levels) - 1)
+
+    def generate_mipmaps(self):
+        """Builds all mip levels from the base level on the GPU"""
+        glBindTexture(GL_TEXTURE_2D, self.textureID)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, mip_level_count(self.width, self.height) - 1)
+        glGenerateMipmap(GL_TEXTURE_2D)
+        self.levels = mip_level_count(self.width, self.height)
+
+    def set_filtering(self, trilinear = True, anisotropy = None):
+        """Sets minification filter, trilinear when the texture has mip levels
+
+        Args:
+            trilinear (bool, optional): interpolate between mip levels, otherwise use the nearest one. Defaults to True.
+            anisotropy (float, optional): maximal anisotropy, clamped to the limit of the driver,
+                ignored without anisotropic filtering support. Defaults to None.
+        """
+        glBindTexture(GL_TEXTURE_2D, self.textureID)
+        if self.levels <= 1:
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        elif trilinear:
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+        else:
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_NEAREST)
+        if anisotropy is not None and is_supported(460, "GL_EXT_texture_filter_anisotropic"):
+            limit = float(glGetFloatv(GL_MAX_TEXTURE_MAX_ANISOTROPY))
+            glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAX_ANISOTROPY, min(float(anisotropy), limit))
+
+    def get_memory_size(self):
+        """Returns bytes of all mip levels in the texture memory as reported by the driver"""
         glBindTexture(GL_TEXTURE_2D, self.textureID)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.width, self.height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        size = 0
+        for level in range(self.levels):
+            if glGetTexLevelParameteriv(GL_TEXTURE_2D, level, GL_TEXTURE_COMPRESSED):
+                size += int(glGetTexLevelParameteriv(GL_TEXTURE_2D, level, GL_TEXTURE_COMPRESSED_IMAGE_SIZE))
+            else:
+                w, h = mip_level_size(self.width, self.height, level)
+                size += w * h * 4
+        return size
+
+    def flip_y(self):
+        """Flips the texture upside down, the base level is read back from the GPU unless kept in rgba"""
+        if self.rgba is not None:
+            data = self.rgba[::-1]
+        else:
+            data = np.empty((self.height, self.width, 4), dtype=np.ubyte)
+            self.bind()
+            glGetTexImage(GL_TEXTURE_2D, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+            self.count_transfer(0, data.nbytes)
+            data = data[::-1]
+        data = np.ascontiguousarray(data)
+        if self.rgba is not None:
+            self.rgba = data
+        if self.mipmaps in (MIPMAPS_BOX, MIPMAPS_LANCZOS):
+            self.upload_rgba(mip_chain(data, self.mipmaps))
+        else:
+            self.upload_rgba([data])
+        if self.mipmaps == MIPMAPS_GPU:
+            self.generate_mipmaps()
 
     def bind(self):
         glBindTexture(GL_TEXTURE_2D, self.textureID)
@@ -155,7 +507,7 @@ class OGLTexture2D:
     def bind_slot(self, shaderProgram, name, slot):
         glActiveTexture(GL_TEXTURE0 + slot)
         self.bind()
-        loc = int(glGetUniformLocation(shaderProgram, name))
+        loc = ShaderUtils.get_uniform_location(shaderProgram, name)
         glUniform1i(loc, slot)
 
     def bind_name(self, shaderProgram, name):
@@ -171,12 +523,23 @@ class OGLTexture2D:
         glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.width, self.height, GL_RGBA, 
                 GL_UNSIGNED_INT_8_8_8_8_REV, img)
 
-    def get_texture_buffer(self,format, level = 0):
+    def get_texture_buffer(self, format, level = 0, out = None):
+        """Reads the texture level into a float32 buffer
+
+        Args:
+            format (Format): format of the read data
+            level (int, optional): mipmap level. Defaults to 0.
+            out (optional): preallocated contiguous float32 array of the level size, the data are
+                read directly into it. A new buffer is allocated when not given or not usable.
+        """
         self.bind()
         if isinstance(format,OGLTexImageFloat.Format):
-            buffer = format.new_buffer(self.width >> level, self.height >> level)
-            glGetTexImage(GL_TEXTURE_2D, level, format.get_pixel_format(), format.get_pixel_type(), buffer)
-            return buffer
+            size = (self.width >> level) * (self.height >> level) * format.get_component_count()
+            if out is None or not self.is_gl_array(out, np.float32, size):
+                out = format.new_buffer(self.width >> level, self.height >> level)
+            glGetTexImage(GL_TEXTURE_2D, level, format.get_pixel_format(), format.get_pixel_type(), out)
+            self.count_transfer(0, out.nbytes)
+            return out
         
         #if (format instanceof OGLTexImageByte.Format) {
         #    ByteBuffer buffer = format.newBuffer(getWidth() >> level, getHeight() >> level);
@@ -188,10 +551,13 @@ class OGLTexture2D:
     
 
     def set_texture_buffer(self, format, buffer, level = 0):
+        """Uploads the whole texture level, a contiguous array of the pixel type is passed to OpenGL as it is"""
         self.bind()
         if isinstance(format,OGLTexImageFloat.Format):
+            buffer = self.gl_array(buffer, np.float32)
             glTexSubImage2D(GL_TEXTURE_2D, level, 0, 0, self.width >> level, self.height >> level, 
                 format.get_pixel_format(), format.get_pixel_type(), buffer)
+            self.count_transfer(buffer.nbytes, 0)
         #if (format instanceof OGLTexImageByte.Format) {
         #    glTexSubImage2D(GL_TEXTURE_2D, level, 0, 0, 
         #        getWidth() >> level, getHeight() >> level, 
@@ -201,12 +567,174 @@ class OGLTexture2D:
     def set_tex_image(self, image, level = 0):
         self.set_texture_buffer(image.get_format(), image.get_data_buffer(), level)
 
-    def get_tex_image(self, format, level = None):
-        if level is not None:
-            image = format.new_tex_image(self.width >> level, self.height >> level)
-            image.set_data_buffer(self.get_texture_buffer(format, level))
-            return image
-        else:
-            image = format.new_tex_image(self.width, self.height)
-            image.set_data_buffer(self.get_texture_buffer(format))
-            return image            
+    def get_tex_image(self, format, level = None, image = None):
+        """Reads the texture level into an image
+
+        Args:
+            format (Format): format of the image
+            level (int, optional): mipmap level. Defaults to 0.
+            image (OGLTexImageFloat, optional): preallocated image of the level size and format,
+                its buffer is filled in place. A new image is created when not given.
+        """
+        level = 0 if level is None else level
+        width = self.width >> level
+        height = self.height >> level
+        if image is None or image.get_width() != width or image.get_height() != height \
+                or image.get_format().get_component_count() != format.get_component_count():
+            image = format.new_tex_image(width, height)
+        # the image buffer is the destination of the read, no copy
+        image.set_data_buffer(self.get_texture_buffer(format, level, image.get_data_buffer()))
+        return image
+
+    def set_tex_sub_image(self, format, x, y, data, level = 0):
+        """Uploads a region of the texture directly from client memory
+
+        Args:
+            format (Format): format of the data
+            x (int): left column of the region
+            y (int): top row of the region
+            data: float32 array of shape (height, width, component count) with the region pixels
+            level (int, optional): mipmap level. Defaults to 0.
+        """
+        data = self.gl_array(data, np.float32)
+        height, width = data.shape[0], data.shape[1]
+        self.bind()
+        glTexSubImage2D(GL_TEXTURE_2D, level, x, y, width, height,
+            format.get_pixel_format(), format.get_pixel_type(), data)
+        self.count_transfer(data.nbytes, 0)
+
+    def stream_tex_sub_image(self, format, x, y, data, level = 0):
+        """Uploads a region of the texture through the ring of pixel unpack buffers,
+        returns without waiting for the copy, arguments as in set_tex_sub_image"""
+        data = self.gl_array(data, np.float32)
+        height, width = data.shape[0], data.shape[1]
+        ring = self.get_upload_ring()
+        slot = ring.write(data)
+        self.bind()
+        glTexSubImage2D(GL_TEXTURE_2D, level, x, y, width, height,
+            format.get_pixel_format(), format.get_pixel_type(), ctypes.c_void_p(0))
+        ring.fence(slot)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self.count_transfer(data.nbytes, 0)
+
+    def stream_pixels(self, format, xs, ys, colors, level = 0):
+        """Sets individual texels through one write to the ring of pixel unpack buffers,
+        each texel is then copied from its offset in the buffer
+
+        Args:
+            format (Format): format of the colors
+            xs: x coordinates of the texels, out of texture texels are skipped
+            ys: y coordinates of the texels
+            colors: one color or a color per texel, component count values each
+            level (int, optional): mipmap level. Defaults to 0.
+        """
+        xs = np.asarray(xs).astype(int)
+        ys = np.asarray(ys).astype(int)
+        inside = (xs >= 0) & (xs < self.width >> level) & (ys >= 0) & (ys < self.height >> level)
+        if not np.any(inside):
+            return
+        cc = format.get_component_count()
+        colors = np.broadcast_to(np.asarray(colors, dtype=np.float32).reshape(-1, cc), (len(xs), cc))
+        data = np.ascontiguousarray(colors[inside])
+        ring = self.get_upload_ring()
+        slot = ring.write(data)
+        self.bind()
+        stride = data.itemsize * cc
+        for i, (x, y) in enumerate(zip(xs[inside], ys[inside])):
+            glTexSubImage2D(GL_TEXTURE_2D, level, int(x), int(y), 1, 1,
+                format.get_pixel_format(), format.get_pixel_type(), ctypes.c_void_p(i * stride))
+        ring.fence(slot)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self.count_transfer(data.nbytes, 0)
+
+    def read_tex_image_async(self, format, level = 0):
+        """Starts reading the texture level into the next pixel pack buffer of the ring,
+        the data are obtained later by poll_tex_image
+
+        Returns:
+            bool: False when every buffer of the ring holds a readback not yet taken by poll_tex_image,
+                no readback is started then
+        """
+        width = self.width >> level
+        height = self.height >> level
+        size = width * height * format.get_component_count() * 4
+        ring = self.get_pack_ring()
+        # buffers are used in order, the next one is free once the oldest readback was polled
+        if len(self.readbacks) >= len(ring):
+            return False
+        slot = ring.acquire(size)
+        self.bind()
+        # an integer array argument is an offset into the bound pack buffer
+        glGetTexImage(GL_TEXTURE_2D, level, format.get_pixel_format(), format.get_pixel_type(), 0)
+        ring.fence(slot)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.readbacks.append((slot, width, height))
+        return True
+
+    def poll_tex_image(self, format, image = None, wait = False):
+        """Returns the oldest readback started by read_tex_image_async once the GPU finished it
+
+        Args:
+            format (Format): format the readback was started with
+            image (OGLTexImageFloat, optional): preallocated image filled in place, see get_tex_image
+            wait (bool, optional): wait for the readback instead of returning None. Defaults to False.
+
+        Returns:
+            OGLTexImageFloat, or None when no readback is pending or finished
+        """
+        if not self.readbacks:
+            return None
+        slot, width, height = self.readbacks[0]
+        if not wait and not self.pack_ring.is_ready(slot):
+            return None
+        self.readbacks.popleft()
+        if image is None or image.get_width() != width or image.get_height() != height \
+                or image.get_format().get_component_count() != format.get_component_count():
+            image = format.new_tex_image(width, height)
+        self.pack_ring.read(slot, image.get_data_buffer())
+        self.count_transfer(0, image.get_data_buffer().nbytes)
+        return image
+
+    def get_upload_ring(self):
+        if self.upload_ring is None:
+            self.upload_ring = OGLPixelBufferRing.OGLPixelBufferRing(GL_PIXEL_UNPACK_BUFFER, count = PIXEL_BUFFER_COUNT)
+        return self.upload_ring
+
+    def get_pack_ring(self):
+        if self.pack_ring is None:
+            self.pack_ring = OGLPixelBufferRing.OGLPixelBufferRing(GL_PIXEL_PACK_BUFFER, count = PIXEL_BUFFER_COUNT)
+            self.readbacks = deque()
+        return self.pack_ring
+
+    def delete_pixel_buffers(self):
+        """Releases the pixel buffer rings, pending readbacks are dropped"""
+        if self.upload_ring is not None:
+            self.upload_ring.delete()
+            self.upload_ring = None
+        if self.pack_ring is not None:
+            self.pack_ring.delete()
+            self.pack_ring = None
+            self.readbacks = ()
+
+    @staticmethod
+    def is_gl_array(buffer, dtype, size = None):
+        """Returns True if the buffer can be passed to OpenGL without conversion"""
+        return isinstance(buffer, np.ndarray) and buffer.dtype == dtype and buffer.flags.c_contiguous \
+            and (size is None or buffer.size == size)
+
+    def gl_array(self, buffer, dtype):
+        """Returns the buffer as a contiguous array of the given type, converted only when necessary"""
+        if self.is_gl_array(buffer, dtype):
+            return buffer
+        buffer = np.ascontiguousarray(buffer, dtype=dtype)
+        self.bytes_converted += buffer.nbytes
+        return buffer
+
+    def count_transfer(self, uploaded, read_back):
+        """Records bytes moved by the last call"""
+        self.last_transfer_bytes = uploaded + read_back
+        self.bytes_uploaded += uploaded
+        self.bytes_read_back += read_back
+
+    def transfer_stats(self):
+        return f"last {self.last_transfer_bytes} B, uploaded {self.bytes_uploaded} B, read back {self.bytes_read_back} B, converted {self.bytes_converted} B"
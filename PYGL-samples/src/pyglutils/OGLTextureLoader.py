@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from PIL import Image
+import numpy as np
+import hashlib
+import os
+from .OGLTexture2D import OGLTexture2D, MIPMAPS_NONE, MIPMAPS_BOX, MIPMAPS_LANCZOS, mip_chain, mip_level_size, mip_level_count
+
+TEXTURE_CACHE_VERSION = 1
+# directory next to the images holding their decoded data
+TEXTURE_CACHE_DIR = ".texture_cache"
+
+def file_hash(fileName):
+    """Returns hex digest of the file content and the cache version"""
+    h = hashlib.blake2b(digest_size = 16)
+    h.update(TEXTURE_CACHE_VERSION.to_bytes(4, "little"))
+    with open(fileName, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def cache_path(fileName, cache_dir = None):
+    """Returns path of the cached RGBA data of the image, keyed by the file hash"""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(fileName), TEXTURE_CACHE_DIR)
+    return os.path.join(cache_dir, file_hash(fileName) + ".npy")
+
+def decode_image(fileName, use_cache = True, cache_dir = None, mipmaps = MIPMAPS_NONE):
+    """Returns (height, width, 4) ubyte RGBA data of the image
+
+    With use_cache the data are read from an uncompressed .npy file in cache_dir
+    (memory mapped, nothing is decoded), the file is written after the first decoding.
+    With mipmaps MIPMAPS_BOX or MIPMAPS_LANCZOS the list of all mip levels is returned
+    (see mip_chain), levels other than the base one are cached in a second file.
+    Safe to call from worker threads and processes, no OpenGL calls.
+    """
+    path = None
+    data = None
+    if use_cache:
+        path = cache_path(fileName, cache_dir)
+        data = read_cache(path)
+    if data is None:
+        with Image.open(fileName) as image:
+            data = np.asarray(image.convert("RGBA"), dtype=np.ubyte)
+        if path is not None:
+            write_cache(path, data)
+    if mipmaps not in (MIPMAPS_BOX, MIPMAPS_LANCZOS):
+        return data
+
+    mip_path = None if path is None else path[:-len(".npy")] + f".mip{mipmaps}.npy"
+    chain = None if mip_path is None else read_cache(mip_path)
+    h, w = data.shape[0], data.shape[1]
+    if chain is None:
+        levels = mip_chain(data, mipmaps)
+        if mip_path is not None:
+            write_cache(mip_path, np.concatenate([level.reshape(-1) for level in levels[1:]] + [np.zeros(0, np.ubyte)]))
+        return levels
+    # levels follow each other in the flat chain
+    levels = [data]
+    offset = 0
+    for level in range(1, mip_level_count(w, h)):
+        lw, lh = mip_level_size(w, h, level)
+        levels.append(chain[offset:offset + lw * lh * 4].reshape(lh, lw, 4))
+        offset += lw * lh * 4
+    return levels
+
+def read_cache(path):
+    """Returns memory mapped array of the cache file, None if missing or unreadable"""
+    if not os.path.isfile(path):
+        return None
+    try:
+        return np.load(path, mmap_mode = "r")
+    except (OSError, ValueError):
+        return None
+
+def write_cache(path, data):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        # unique temporary name, several workers may decode the same content
+        tmp_path = f"{path}.{os.getpid()}.{id(data)}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print("Unable to write texture cache: ", path)
+        print(e)
+
+class OGLTextureLoader:
+    """Decodes texture images in a pool of worker threads or processes
+
+    Images are submitted by load or load_all, which return futures of the
+    decoded RGBA data, so all images of a scene decode at once and the startup
+    takes about as long as the slowest image. Textures are created by texture
+    or upload_ready, which must be called from the thread owning the OpenGL
+    context.
+
+        loader = OGLTextureLoader()
+        loader.load_all([PATH + "res/textures/mosaic.jpg", PATH + "res/textures/globe.jpg"])
+        self.texture1 = loader.texture(PATH + "res/textures/mosaic.jpg")
+        self.texture2 = loader.texture(PATH + "res/textures/globe.jpg")
+    """
+
+    def __init__(self, max_workers = None, processes = False, use_cache = True, cache_dir = None,
+            mipmaps = MIPMAPS_NONE, compression = None, anisotropy = None, channels = 4):
+        """Creates the worker pool
+
+        Args:
+            max_workers (int, optional): number of workers. Defaults to the executor default.
+            processes (bool, optional): decode in processes instead of threads. PIL decoders
+                release the GIL, so threads are usually enough. Defaults to False.
+            use_cache (bool, optional): store decoded data on disk, see decode_image. Defaults to True.
+            cache_dir (str, optional): cache directory. Defaults to TEXTURE_CACHE_DIR next to each image.
+            mipmaps, compression, anisotropy, channels (optional): texture options, see OGLTexture2D.from_rgba.
+                CPU mip levels are built by the workers and cached with the image data.
+        """
+        if processes:
+            self.executor = ProcessPoolExecutor(max_workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers)
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.mipmaps = mipmaps
+        self.compression = compression
+        self.anisotropy = anisotropy
+        self.channels = channels
+        self.futures = {}   # file name -> future of decoded data, dropped once the texture is created
+        self.textures = {}  # file name -> uploaded OGLTexture2D
+
+    def load(self, fileName):
+        """Starts decoding of the image, returns future of its RGBA data, None when the texture already exists"""
+        if fileName not in self.futures and fileName not in self.textures:
+            self.futures[fileName] = self.executor.submit(decode_image, fileName, self.use_cache, self.cache_dir, self.mipmaps)
+        return self.futures.get(fileName)
+
+    def load_all(self, fileNames):
+        return [self.load(fileName) for fileName in fileNames]
+
+    def texture(self, fileName):
+        """Returns texture of the image, waits for its decoding, OpenGL thread only
+
+        Raises the exception of a failed decoding, as OGLTexture2D.from_file does.
+        """
+        if fileName not in self.textures:
+            data = self.load(fileName).result()
+            base = data[0] if isinstance(data, list) else data
+            print("Reading texture file ", fileName, "... OK [" + str(base.shape[1]) + "x" + str(base.shape[0]) + "]")
+            self.textures[fileName] = OGLTexture2D().from_rgba(data, self.mipmaps, self.compression, self.anisotropy, self.channels)
+            # the future holds the decoded (possibly memory mapped) data
+            del self.futures[fileName]
+        return self.textures[fileName]
+
+    def upload_ready(self):
+        """Creates textures of all decoded images without waiting, OpenGL thread only
+
+        Returns:
+            dict: file name -> OGLTexture2D of the newly created textures
+        """
+        ready = {}
+        for fileName, future in list(self.futures.items()):
+            if fileName in self.textures or not future.done():
+                continue
+            try:
+                ready[fileName] = self.texture(fileName)
+            except Exception as e:
+                print("Failed to read texture: ", fileName)
+                print(e)
+                self.textures[fileName] = None
+        return ready
+
+    def shutdown(self):
+        self.executor.shutdown(wait = False, cancel_futures = True)
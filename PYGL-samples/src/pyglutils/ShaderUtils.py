@@ -1,5 +1,8 @@
 from OpenGL.GL import *
 from OpenGL.GLU import *
+from OpenGL.GL.KHR.parallel_shader_compile import GL_COMPLETION_STATUS_KHR, glMaxShaderCompilerThreadsKHR, glInitParallelShaderCompileKHR
+import numpy as np
+import hashlib
 import os
 
 VERTEX_SHADER_EXTENSION = ".vert"
@@ -29,6 +32,235 @@ SHADER_NAME_CONSTANTS = [ GL_VERTEX_SHADER, GL_FRAGMENT_SHADER,
 SHADER_NAMES = [ "Vertex", "Fragment", "Geometry", "Control", "Evaluation", "Compute" ]
 
 
+class ShaderProgram(int):
+    """Id of a linked shader program together with locations of its active
+    attributes and uniforms, queried once after linking.
+    Behaves as plain int, so it can be passed to any GL call instead of the id.
+
+    Loaders return the same program for identical sources, references counts
+    the callers holding it, see delete_program.
+    """
+    def __new__(cls, program):
+        self = super().__new__(cls, program)
+        self.attributes = {}
+        self.uniforms = {}
+        self.references = 0
+        # False for programs linked outside ShaderUtils, see get_program
+        self.loaded = True
+        self.introspect()
+        return self
+
+    def introspect(self):
+        """Query all active attributes and uniforms of the linked program"""
+        self.attributes = {}
+        self.uniforms = {}
+        for i in range(glGetProgramiv(self, GL_ACTIVE_ATTRIBUTES)):
+            name = glGetActiveAttrib(self, i)[0].decode()
+            self.attributes[name] = glGetAttribLocation(self, name)
+        for i in range(glGetProgramiv(self, GL_ACTIVE_UNIFORMS)):
+            name, size, _ = glGetActiveUniform(self, i)
+            name = name.decode()
+            self.uniforms[name] = glGetUniformLocation(self, name)
+            if name.endswith("[0]"):
+                # arrays are reported by their first element, add the array name and the other elements
+                base = name[:-3]
+                self.uniforms[base] = self.uniforms[name]
+                for j in range(1, size):
+                    self.uniforms[f"{base}[{j}]"] = glGetUniformLocation(self, f"{base}[{j}]")
+
+    def get_attrib_location(self, name):
+        """Returns location of the active attribute or -1"""
+        return self.attributes.get(name, -1)
+
+    def get_uniform_location(self, name):
+        """Returns location of the active uniform or -1"""
+        return self.uniforms.get(name, -1)
+
+
+# linked programs by id, programs not created by ShaderUtils are introspected on first use
+programs = {}
+
+def register_program(shaderProgram, loaded = True):
+    """Introspect linked shader program and store it in the location cache
+
+    Args:
+        shaderProgram (int): id of the linked program
+        loaded (bool, optional): the program was created by a ShaderUtils loader. Defaults to True.
+
+    Returns:
+        ShaderProgram: program id with cached locations
+    """
+    program = ShaderProgram(shaderProgram)
+    program.loaded = loaded
+    programs[int(shaderProgram)] = program
+    return program
+
+def forget_program(shaderProgram):
+    """Remove deleted shader program from the location cache and the cache of linked programs,
+    VAOs of OGLBuffers built for it are recreated when its id is reused"""
+    programs.pop(int(shaderProgram), None)
+    for key in [key for key, program in cached_programs.items() if int(program) == int(shaderProgram)]:
+        del cached_programs[key]
+        for variant in [variant for variant, variantKey in cached_variants.items() if variantKey == key]:
+            del cached_variants[variant]
+
+def delete_program(shaderProgram):
+    """Release shader program returned by a ShaderUtils loader, use instead of glDeleteProgram
+
+    Programs of identical sources are shared by all callers that loaded them (including
+    their uniform values), the program is deleted when the last of them releases it.
+
+    Returns:
+        bool: True if the program was deleted
+    """
+    program = programs.get(int(shaderProgram))
+    if program is not None and program.references > 1:
+        program.references -= 1
+        return False
+    if int(shaderProgram) > 0:
+        glDeleteProgram(shaderProgram)
+    forget_program(shaderProgram)
+    return True
+
+def get_program(shaderProgram):
+    """Returns ShaderProgram with cached locations for the given program id
+
+    Programs not created by a ShaderUtils loader are introspected on every call, their id
+    may be deleted by plain glDeleteProgram and reused by another program. Load programs
+    by ShaderUtils to query their locations once.
+    """
+    program = programs.get(int(shaderProgram))
+    if program is not None and program.loaded:
+        return program
+    current = register_program(shaderProgram, False)
+    if program is not None and program.attributes == current.attributes and program.uniforms == current.uniforms:
+        # same locations, keep the object, VAOs of OGLBuffers built for it stay valid
+        programs[int(shaderProgram)] = program
+        return program
+    return current
+
+# linked programs by hash of their sources and driver, programs are not compiled twice in one run,
+# a cached program is shared by its callers and released by delete_program
+cached_programs = {}
+
+# directory of program binaries kept between runs, None disables the on-disk cache
+program_cache_directory = os.path.join(os.path.expanduser("~"), ".cache", "pyglutils", "programs")
+
+def set_program_cache_directory(path):
+    """Set directory of the on-disk program binary cache, None disables it"""
+    global program_cache_directory
+    program_cache_directory = path
+
+def program_cache_key(shaderSrcArray):
+    """Hash of shader sources, their stages and the OpenGL driver"""
+    key = hashlib.sha256()
+    for name in (GL_VENDOR, GL_RENDERER, GL_VERSION):
+        key.update(glGetString(name) or b"")
+    for i, src in enumerate(shaderSrcArray):
+        if src is None or src[0] is None:
+            continue
+        code = src[0] if isinstance(src[0], str) else "".join(src[0])
+        key.update(f"\0{i}:{src[1]}\0".encode())
+        key.update(code.encode())
+    return key.hexdigest()
+
+def get_cached_program(key):
+    """Returns program linked earlier in this run, if it was not deleted since"""
+    program = cached_programs.get(key)
+    if program is not None and (not glIsProgram(program) or programs.get(int(program)) is not program):
+        # deleted, or its id now belongs to another program
+        del cached_programs[key]
+        program = None
+    return program
+
+def program_binary_supported():
+    return bool(glGetProgramBinary) and bool(glProgramBinary) and glGetIntegerv(GL_NUM_PROGRAM_BINARY_FORMATS) > 0
+
+def program_binary_formats():
+    """Returns binary formats accepted by glProgramBinary"""
+    formats = np.zeros(int(glGetIntegerv(GL_NUM_PROGRAM_BINARY_FORMATS)), dtype=np.int32)
+    if len(formats) > 0:
+        glGetIntegerv(GL_PROGRAM_BINARY_FORMATS, formats)
+    return [int(binaryFormat) for binaryFormat in formats]
+
+def remove_program_binary(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def load_program_binary(key):
+    """Create program from the on-disk cache, returns None when missing or rejected by the driver"""
+    if program_cache_directory is None or not program_binary_supported():
+        return None
+    path = os.path.join(program_cache_directory, key + ".bin")
+    if not os.path.isfile(path):
+        return None
+    data = np.fromfile(path, dtype=np.uint8)
+    binaryFormat = int(data[:4].view("<u4")[0]) if len(data) > 4 else None
+    if binaryFormat not in program_binary_formats():
+        # truncated file or driver rebuild reporting the same strings
+        print("Cached shader program binary invalid, compiling")
+        remove_program_binary(path)
+        return None
+    shaderProgram = glCreateProgram()
+    try:
+        glProgramBinary(shaderProgram, binaryFormat, data[4:], len(data) - 4)
+        linked = glGetProgramiv(shaderProgram, GL_LINK_STATUS) == GL_TRUE
+    except GLError as e:
+        print(e)
+        linked = False
+    if not linked:
+        # driver update or different GPU, compile from sources again
+        print("Cached shader program binary rejected, compiling")
+        glDeleteProgram(shaderProgram)
+        remove_program_binary(path)
+        return None
+    print("Shader program ", shaderProgram, " loaded from cache")
+    return register_program(shaderProgram)
+
+def save_program_binary(key, shaderProgram):
+    """Store binary of linked program to the on-disk cache"""
+    if program_cache_directory is None or not program_binary_supported():
+        return
+    length = int(glGetProgramiv(shaderProgram, GL_PROGRAM_BINARY_LENGTH))
+    if length <= 0:
+        return
+    binary = np.zeros(length, dtype=np.uint8)
+    written = np.zeros(1, dtype=np.int32)
+    binaryFormat = np.zeros(1, dtype=np.uint32)
+    glGetProgramBinary(shaderProgram, length, written, binaryFormat, binary)
+    try:
+        os.makedirs(program_cache_directory, exist_ok = True)
+        path = os.path.join(program_cache_directory, key + ".bin")
+        with open(path + ".tmp", "wb") as f:
+            f.write(binaryFormat.astype("<u4").tobytes())
+            f.write(binary[:int(written[0])].tobytes())
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print("Unable to write shader program cache: ", e)
+
+def get_attrib_location(shaderProgram, name):
+    """Cached equivalent of glGetAttribLocation"""
+    return get_program(shaderProgram).get_attrib_location(name)
+
+def get_uniform_location(shaderProgram, name):
+    """Cached equivalent of glGetUniformLocation"""
+    return get_program(shaderProgram).get_uniform_location(name)
+
+def uniform_mat4(location, m):
+    """Upload Mat4, Mat4Array or (N,4,4) array to the mat4 uniform (array) at the given location
+
+    float32 matrices are passed to glUniformMatrix4fv directly, without any copy.
+    """
+    if hasattr(m, "to_gl_array"):
+        data = m.to_gl_array()
+    else:
+        data = m.to_array() if hasattr(m, "to_array") else m
+        data = np.ascontiguousarray(data, dtype=np.float32)
+    glUniformMatrix4fv(location, data.size // 16, False, data)
+
+
 # Load, create, compile, attach and link shader sources defined as files
 # 
 # @param gl
@@ -58,7 +290,7 @@ SHADER_NAMES = [ "Vertex", "Fragment", "Geometry", "Control", "Evaluation", "Com
 
 
 
-def load_program_directory(path):
+def directory_shader_files(path):
     name = path.split("/")[-1]
     stat = path.replace("/"+name, "")
     files = os.listdir(path.replace("/"+name, ""))
@@ -66,13 +298,20 @@ def load_program_directory(path):
     for file in files:
         if name == file.split(".")[0]:
             shaders.append(stat+"/"+file)
-    return load_program_list(shaders)
+    return shaders
+
+def load_program_directory(path, defines = None, includeDirs = None):
+    return load_program_list(directory_shader_files(path), defines = defines, includeDirs = includeDirs)
+
+def load_program_directory_async(path, defines = None, includeDirs = None):
+    """Same as load_program_directory, returns ProgramFuture without waiting for the driver"""
+    return load_program_list_async(directory_shader_files(path), defines = defines, includeDirs = includeDirs)
 
 def load_program_src(vertexShader = None, fragmentShader = None, geometryShader = None, tessControlShader = None, tessEvaluationShader = None, computeShader = None, functionBeforeLinking = None):
     data = [[vertexShader, 0], [fragmentShader, 1], [geometryShader, 2], [tessControlShader, 3], [tessEvaluationShader, 4], [computeShader, 5]]
     return load_program_src_array(data, functionBeforeLinking)
 
-def load_program_specific(vertexShaderFileName = None, fragmentShaderFileName = None, geometryShaderFileName = None, tessControlShaderFileName = None, tessEvaluationShaderFileName = None, computeShaderFileName = None, functionBeforeLinking = None):
+def load_program_specific(vertexShaderFileName = None, fragmentShaderFileName = None, geometryShaderFileName = None, tessControlShaderFileName = None, tessEvaluationShaderFileName = None, computeShaderFileName = None, functionBeforeLinking = None, defines = None, includeDirs = None):
     shaderFileNames = list(range(len(SHADER_FILE_EXTENSIONS)))
     shaderFileNames[0] = vertexShaderFileName
     shaderFileNames[1] = fragmentShaderFileName
@@ -80,7 +319,7 @@ def load_program_specific(vertexShaderFileName = None, fragmentShaderFileName =
     shaderFileNames[3] = tessControlShaderFileName
     shaderFileNames[4] = tessEvaluationShaderFileName
     shaderFileNames[5] = computeShaderFileName
-    return load_program_list(shaderFileNames, functionBeforeLinking)
+    return load_program_list(shaderFileNames, functionBeforeLinking, defines, includeDirs)
 
 # Read shader code as stream from file
 # 
@@ -92,10 +331,123 @@ def read_shader_program(streamFileName):
         res = f.readlines()
     return res
 
-def load_program_list(shaderFileNames, functionBeforeLinking = None):
+# preprocessed variants by shader files and defines, value is the key of the linked program in cached_programs
+cached_variants = {}
+
+def variant_key(shaderFileNames, defines = None, version = None):
+    """Key of a program variant given by its source files and defines"""
+    files = tuple(os.path.abspath(f) if f is not None else None for f in shaderFileNames)
+    macros = tuple(sorted((str(name), None if value is None else str(value)) for name, value in (defines or {}).items()))
+    return files, macros, version
+
+def find_include(name, fileName = None, includeDirs = None):
+    """Path of included file, searched next to the including file first, then in includeDirs"""
+    dirs = [os.path.dirname(fileName)] if fileName is not None else []
+    dirs += list(includeDirs or [])
+    for directory in dirs:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    if not dirs and os.path.isfile(name):
+        return name
+    return None
+
+def resolve_includes(shaderSrc, fileName = None, includeDirs = None, included = None):
+    """Replace #include "file" lines with the file content, recursively
+
+    Every file is included only once, so include cycles and repeated includes are dropped.
+    Returns:
+        list of lines or None when an included file is missing
+    """
+    if included is None:
+        included = set()
+    res = []
+    for line in shaderSrc:
+        stripped = line.strip()
+        if not stripped.startswith("#include"):
+            res.append(line)
+            continue
+        name = stripped[len("#include"):].strip().strip('"<>')
+        path = find_include(name, fileName, includeDirs)
+        if path is None:
+            print("Shader include '", name, "' not found")
+            return None
+        path = os.path.abspath(path)
+        if path in included:
+            continue
+        included.add(path)
+        src = resolve_includes(read_shader_program(path), path, includeDirs, included)
+        if src is None:
+            return None
+        if src and not src[-1].endswith("\n"):
+            src[-1] += "\n"
+        res += src
+    return res
+
+def preprocess_shader(shaderSrc, defines = None, fileName = None, includeDirs = None, version = None):
+    """Resolve includes and inject defines into a shader source
+
+    Args:
+        shaderSrc: list of lines with GLSL code (as from read_shader_program) or a string
+        defines (dict, optional): macro names and values, None value defines the macro without value
+        fileName (str, optional): path of the source, includes are searched next to it first
+        includeDirs (list, optional): other directories searched for included files
+        version (int, optional): replaces number in the #version directive
+
+    Returns:
+        list of lines, defines placed right after #version, None when an include is missing
+    """
+    if isinstance(shaderSrc, str):
+        shaderSrc = shaderSrc.splitlines(keepends = True)
+    included = {os.path.abspath(fileName)} if fileName is not None else set()
+    src = resolve_includes(shaderSrc, fileName, includeDirs, included)
+    if src is None:
+        return None
+
+    # #version has to stay the first directive, defines go right behind it
+    position = 0
+    for i, line in enumerate(src):
+        if line.strip().startswith("#version"):
+            if version is not None:
+                profile = line.split()[2:]
+                src[i] = " ".join(["#version", str(version)] + profile) + "\n"
+            position = i + 1
+            break
+    lines = []
+    for name, value in (defines or {}).items():
+        lines.append(f"#define {name}\n" if value is None else f"#define {name} {value}\n")
+    return src[:position] + lines + src[position:]
+
+def load_program_variants(shaderFileNames, variants, includeDirs = None):
+    """Build several programs from the same shader files
+
+    Args:
+        shaderFileNames: list of file names as in load_program_list
+        variants: list of defines dicts, one program is returned for each of them
+
+    Returns:
+        list of shader program ids, identical variants share one program
+    """
+    return wait_programs([load_program_list_async(list(shaderFileNames), defines = defines, includeDirs = includeDirs) for defines in variants])
+
+def load_program_list(shaderFileNames, functionBeforeLinking = None, defines = None, includeDirs = None, version = None):
+    return load_program_list_async(shaderFileNames, functionBeforeLinking, defines, includeDirs, version).result()
+
+def load_program_list_async(shaderFileNames, functionBeforeLinking = None, defines = None, includeDirs = None, version = None):
+    """Same as load_program_list, returns ProgramFuture without waiting for the driver"""
     if len(shaderFileNames) > len(SHADER_NAMES):
         print("Number of shader sources is bigger than number of shaders")
-        return -1
+        return ProgramFuture.resolved(-1)
+
+    # the same files with the same defines were already linked in this run
+    variant = None
+    if functionBeforeLinking is None:
+        variant = variant_key([f if f is None or "." in f else f + SHADER_FILE_EXTENSIONS[i] for i, f in enumerate(shaderFileNames)], defines, version)
+        if variant in cached_variants:
+            cached = get_cached_program(cached_variants[variant])
+            if cached is not None:
+                return ProgramFuture.resolved(cached)
+            del cached_variants[variant]
     
     shaderSrcArray = list(range(0, len(SHADER_FILE_EXTENSIONS)))
     for i in range(0, len(shaderFileNames)):
@@ -116,7 +468,9 @@ def load_program_list(shaderFileNames, functionBeforeLinking = None):
         print("Shader file: ", shaderFileNames[i], " Reading ... ", end="")
 
         shaderSrc = read_shader_program(shaderFileNames[i])
+        shaderSrc = preprocess_shader(shaderSrc, defines, shaderFileNames[i], includeDirs, version)
         if shaderSrc is None:
+            print("failed")
             shaderSrcArray[i] = None
             continue
         else:
@@ -125,7 +479,9 @@ def load_program_list(shaderFileNames, functionBeforeLinking = None):
     for i in shaderSrcArray:
         if type(i) == type(1):
             shaderSrcArray[i] = None
-    return load_program_src_array(shaderSrcArray, functionBeforeLinking)
+    future = load_program_src_array_async(shaderSrcArray, functionBeforeLinking)
+    future.variant = variant
+    return future
 
 
 # Load, create, compile, attach and link shader sources defined as arrays
@@ -143,15 +499,151 @@ def load_program_list(shaderFileNames, functionBeforeLinking = None):
 # @return new id of shader program
 
 def load_program_src_array(shaderSrcArray, functionBeforeLinking = None):
+    return load_program_src_array_async(shaderSrcArray, functionBeforeLinking).result()
+
+# programs submitted to the driver and not finished yet, by key of their sources
+pending_programs = {}
+
+# None until the first query with a current context
+parallel_compile = None
+
+def parallel_compile_supported():
+    """Enable GL_KHR_parallel_shader_compile on the first call, returns whether the driver offers it"""
+    global parallel_compile
+    if parallel_compile is None:
+        parallel_compile = bool(glInitParallelShaderCompileKHR())
+        if parallel_compile:
+            # let the driver choose the number of compiler threads
+            glMaxShaderCompilerThreadsKHR(0xFFFFFFFF)
+    return parallel_compile
+
+
+class ProgramFuture:
+    """Shader program compiled and linked by the driver in the background
+
+    done() polls GL_COMPLETION_STATUS_KHR, result() waits for the link and
+    returns the program id (or -1), both have to be called from the GL thread.
+    """
+    def __init__(self, shaderProgram, shaders = (), key = None):
+        self.shaderProgram = shaderProgram
+        self.shaders = list(shaders)
+        self.key = key
+        self.variant = None
+        self.program = None
+        # callers given this future, each holds a reference to the program
+        self.references = 1
+        self.counted = False
+
+    @classmethod
+    def resolved(cls, program):
+        future = cls(program)
+        future.program = program
+        return future
+
+    def done(self):
+        """True when result() does not block, always True without GL_KHR_parallel_shader_compile"""
+        if self.program is not None or not parallel_compile_supported():
+            return True
+        return glGetProgramiv(self.shaderProgram, GL_COMPLETION_STATUS_KHR) == GL_TRUE
+
+    def result(self):
+        if self.program is None:
+            self.program = self.finish()
+        if not self.counted and self.program > 0:
+            self.counted = True
+            get_program(self.program).references += self.references
+        if self.variant is not None and self.program > 0 and self.key is not None:
+            cached_variants[self.variant] = self.key
+        return self.program
+
+    def finish(self):
+        if pending_programs.get(self.key) is self:
+            del pending_programs[self.key]
+        shaderProgram = self.shaderProgram
+
+        linked = True
+        for shader in self.shaders:
+            if shader <= 0:
+                continue
+            error = check_log_info(shader, GL_COMPILE_STATUS)
+            if error is not None:
+                print("Compiling ", shader, " failed")
+                print(error)
+                linked = False
+
+        if linked:
+            print("Linking shader program ", shaderProgram , "... ", end = "")
+            error = check_log_info(shaderProgram, GL_LINK_STATUS)
+            if error is None:
+                print("OK")
+                shaderProgram = register_program(shaderProgram)
+                if self.key is not None:
+                    cached_programs[self.key] = shaderProgram
+                    save_program_binary(self.key, shaderProgram)
+            else:
+                print("failed\n", error.decode())
+                linked = False
+
+        for shader in self.shaders:
+            if (shader > 0):
+                # Always detach shaders after a link
+                glDetachShader(shaderProgram, shader)
+                # Don't leak shader either
+                if glIsShader(shader):
+                    glDeleteShader(shader)
+
+        if not linked:
+            # We don't need the program anymore
+            glDeleteProgram(shaderProgram)
+            forget_program(shaderProgram)
+            return -1
+        return shaderProgram
+
+
+def wait_programs(futures):
+    """Wait for all submitted programs, returns their ids in the same order"""
+    return [future.result() for future in futures]
+
+def load_program_src_array_async(shaderSrcArray, functionBeforeLinking = None):
+    """Submit compilation and linking of shader program without waiting for the driver
+
+    Compile and link status is checked only in ProgramFuture.result(), so the
+    driver can compile all programs of a scene at once when they are submitted
+    up front. Identical sources submitted twice share one future.
+
+    Args:
+        shaderSrcArray: same as in load_program_src_array
+        functionBeforeLinking: same as in load_program_src_array
+
+    Returns:
+        ProgramFuture
+    """
     #OGLUtils.emptyGLError()
     if len(shaderSrcArray) > len(SHADER_NAMES):
         print("Number of shader sources is bigger than number of shaders")
-        return -1
-
+        return ProgramFuture.resolved(-1)
+
+    # programs with a functionBeforeLinking depend on more than their sources, they are not cached
+    key = None
+    if functionBeforeLinking is None:
+        key = program_cache_key(shaderSrcArray)
+        if key in pending_programs:
+            pending_programs[key].references += 1
+            return pending_programs[key]
+        cached = get_cached_program(key)
+        if cached is None:
+            cached = load_program_binary(key)
+        if cached is not None:
+            cached_programs[key] = cached
+            future = ProgramFuture.resolved(cached)
+            future.key = key
+            return future
+
+    parallel_compile_supported()
     shaderProgram = glCreateProgram()
-    if shaderProgram < 0:
+    if shaderProgram <= 0:
         print("Unable create new shader program ")
-        return -1
+        return ProgramFuture.resolved(-1)
     
     print("New shader program '", shaderProgram, "' created")
 
@@ -177,43 +669,28 @@ def load_program_src_array(shaderSrcArray, functionBeforeLinking = None):
             print("Shader is not supported")
             continue
 
-        print("  Compiling ", shaders[i], "... ", end = "")
-        shaders[i] = compile_shader_program(shaders[i])
-        if (shaders[i] > 0):
-            print("OK")
-        else:
-            return -1
-
-        print("  Attaching ", shaders[i], " to ", shaderProgram, "... ", end = "")
+        # status is checked when the program is finished
+        glCompileShader(shaders[i])
         glAttachShader(shaderProgram, shaders[i])
-        print("OK")
 
     if (shaders[0] <= 0 and shaders[-1] <= 0): #no vertex or compute shader
         print("No vertex or compute shader available \n")
-        return -1
+        for shader in shaders:
+            if shader > 0:
+                glDeleteShader(shader)
+        glDeleteProgram(shaderProgram)
+        return ProgramFuture.resolved(-1)
     
     if functionBeforeLinking is not None:
         functionBeforeLinking.accept(shaderProgram)
+    elif program_cache_directory is not None and program_binary_supported():
+        glProgramParameteri(shaderProgram, GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL_TRUE)
     
-    print("Linking shader program ", shaderProgram , "... ", end = "")
-    if link_program(shaderProgram):
-        print("OK")
-    else:
-        # We don't need the program anymore
-        glDeleteProgram(shaderProgram)
-
-    for shader in shaders:
-        if (shader > 0):
-            # Always detach shaders after a successful link
-            glDetachShader(shaderProgram, shader)
-            # Don't leak shader either
-            if glIsShader(shader):
-                glDeleteShader(shader)
-
-    return shaderProgram
-
-
-
+    glLinkProgram(shaderProgram)
+    future = ProgramFuture(shaderProgram, shaders, key)
+    if key is not None:
+        pending_programs[key] = future
+    return future
 
 #    
 # Create shader and define source as array of Strings. At the end of a
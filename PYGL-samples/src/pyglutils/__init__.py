@@ -1,4 +1,5 @@
 from .OGLTexture2D import OGLTexture2D
 from .OGLTextRenderer import OGLTextRenderer
 from .OGLRenderTarget import OGLRenderTarget
-from .OGLModelOBJ import OGLModelOBJ
\ No newline at end of file
+from .OGLModelOBJ import OGLModelOBJ
+from .OGLTextureLoader import OGLTextureLoader
\ No newline at end of file
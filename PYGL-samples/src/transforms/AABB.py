@@ -0,0 +1,106 @@
+import numpy as np
+
+def vertex_array(vertices):
+    """Returns (N,3) float array of vertex positions given as (N,3) or (N,4) array
+    (w is ignored), flat array of xyz triplets or a sequence of Vec3D/Point3D"""
+    if len(vertices) > 0 and not isinstance(vertices, np.ndarray) and hasattr(vertices[0], "x"):
+        return np.array([(v.x, v.y, v.z) for v in vertices], dtype=np.float32)
+    v = np.asarray(vertices)
+    if v.ndim == 1:
+        v = v.reshape(-1, 3)
+    return v[:, :3]
+
+def matrix_array(matrices):
+    """Returns float32 (4,4) or (N,4,4) array of Mat4, Mat4Array or array-like matrices"""
+    if hasattr(matrices, "mat"):
+        matrices = matrices.mat
+    elif hasattr(matrices, "data"):
+        matrices = matrices.data
+    return np.asarray(matrices, dtype=np.float32)
+
+class AABB:
+    """Array of axis-aligned bounding boxes stored as (N,3) float32 arrays of
+    minimum and maximum corners, immutable
+
+    A box of a mesh is computed once from its vertices, boxes of its instances
+    are then obtained by transform with the model matrices of all instances at
+    once. An empty box has min > max.
+    """
+
+    def __init__(self, mins = None, maxs = None):
+        """Creates boxes from (N,3) arrays of minimum and maximum corners, no boxes by default"""
+        if mins is None:
+            mins = np.zeros((0, 3))
+            maxs = np.zeros((0, 3))
+        self.min = np.ascontiguousarray(np.asarray(mins, dtype=np.float32).reshape(-1, 3))
+        self.max = np.ascontiguousarray(np.asarray(maxs, dtype=np.float32).reshape(-1, 3))
+
+    @staticmethod
+    def from_vertices(vertices):
+        """Creates a single box enclosing the given vertices (see vertex_array)"""
+        v = vertex_array(vertices)
+        if len(v) == 0:
+            return AABB(np.full(3, np.inf), np.full(3, -np.inf))
+        return AABB(v.min(axis=0), v.max(axis=0))
+
+    @staticmethod
+    def from_meshes(meshes):
+        """Creates one box per vertex array in the given sequence"""
+        boxes = [AABB.from_vertices(v) for v in meshes]
+        return AABB.concat(boxes)
+
+    @staticmethod
+    def from_center_extent(centers, extents):
+        """Creates boxes from (N,3) centers and half sizes"""
+        c = np.asarray(centers, dtype=np.float32)
+        e = np.asarray(extents, dtype=np.float32)
+        return AABB(c - e, c + e)
+
+    @staticmethod
+    def concat(boxes):
+        """Joins the given AABB objects into one array of boxes"""
+        return AABB(np.concatenate([b.min for b in boxes]), np.concatenate([b.max for b in boxes]))
+
+    def __len__(self):
+        return len(self.min)
+
+    def __getitem__(self, index):
+        """Returns AABB of the box at the given index, or of the selected boxes"""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 or None)
+        return AABB(self.min[index], self.max[index])
+
+    def centers(self):
+        return (self.min + self.max) * 0.5
+
+    def extents(self):
+        """Returns (N,3) half sizes of the boxes"""
+        return (self.max - self.min) * 0.5
+
+    def union(self):
+        """Returns a single box enclosing all boxes"""
+        if len(self) == 0:
+            return AABB(np.full(3, np.inf), np.full(3, -np.inf))
+        return AABB(self.min.min(axis=0), self.max.max(axis=0))
+
+    def contains_points(self, points):
+        """Returns (N,) bool mask of boxes containing the corresponding points ((N,3) or one (3,))"""
+        p = np.asarray(points, dtype=np.float32)
+        return np.all((p >= self.min) & (p <= self.max), axis=-1)
+
+    def transform(self, matrices):
+        """Returns boxes enclosing the boxes transformed by affine matrices
+
+        Args:
+            matrices: one Mat4 for all boxes, or (N,4,4) array / Mat4Array with one matrix per box.
+                A single box transformed by N matrices gives N boxes (mesh instances).
+        """
+        m = matrix_array(matrices)
+        rot = m[..., :3, :3]
+        # centre is transformed as a point, half sizes by the absolute rotation part (Arvo)
+        c = np.einsum("...j,...jk->...k", self.centers(), rot) + m[..., 3, :3]
+        e = np.einsum("...j,...jk->...k", self.extents(), np.abs(rot))
+        return AABB(c - e, c + e)
+
+    def __str__(self):
+        return f"AABB({len(self)})\n min {self.min}\n max {self.max}"
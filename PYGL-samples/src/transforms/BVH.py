@@ -0,0 +1,411 @@
+import heapq
+import math
+import os
+import numpy as np
+from .AABB import matrix_array
+
+BVH_CACHE_VERSION = 1
+
+# triangles in a leaf are tested one by one, more of them only if SAH says splitting does not pay off
+BVH_LEAF_SIZE = 2
+BVH_MAX_LEAF_SIZE = 8
+# cost of visiting a node relative to one ray/triangle test
+BVH_TRAVERSAL_COST = 1.0
+
+# replaces 1/0 in ray slab tests, inf would give NaN for rays in the plane of a box side
+BVH_INV_LIMIT = 1e30
+
+def screen_ray(x, y, width, height, m):
+    """Returns ray (origin, direction) through the given window pixel
+
+    Args:
+        x, y: cursor position in pixels, y grows down as in glfw callbacks
+        width, height: window size in pixels
+        m: model * view * projection matrix (Mat4 or 4x4 array), the ray is returned
+           in the space the matrix starts from, e.g. the model space of a mesh
+
+    Returns:
+        tuple: origin on the near plane and unit direction, both as (3,) float64 arrays
+    """
+    inv = np.linalg.inv(matrix_array(m).astype(np.float64))
+    nx = 2.0 * (x + 0.5) / width - 1.0
+    ny = 1.0 - 2.0 * (y + 0.5) / height
+    near = np.array([nx, ny, 0.0, 1.0]) @ inv
+    far = np.array([nx, ny, 1.0, 1.0]) @ inv
+    near = near[:3] / near[3]
+    far = far[:3] / far[3]
+    direction = far - near
+    return near, direction / np.linalg.norm(direction)
+
+def sah_split(centroids, tri_min, tri_max):
+    """Finds the best split of triangles by sweeping sorted centroids along every axis
+
+    Returns:
+        tuple: (cost, axis, order of triangles along the axis, number of triangles on the left)
+            cost is the sum of child box half areas weighted by their triangle counts
+    """
+    n = len(centroids)
+    best = (math.inf, 0, None, 0)
+    for axis in range(3):
+        order = np.argsort(centroids[:, axis], kind="stable")
+        lo = tri_min[order]
+        hi = tri_max[order]
+        # bounds of the first i + 1 and of the last n - i - 1 triangles
+        left_lo = np.minimum.accumulate(lo, axis=0)[:-1]
+        left_hi = np.maximum.accumulate(hi, axis=0)[:-1]
+        right_lo = np.minimum.accumulate(lo[::-1], axis=0)[::-1][1:]
+        right_hi = np.maximum.accumulate(hi[::-1], axis=0)[::-1][1:]
+        left_area = half_area(left_hi - left_lo)
+        right_area = half_area(right_hi - right_lo)
+        count = np.arange(1, n)
+        cost = left_area * count + right_area * (n - count)
+        i = int(np.argmin(cost))
+        if cost[i] < best[0]:
+            best = (float(cost[i]), axis, order, i + 1)
+    return best
+
+def half_area(size):
+    """Returns half surface areas of boxes with the given (N,3) sizes"""
+    return size[..., 0] * size[..., 1] + size[..., 1] * size[..., 2] + size[..., 2] * size[..., 0]
+
+def closest_point_on_triangle(px, py, pz, a, b, c):
+    """Returns the point of triangle abc closest to p as a tuple (Ericson, Real-Time Collision Detection)"""
+    abx, aby, abz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    acx, acy, acz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    apx, apy, apz = px - a[0], py - a[1], pz - a[2]
+    d1 = abx * apx + aby * apy + abz * apz
+    d2 = acx * apx + acy * apy + acz * apz
+    if d1 <= 0 and d2 <= 0:
+        return a
+    bpx, bpy, bpz = px - b[0], py - b[1], pz - b[2]
+    d3 = abx * bpx + aby * bpy + abz * bpz
+    d4 = acx * bpx + acy * bpy + acz * bpz
+    if d3 >= 0 and d4 <= d3:
+        return b
+    vc = d1 * d4 - d3 * d2
+    if vc <= 0 and d1 >= 0 and d3 <= 0:
+        v = d1 / (d1 - d3)
+        return (a[0] + v * abx, a[1] + v * aby, a[2] + v * abz)
+    cpx, cpy, cpz = px - c[0], py - c[1], pz - c[2]
+    d5 = abx * cpx + aby * cpy + abz * cpz
+    d6 = acx * cpx + acy * cpy + acz * cpz
+    if d6 >= 0 and d5 <= d6:
+        return c
+    vb = d5 * d2 - d1 * d6
+    if vb <= 0 and d2 >= 0 and d6 <= 0:
+        w = d2 / (d2 - d6)
+        return (a[0] + w * acx, a[1] + w * acy, a[2] + w * acz)
+    va = d3 * d6 - d5 * d4
+    if va <= 0 and d4 - d3 >= 0 and d5 - d6 >= 0:
+        w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        return (b[0] + w * (c[0] - b[0]), b[1] + w * (c[1] - b[1]), b[2] + w * (c[2] - b[2]))
+    denom = 1 / (va + vb + vc)
+    v = vb * denom
+    w = vc * denom
+    return (a[0] + abx * v + acx * w, a[1] + aby * v + acy * w, a[2] + abz * v + acz * w)
+
+class BVH:
+    """Bounding volume hierarchy over triangles for ray and nearest point queries
+
+    Built top-down by the surface area heuristic (full sweep of sorted centroids).
+    Nodes are stored in flat arrays: bounds min/max, first and count. A leaf has
+    count > 0 and holds triangles first .. first + count - 1 of the reordered
+    triangles, an inner node has count == 0 and its children are nodes first and
+    first + 1. Arrays can be saved next to the model and loaded instead of
+    building the tree again.
+
+    Queries walk the tree on plain Python floats, which is much faster than NumPy
+    for the few dozen nodes and triangles a single query visits. Triangle indices
+    in the results are indices into the triangles the BVH was built from.
+    """
+
+    def __init__(self, triangles = None):
+        """Builds the hierarchy
+
+        Args:
+            triangles (optional): (T,3,3) array of triangle vertices, or (3T,3) / (3T,4) array of corners
+                (w is ignored). The hierarchy is left empty when None, e.g. for BVH.load.
+        """
+        self.node_min = np.zeros((0, 3), dtype=np.float32)
+        self.node_max = np.zeros((0, 3), dtype=np.float32)
+        self.node_first = np.zeros(0, dtype=np.int32)
+        self.node_count = np.zeros(0, dtype=np.int32)
+        self.order = np.zeros(0, dtype=np.int32)
+        self.triangles = np.zeros((0, 3, 3), dtype=np.float32)
+        if triangles is not None:
+            self.build(triangles)
+
+    @staticmethod
+    def from_mesh(vertices, indices = None):
+        """Builds the hierarchy of a mesh drawn as a triangle list
+
+        Args:
+            vertices: (V,3) or (V,4) vertex positions
+            indices (optional): index buffer data, vertices are taken in order when None
+        """
+        v = np.asarray(vertices, dtype=np.float32)[:, :3]
+        if indices is not None:
+            v = v[np.asarray(indices, dtype=np.int64)]
+        return BVH(v)
+
+    def build(self, triangles):
+        tris = np.asarray(triangles, dtype=np.float32)[..., :3].reshape(-1, 3, 3)
+        n = len(tris)
+        tri_min = tris.min(axis=1)
+        tri_max = tris.max(axis=1)
+        centroids = tris.mean(axis=1)
+
+        capacity = max(2 * n - 1, 1)
+        node_min = np.zeros((capacity, 3), dtype=np.float32)
+        node_max = np.zeros((capacity, 3), dtype=np.float32)
+        node_first = np.zeros(capacity, dtype=np.int32)
+        node_count = np.zeros(capacity, dtype=np.int32)
+        order = np.arange(n, dtype=np.int32)
+        nodes = 1 if n > 0 else 0
+
+        # (node, start, end) ranges of order still to be processed
+        stack = [(0, 0, n)] if n > 0 else []
+        while stack:
+            node, start, end = stack.pop()
+            idx = order[start:end]
+            lo = tri_min[idx].min(axis=0)
+            hi = tri_max[idx].max(axis=0)
+            node_min[node] = lo
+            node_max[node] = hi
+            count = end - start
+            if count > BVH_LEAF_SIZE:
+                cost, axis, split_order, left = sah_split(centroids[idx], tri_min[idx], tri_max[idx])
+                area = float(half_area(hi - lo))
+                split = area > 0 and BVH_TRAVERSAL_COST + cost / area < count
+                if split or count > BVH_MAX_LEAF_SIZE:
+                    if not split:
+                        # SAH prefers a leaf, but it would be too big, split in the middle
+                        split_order = np.argsort(centroids[idx][:, int(np.argmax(hi - lo))], kind="stable")
+                        left = count // 2
+                    order[start:end] = idx[split_order]
+                    node_first[node] = nodes
+                    node_count[node] = 0
+                    stack.append((nodes + 1, start + left, end))
+                    stack.append((nodes, start, start + left))
+                    nodes += 2
+                    continue
+            node_first[node] = start
+            node_count[node] = count
+
+        self.node_min = node_min[:nodes]
+        self.node_max = node_max[:nodes]
+        self.node_first = node_first[:nodes]
+        self.node_count = node_count[:nodes]
+        self.order = order
+        self.triangles = np.ascontiguousarray(tris[order])
+        self.prepare()
+        return self
+
+    def prepare(self):
+        """Copies the arrays to lists of floats used by the queries"""
+        self.boxes = [(a[0], a[1], a[2], b[0], b[1], b[2]) for a, b in zip(self.node_min.tolist(), self.node_max.tolist())]
+        self.first = self.node_first.tolist()
+        self.count = self.node_count.tolist()
+        self.tri_ids = self.order.tolist()
+        t = self.triangles.astype(np.float64)
+        self.v0 = t[:, 0].tolist()
+        self.e1 = (t[:, 1] - t[:, 0]).tolist()
+        self.e2 = (t[:, 2] - t[:, 0]).tolist()
+        self.tri_vertices = t.tolist()
+
+    def __len__(self):
+        """Returns the number of triangles"""
+        return len(self.order)
+
+    def node_total(self):
+        return len(self.node_count)
+
+    def bounds(self):
+        """Returns (min, max) corners of the root box"""
+        return self.node_min[0], self.node_max[0]
+
+    def save(self, path, key = None):
+        """Stores the arrays as an uncompressed npz, key identifies the source data"""
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, key = np.zeros(0) if key is None else key, version = BVH_CACHE_VERSION,
+                         node_min = self.node_min, node_max = self.node_max, node_first = self.node_first,
+                         node_count = self.node_count, order = self.order, triangles = self.triangles)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("Unable to write BVH cache: ", path)
+            print(e)
+
+    @staticmethod
+    def load(path, key = None):
+        """Loads BVH stored by save, returns None if missing or stale"""
+        if not os.path.isfile(path):
+            return None
+        try:
+            with np.load(path) as cache:
+                if int(cache["version"]) != BVH_CACHE_VERSION:
+                    return None
+                if key is not None and not np.array_equal(cache["key"], key):
+                    return None
+                res = BVH()
+                res.node_min = cache["node_min"]
+                res.node_max = cache["node_max"]
+                res.node_first = cache["node_first"]
+                res.node_count = cache["node_count"]
+                res.order = cache["order"]
+                res.triangles = cache["triangles"]
+        except Exception:
+            return None
+        res.prepare()
+        return res
+
+    def intersect(self, origin, direction, tmax = math.inf, cull_back = False):
+        """Finds the closest intersection of a ray with the triangles
+
+        Args:
+            origin: ray origin (Vec3D, tuple or array)
+            direction: ray direction, the distance is in multiples of its length
+            tmax (optional): ignore intersections further than this. Defaults to inf.
+            cull_back (bool, optional): ignore triangles facing away from the ray (clockwise). Defaults to False.
+
+        Returns:
+            tuple: (t, triangle index, u, v) with barycentric u, v of the hit point, None when there is no hit
+        """
+        ox, oy, oz = (float(c) for c in origin)
+        dx, dy, dz = (float(c) for c in direction)
+        ix = 1 / dx if dx != 0 else BVH_INV_LIMIT
+        iy = 1 / dy if dy != 0 else BVH_INV_LIMIT
+        iz = 1 / dz if dz != 0 else BVH_INV_LIMIT
+        boxes = self.boxes
+        first = self.first
+        count = self.count
+        v0 = self.v0
+        e1 = self.e1
+        e2 = self.e2
+        if not boxes:
+            return None
+
+        best_t = tmax
+        best = None
+        # (entry distance, node), the root is entered without a test
+        stack = [(0.0, 0)]
+        while stack:
+            entry, node = stack.pop()
+            if entry > best_t:
+                continue
+            c = count[node]
+            if c > 0:
+                for i in range(first[node], first[node] + c):
+                    # Moller-Trumbore
+                    a = v0[i]
+                    f = e1[i]
+                    g = e2[i]
+                    px = dy * g[2] - dz * g[1]
+                    py = dz * g[0] - dx * g[2]
+                    pz = dx * g[1] - dy * g[0]
+                    det = f[0] * px + f[1] * py + f[2] * pz
+                    if det < 1e-12 and (cull_back or det > -1e-12):
+                        # parallel to the ray, or back face when culled
+                        continue
+                    inv_det = 1 / det
+                    sx = ox - a[0]
+                    sy = oy - a[1]
+                    sz = oz - a[2]
+                    u = (sx * px + sy * py + sz * pz) * inv_det
+                    if u < 0 or u > 1:
+                        continue
+                    qx = sy * f[2] - sz * f[1]
+                    qy = sz * f[0] - sx * f[2]
+                    qz = sx * f[1] - sy * f[0]
+                    v = (dx * qx + dy * qy + dz * qz) * inv_det
+                    if v < 0 or u + v > 1:
+                        continue
+                    t = (g[0] * qx + g[1] * qy + g[2] * qz) * inv_det
+                    if 0 <= t < best_t:
+                        best_t = t
+                        best = (t, self.tri_ids[i], u, v)
+                continue
+
+            # slab tests of both children, the nearer one is visited first
+            hits = []
+            for child in (first[node], first[node] + 1):
+                b = boxes[child]
+                t1 = (b[0] - ox) * ix
+                t2 = (b[3] - ox) * ix
+                near = t1 if t1 < t2 else t2
+                far = t2 if t1 < t2 else t1
+                t1 = (b[1] - oy) * iy
+                t2 = (b[4] - oy) * iy
+                if t1 > t2:
+                    t1, t2 = t2, t1
+                if t1 > near:
+                    near = t1
+                if t2 < far:
+                    far = t2
+                t1 = (b[2] - oz) * iz
+                t2 = (b[5] - oz) * iz
+                if t1 > t2:
+                    t1, t2 = t2, t1
+                if t1 > near:
+                    near = t1
+                if t2 < far:
+                    far = t2
+                if near <= far and far >= 0 and near <= best_t:
+                    hits.append((near, child))
+            if len(hits) == 2 and hits[0][0] < hits[1][0]:
+                hits.reverse()
+            stack.extend(hits)
+        return best
+
+    def intersect_ray(self, ray, tmax = math.inf, cull_back = False):
+        """Same as intersect, for a ray given as (origin, direction) tuple, e.g. from screen_ray"""
+        return self.intersect(ray[0], ray[1], tmax, cull_back)
+
+    def nearest_point(self, point, max_distance = math.inf):
+        """Finds the point on the triangles closest to the given point
+
+        Returns:
+            tuple: (distance, triangle index, closest point as a tuple), None when nothing is within max_distance
+        """
+        px, py, pz = (float(c) for c in point)
+        boxes = self.boxes
+        first = self.first
+        count = self.count
+        tris = self.tri_vertices
+        if not boxes:
+            return None
+
+        best_d2 = max_distance * max_distance
+        best = None
+        # nodes ordered by squared distance of their boxes from the point
+        heap = [(self.box_distance2(0, px, py, pz), 0)]
+        while heap:
+            d2, node = heapq.heappop(heap)
+            if d2 > best_d2:
+                break
+            c = count[node]
+            if c > 0:
+                for i in range(first[node], first[node] + c):
+                    a, b, t = tris[i]
+                    q = closest_point_on_triangle(px, py, pz, a, b, t)
+                    qd2 = (q[0] - px) ** 2 + (q[1] - py) ** 2 + (q[2] - pz) ** 2
+                    if qd2 < best_d2:
+                        best_d2 = qd2
+                        best = (self.tri_ids[i], tuple(q))
+                continue
+            for child in (first[node], first[node] + 1):
+                cd2 = self.box_distance2(child, px, py, pz)
+                if cd2 <= best_d2:
+                    heapq.heappush(heap, (cd2, child))
+        if best is None:
+            return None
+        return (math.sqrt(best_d2), best[0], best[1])
+
+    def box_distance2(self, node, px, py, pz):
+        """Returns squared distance of the point from the box of the node, 0 inside"""
+        b = self.boxes[node]
+        dx = b[0] - px if px < b[0] else px - b[3] if px > b[3] else 0.0
+        dy = b[1] - py if py < b[1] else py - b[4] if py > b[4] else 0.0
+        dz = b[2] - pz if pz < b[2] else pz - b[5] if pz > b[5] else 0.0
+        return dx * dx + dy * dy + dz * dz
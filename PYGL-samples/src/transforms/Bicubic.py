@@ -0,0 +1,80 @@
+import numpy as np
+from .Point3D import Point3D
+from .Cubic import control_points, parameters, power_basis, power_basis_derivative
+
+class Bicubic:
+    """Bicubic approximation surface in 3D, immutable
+
+    The base and control point matrices are folded into one 4x4 geometry matrix
+    per coordinate, a point of the surface is then V * G * U^T for power basis
+    rows U, V of the parameters. compute_grid evaluates the whole grid of u, v
+    parameters by one tensor product, so a surface can be rebuilt every frame.
+    @author PGRF FIM UHK
+    rewrite PY: Matěj Kolář
+    @version 2022-PY
+    """
+
+    def __init__(self, baseMat, points, startIndex = 0):
+        """Creates bicubic from 4x4 control points
+
+        Args:
+            baseMat (Mat4): base matrix, for instance Cubic.BEZIER
+            points: sequence of 16 control points (Point3D or Vec3D) row by row,
+                or array of shape (16,3), (16,4), (4,4,3) or (4,4,4)
+            startIndex (int, optional): offset of the first point in the sequence. Defaults to 0.
+        """
+        if isinstance(points, np.ndarray) and points.ndim == 3:
+            points = points.reshape(16, -1)
+        self.baseMat = baseMat
+        base = np.asarray(baseMat.mat, dtype=np.float64)
+        p = control_points(points, startIndex, 16).reshape(4, 4, 3)
+        # rows of p (index a) are the cubics in u, u runs along each row (index b)
+        self.geometry = np.einsum("ka,abc,lb->klc", base, p, base)
+
+    def compute(self, paramU, paramV):
+        """Returns Point3D on the surface corresponding to the u,v parameters from [0,1]"""
+        x, y, z = (float(c) for c in self.compute_grid([paramU], [paramV])[0, 0])
+        return Point3D(x, y, z)
+
+    def evaluate(self, bv, bu):
+        """Returns (V,U,3) products bv * G * bu^T of (V,4) and (U,4) basis rows"""
+        # (3,V,4) @ (4,U) as two matrix products per coordinate
+        res = (bv @ self.geometry.transpose(2, 0, 1)) @ bu.T
+        return res.transpose(1, 2, 0)
+
+    def compute_grid(self, paramsU, paramsV, normals = False):
+        """Evaluates the surface in all combinations of the given parameters
+
+        Args:
+            paramsU: u parameters from [0,1] (clamped), or their number
+            paramsV: v parameters from [0,1] (clamped), or their number
+            normals (bool, optional): compute also unit normals (du x dv). Defaults to False.
+
+        Returns:
+            (len(v), len(u), 3) float32 array of points, with normals a tuple of two such arrays
+        """
+        u = parameters(paramsU)
+        v = parameters(paramsV)
+        bu = power_basis(u)
+        bv = power_basis(v)
+        res = np.ascontiguousarray(self.evaluate(bv, bu), dtype=np.float32)
+        if not normals:
+            return res
+        du = self.evaluate(bv, power_basis_derivative(u))
+        dv = self.evaluate(power_basis_derivative(v), bu)
+        n = np.cross(du, dv)
+        length = np.linalg.norm(n, axis=-1, keepdims=True)
+        length[length == 0] = 1
+        return res, np.ascontiguousarray(n / length, dtype=np.float32)
+
+    @staticmethod
+    def grid_indices(countU, countV):
+        """Returns index buffer data of the triangle list covering a countV x countU grid of vertices
+        stored row by row (as returned by compute_grid), uint16 when possible"""
+        dtype = np.uint16 if countU * countV <= 65535 else np.uint32
+        row = np.arange(countV - 1)[:, None] * countU
+        a = (row + np.arange(countU - 1)).reshape(-1)
+        b = a + 1
+        c = a + countU
+        d = c + 1
+        return np.stack([a, b, c, b, d, c], axis=-1).reshape(-1).astype(dtype)
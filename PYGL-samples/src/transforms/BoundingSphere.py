@@ -0,0 +1,60 @@
+import numpy as np
+from .AABB import AABB, vertex_array, matrix_array
+
+class BoundingSphere:
+    """Array of bounding spheres stored as (N,3) float32 centers and (N,) radii, immutable"""
+
+    def __init__(self, centers = None, radii = None):
+        """Creates spheres from (N,3) centers and (N,) radii, no spheres by default"""
+        if centers is None:
+            centers = np.zeros((0, 3))
+            radii = np.zeros(0)
+        self.center = np.ascontiguousarray(np.asarray(centers, dtype=np.float32).reshape(-1, 3))
+        self.radius = np.ascontiguousarray(np.asarray(radii, dtype=np.float32).reshape(-1))
+
+    @staticmethod
+    def from_vertices(vertices):
+        """Creates a single sphere enclosing the given vertices, centered in their bounding box"""
+        v = vertex_array(vertices)
+        if len(v) == 0:
+            return BoundingSphere(np.zeros(3), -1)
+        center = AABB.from_vertices(v).centers()[0]
+        radius = np.sqrt(np.max(np.sum((v - center) ** 2, axis=1)))
+        return BoundingSphere(center, radius)
+
+    @staticmethod
+    def from_aabb(boxes:"AABB"):
+        """Creates spheres circumscribed to the given boxes"""
+        return BoundingSphere(boxes.centers(), np.linalg.norm(boxes.extents(), axis=1))
+
+    @staticmethod
+    def from_meshes(meshes):
+        """Creates one sphere per vertex array in the given sequence"""
+        spheres = [BoundingSphere.from_vertices(v) for v in meshes]
+        return BoundingSphere(np.concatenate([s.center for s in spheres]), np.concatenate([s.radius for s in spheres]))
+
+    def __len__(self):
+        return len(self.radius)
+
+    def __getitem__(self, index):
+        """Returns BoundingSphere of the sphere at the given index, or of the selected spheres"""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 or None)
+        return BoundingSphere(self.center[index], self.radius[index])
+
+    def transform(self, matrices):
+        """Returns spheres enclosing the spheres transformed by affine matrices
+
+        Args:
+            matrices: one Mat4 for all spheres, or (N,4,4) array / Mat4Array with one matrix per sphere.
+                A single sphere transformed by N matrices gives N spheres (mesh instances).
+        """
+        m = matrix_array(matrices)
+        rot = m[..., :3, :3]
+        c = np.einsum("...j,...jk->...k", self.center, rot) + m[..., 3, :3]
+        # radius is scaled by the largest scale factor of the matrix
+        scale = np.sqrt(np.max(np.sum(rot * rot, axis=-1), axis=-1))
+        return BoundingSphere(c, self.radius * scale)
+
+    def __str__(self):
+        return f"BoundingSphere({len(self)})\n center {self.center}\n radius {self.radius}"
@@ -42,12 +42,12 @@ class Camera:
                 (math.cos(azimuth) * math.cos(zenith + math.pi / 2)),
                 (math.sin(azimuth) * math.cos(zenith + math.pi / 2)),
                 math.sin(zenith + math.pi / 2))
+        # Mat4ViewRH normalizes the view vector, it does not have to be scaled by radius
         if first_person:
-            eye = Vec3D().from_vec3(self.pos)
-            self.view = Mat4ViewRH(self.pos, self.view_vector.mul_scal(radius), up_vector)
+            self.view = Mat4ViewRH(self.pos, self.view_vector, up_vector)
         else:
             eye = self.pos.add(self.view_vector.mul_scal(-radius))
-            self.view = Mat4ViewRH(eye, self.view_vector.mul_scal(radius), up_vector)
+            self.view = Mat4ViewRH(eye, self.view_vector, up_vector)
 
     def add_azimuth(self,ang):
         """Returns a new camera with azimuth summed with the given value
@@ -0,0 +1,151 @@
+# ##
+# Mutable variant of Camera for interactive control. Methods of Camera change
+# this object and return it, so code written for the immutable camera, e.g.
+# self.cam = self.cam.add_azimuth(a).add_zenith(z), works unchanged. Input
+# events only accumulate the changes, view vector and view matrix are
+# recomputed lazily when they are read, at most once per frame. The view matrix
+# object stays the same until the camera changes.
+# #
+import math
+from .Vec3D import Vec3D
+from .Mat4ViewRH import Mat4ViewRH
+from .Camera import Camera
+
+class CameraController:
+    def __init__(self, pos = (0,0,0), azimuth = 0, zenith = 0, radius = 1, first_person = True):
+        """Creates a camera with the given parameters, same as Camera"""
+        if isinstance(pos, Vec3D):
+            self.pos = Vec3D().from_vec3(pos)
+        else:
+            self.pos = Vec3D().from_list(pos)
+        self.azimuth = azimuth
+        self.zenith = zenith
+        self.radius = radius
+        self.first_person = first_person
+        self.changed()
+
+    def changed(self):
+        """Mark the view for recomputation"""
+        self.dirty = True
+        self.angles_dirty = True
+
+    def update_angles(self):
+        if self.angles_dirty:
+            ca = math.cos(self.azimuth)
+            sa = math.sin(self.azimuth)
+            cz = math.cos(self.zenith)
+            sz = math.sin(self.zenith)
+            self.view_vector_cache = Vec3D(ca * cz, sa * cz, sz)
+            # zenith + pi/2
+            self.up_vector_cache = Vec3D(-ca * sz, -sa * sz, cz)
+            self.angles_dirty = False
+
+    @property
+    def view_vector(self):
+        self.update_angles()
+        return self.view_vector_cache
+
+    @property
+    def view(self):
+        """View matrix, recomputed only when the camera changed since the last read"""
+        if self.dirty:
+            self.update_angles()
+            if self.first_person:
+                eye = self.pos
+            else:
+                eye = self.pos.add(self.view_vector_cache.mul_scal(-self.radius))
+            self.view_cache = Mat4ViewRH(eye, self.view_vector_cache, self.up_vector_cache)
+            self.dirty = False
+        return self.view_cache
+
+    def add_azimuth(self, ang):
+        """Adds the given angle to azimuth
+            parameters:
+            ang: azimuth change in radians
+        """
+        self.azimuth += ang
+        self.changed()
+        return self
+
+    def add_radius(self, dist):
+        """Adds the given value to radius. Radius is kept >= 0.1"""
+        self.radius = max(self.radius + dist, 0.1)
+        self.dirty = True
+        return self
+
+    def add_zenith(self, ang):
+        """Adds the given angle to zenith. Zenith is kept in [-pi/2, pi/2]"""
+        self.zenith = max(-math.pi / 2, min(self.zenith + ang, math.pi / 2))
+        self.changed()
+        return self
+
+    def backward(self, speed):
+        return self.forward(-speed)
+
+    def down(self, speed):
+        return self.up(-speed)
+
+    def forward(self, speed):
+        """Moves the camera in the direction of the view vector by the given distance"""
+        self.pos.iadd(self.view_vector.mul_scal(speed))
+        self.dirty = True
+        return self
+
+    def left(self, speed):
+        return self.right(-speed)
+
+    def move(self, dir):
+        """Moves the camera by the given vector"""
+        self.pos.iadd(dir)
+        self.dirty = True
+        return self
+
+    def mul_radius(self, scale):
+        """Multiplies radius by the given coefficient. Radius is kept >= 0.1"""
+        self.radius = max(self.radius * scale, 0.1)
+        self.dirty = True
+        return self
+
+    def right(self, speed):
+        """Moves the camera to the right from the observer's perspective by the given distance"""
+        self.pos.iadd(Vec3D(math.sin(self.azimuth) * speed, -math.cos(self.azimuth) * speed, 0.0))
+        self.dirty = True
+        return self
+
+    def up(self, speed):
+        """Moves the camera in the direction of z-axis by the given distance"""
+        self.pos.z += speed
+        self.dirty = True
+        return self
+
+    def with_azimuth(self, ang):
+        self.azimuth = ang
+        self.changed()
+        return self
+
+    def with_first_person(self, first_person):
+        self.first_person = first_person
+        self.dirty = True
+        return self
+
+    def with_position(self, pos):
+        self.pos = Vec3D().from_vec3(pos) if isinstance(pos, Vec3D) else Vec3D().from_list(pos)
+        self.dirty = True
+        return self
+
+    def with_radius(self, radius):
+        self.radius = radius
+        self.dirty = True
+        return self
+
+    def with_zenith(self, ang):
+        self.zenith = ang
+        self.changed()
+        return self
+
+    def to_camera(self):
+        """Returns immutable Camera with the current parameters"""
+        return Camera(self.pos, self.azimuth, self.zenith, self.radius, self.first_person)
+
+    def to_string(self):
+        return f"CameraController()\n .withFirst_person({self.first_person})\n .withPosition({self.pos})\n .with_azimuth({self.azimuth})\n .with_zenith({self.zenith})\n.withRadius({self.radius})"
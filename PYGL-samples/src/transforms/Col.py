@@ -0,0 +1,115 @@
+import numpy as np
+
+class Col:
+    """RGBA color with double-precision components, immutable
+
+    Components are usually in [0,1], they are not clamped until saturate is called.
+    @author PGRF FIM UHK
+    rewrite PY: Matěj Kolář
+    @version 2022-PY
+    """
+    __slots__ = ("r", "g", "b", "a")
+
+    def __init__(self, r = 0.0, g = 0.0, b = 0.0, a = 1.0):
+        """Creates a color from float components, opaque black by default"""
+        self.r = r
+        self.g = g
+        self.b = b
+        self.a = a
+
+    @staticmethod
+    def from_rgb(rgb):
+        """Creates an opaque color from 0xRRGGBB integer"""
+        return Col(((rgb >> 16) & 0xff) / 255.0, ((rgb >> 8) & 0xff) / 255.0, (rgb & 0xff) / 255.0)
+
+    @staticmethod
+    def from_argb(argb, isAlpha = True):
+        """Creates a color from 0xAARRGGBB integer, alpha is 1 if isAlpha is False"""
+        a = ((argb >> 24) & 0xff) / 255.0 if isAlpha else 1.0
+        return Col(((argb >> 16) & 0xff) / 255.0, ((argb >> 8) & 0xff) / 255.0, (argb & 0xff) / 255.0, a)
+
+    @staticmethod
+    def from_bytes(r, g, b, a = 255):
+        """Creates a color from components in [0,255]"""
+        return Col(r / 255.0, g / 255.0, b / 255.0, a / 255.0)
+
+    @staticmethod
+    def from_point3(p):
+        """Creates a color from x, y, z, w of the given Point3D"""
+        return Col(p.x, p.y, p.z, p.w)
+
+    def __iter__(self):
+        return iter((self.r, self.g, self.b, self.a))
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return (self.r, self.g, self.b, self.a)[index]
+
+    def __eq__(self, obj):
+        if not isinstance(obj, Col):
+            return NotImplemented
+        return tuple(self) == tuple(obj)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return f"Col({self.r}, {self.g}, {self.b}, {self.a})"
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(tuple(self), dtype=dtype or np.float32)
+
+    def to_array(self):
+        return [self.r, self.g, self.b, self.a]
+
+    def to_buffer(self):
+        """Returns components as float32 array, can be passed directly to glUniform4fv"""
+        return np.array((self.r, self.g, self.b, self.a), dtype=np.float32)
+
+    def add_na(self, c:"Col"):
+        """Returns the sum of colors, alpha is set to 1"""
+        return Col(self.r + c.r, self.g + c.g, self.b + c.b)
+
+    def mul_na(self, x):
+        """Returns the color multiplied by the given scalar, alpha is set to 1"""
+        return Col(self.r * x, self.g * x, self.b * x)
+
+    def add(self, c:"Col"):
+        """Returns the component-wise sum of colors including alpha"""
+        return Col(self.r + c.r, self.g + c.g, self.b + c.b, self.a + c.a)
+
+    def mul(self, c):
+        """Returns the component-wise product with the given color, or multiplication by a scalar"""
+        if isinstance(c, Col):
+            return Col(self.r * c.r, self.g * c.g, self.b * c.b, self.a * c.a)
+        return Col(self.r * c, self.g * c, self.b * c, self.a * c)
+
+    def gamma(self, gamma):
+        """Returns the color with r, g, b raised to the given power, alpha is kept"""
+        return Col(self.r ** gamma, self.g ** gamma, self.b ** gamma, self.a)
+
+    def saturate(self):
+        """Returns the color with r, g, b clamped to [0,1], alpha is kept"""
+        return Col(max(0, min(self.r, 1)), max(0, min(self.g, 1)), max(0, min(self.b, 1)), self.a)
+
+    def get_rgb(self):
+        """Returns the color as 0xRRGGBB integer"""
+        return (int(self.r * 255.0) << 16) | (int(self.g * 255.0) << 8) | int(self.b * 255.0)
+
+    def get_argb(self):
+        """Returns the color as 0xAARRGGBB integer"""
+        return (int(self.a * 255.0) << 24) | self.get_rgb()
+
+    def equals(self, obj):
+        """Compares this object against the specified object."""
+        return self is obj or isinstance(obj, Col) and tuple(self) == tuple(obj)
+
+    def e_equals(self, col, epsilon = 1e-15):
+        """Compares components with the relative tolerance epsilon"""
+        return self is col or col is not None and all(
+            abs(a - b) <= epsilon * abs(a) for a, b in zip(self, col))
+
+    def __str__(self):
+        return f"({self.r:4.1f},{self.g:4.1f},{self.b:4.1f},{self.a:4.1f})"
@@ -0,0 +1,112 @@
+import numpy as np
+from .Col import Col
+
+class ColArray:
+    """Array of RGBA colors stored as contiguous (N,4) float32 array,
+    operations are evaluated for all colors at once, immutable
+
+    Operands of binary operations can be ColArray, Col (applied to all colors),
+    a number or anything numpy can broadcast to (N,4). The colors can be passed
+    to OGLBuffers as they are, or packed to 4 bytes per color by to_rgba8.
+    """
+
+    def __init__(self, data = None):
+        """Creates an array of colors
+
+        Args:
+            data (optional): (N,4) array-like, list of Col or number of opaque black colors. Defaults to empty array.
+        """
+        if data is None:
+            data = np.zeros((0, 4), dtype=np.float32)
+        elif isinstance(data, int):
+            data = np.zeros((data, 4), dtype=np.float32)
+            data[:, 3] = 1
+        elif len(data) > 0 and isinstance(data[0], Col):
+            data = [c.to_array() for c in data]
+        self.data = np.ascontiguousarray(np.asarray(data, dtype=np.float32).reshape(-1, 4))
+
+    @staticmethod
+    def wrap(data):
+        """Creates ColArray around a float32 (N,4) array without copying"""
+        res = ColArray.__new__(ColArray)
+        res.data = data
+        return res
+
+    @staticmethod
+    def operand(c):
+        """Returns operand as array broadcastable to (N,4)"""
+        if isinstance(c, ColArray):
+            return c.data
+        if isinstance(c, Col):
+            return np.array(c.to_array(), dtype=np.float32)
+        return np.asarray(c, dtype=np.float32)
+
+    @staticmethod
+    def from_argb(argb, isAlpha = True):
+        """Creates colors from an array of 0xAARRGGBB integers, alpha is 1 if isAlpha is False"""
+        argb = np.asarray(argb, dtype=np.uint32).reshape(-1)
+        shifts = np.array([16, 8, 0, 24], dtype=np.uint32)
+        res = ((argb[:, None] >> shifts) & 0xff).astype(np.float32) / 255
+        if not isAlpha:
+            res[:, 3] = 1
+        return ColArray.wrap(res)
+
+    @staticmethod
+    def from_rgba8(data):
+        """Creates colors from (N,4) uint8 array (as returned by to_rgba8)"""
+        return ColArray.wrap(np.asarray(data, dtype=np.uint8).reshape(-1, 4).astype(np.float32) / 255)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """Returns color at the given index as Col, or ColArray for slices and index arrays"""
+        if isinstance(index, (int, np.integer)):
+            return Col(*(float(c) for c in self.data[index]))
+        return ColArray.wrap(np.ascontiguousarray(self.data[index]))
+
+    def __iter__(self):
+        return (Col(*c) for c in self.data.tolist())
+
+    def to_array(self):
+        """Returns the underlying (N,4) float32 array"""
+        return self.data
+
+    def to_rgba8(self):
+        """Returns (N,4) uint8 array of saturated colors, a vertex attribute with
+        GL_UNSIGNED_BYTE type and normalization, or texture data of GL_RGBA format"""
+        return np.clip(self.data * 255 + 0.5, 0, 255).astype(np.uint8)
+
+    def to_argb(self):
+        """Returns (N,) uint32 array of 0xAARRGGBB integers, same rounding as Col.get_argb"""
+        c = (np.clip(self.data, 0, 1) * 255).astype(np.uint32)
+        return (c[:, 3] << 24) | (c[:, 0] << 16) | (c[:, 1] << 8) | c[:, 2]
+
+    def add(self, c):
+        return ColArray.wrap(self.data + ColArray.operand(c))
+
+    def mul(self, c):
+        """Component-wise multiplication by colors, a scalar or (N,1) array of scalars"""
+        return ColArray.wrap(self.data * ColArray.operand(c))
+
+    def gamma(self, gamma):
+        """Returns the colors with r, g, b raised to the given power, alpha is kept"""
+        res = np.array(self.data)
+        res[:, :3] **= gamma
+        return ColArray.wrap(res)
+
+    def saturate(self):
+        """Returns the colors with r, g, b clamped to [0,1], alpha is kept"""
+        res = np.array(self.data)
+        np.clip(res[:, :3], 0, 1, out=res[:, :3])
+        return ColArray.wrap(res)
+
+    def lerp(self, c, t):
+        """Linear interpolation to the given colors, t is a number or (N,) array from [0,1]"""
+        t = np.asarray(t, dtype=np.float32)
+        if t.ndim == 1:
+            t = t[:, None]
+        return ColArray.wrap(self.data + (ColArray.operand(c) - self.data) * t)
+
+    def __str__(self):
+        return str(self.data)
@@ -0,0 +1,125 @@
+import numpy as np
+from .Mat4 import Mat4
+from .Point3D import Point3D
+
+def control_points(points, startIndex = 0, count = 4):
+    """Returns (count,3) float64 array of x, y, z of control points given as
+    a sequence of Point3D/Vec3D or as an array with 3 or 4 columns (w is ignored)"""
+    points = points[startIndex:startIndex + count]
+    if len(points) > 0 and not isinstance(points, np.ndarray) and hasattr(points[0], "x"):
+        return np.array([(p.x, p.y, p.z) for p in points], dtype=np.float64)
+    return np.array(points, dtype=np.float64)[..., :3].reshape(count, 3)
+
+def parameters(params):
+    """Returns float64 array of parameters clamped to [0,1],
+    an integer n gives n uniformly spaced parameters including both ends"""
+    if isinstance(params, (int, np.integer)):
+        return np.linspace(0.0, 1.0, params)
+    return np.clip(np.asarray(params, dtype=np.float64).reshape(-1), 0.0, 1.0)
+
+def power_basis(t):
+    """Returns (N,4) rows (t^3, t^2, t, 1) for the given parameters"""
+    res = np.empty((len(t), 4))
+    res[:, 3] = 1
+    res[:, 2] = t
+    res[:, 1] = t * t
+    res[:, 0] = res[:, 1] * t
+    return res
+
+def power_basis_derivative(t):
+    """Returns (N,4) rows (3t^2, 2t, 1, 0), derivatives of power_basis"""
+    res = np.zeros((len(t), 4))
+    res[:, 2] = 1
+    res[:, 1] = 2 * t
+    res[:, 0] = 3 * t * t
+    return res
+
+class Cubic:
+    """Cubic approximation curve in 3D, immutable
+
+    Points of the curve are evaluated for a whole array of parameters at once,
+    compute_array returns float32 (N,3) positions that can be passed directly
+    to OGLBuffers.
+    @author PGRF FIM UHK
+    rewrite PY: Matěj Kolář
+    @version 2022-PY
+    """
+
+    # Bezier base matrix
+    BEZIER = Mat4().from_array(np.array([
+            -1, 3, -3, 1,
+            3, -6, 3, 0,
+            -3, 3, 0, 0,
+            1, 0, 0, 0], dtype=np.float64))
+
+    # Coons base matrix
+    COONS = Mat4().from_array(np.array([
+            -1, 3, -3, 1,
+            3, -6, 3, 0,
+            -3, 0, 3, 0,
+            1, 4, 1, 0]) / 6.0)
+
+    # Ferguson base matrix
+    FERGUSON = Mat4().from_array(np.array([
+            2, -2, 1, 1,
+            -3, 3, -2, -1,
+            0, 0, 1, 0,
+            1, 0, 0, 0], dtype=np.float64))
+
+    def __init__(self, baseMat, p1, p2 = None, p3 = None, p4 = None, startIndex = 0):
+        """Creates cubic from 4 control points
+
+        Args:
+            baseMat (Mat4): base matrix, for instance Cubic.BEZIER
+            p1: first control point (Point3D or Vec3D), or a sequence/array of control points
+            p2, p3, p4: remaining control points when given individually
+            startIndex (int, optional): offset of the first point in the sequence. Defaults to 0.
+        """
+        if p2 is not None:
+            p1 = [p1, p2, p3, p4]
+        self.baseMat = baseMat
+        # control polygon matrix (base matrix * control points matrix)
+        self.controlMat = np.asarray(baseMat.mat, dtype=np.float64) @ control_points(p1, startIndex)
+
+    def compute(self, param):
+        """Returns Point3D on the curve corresponding to the parameter from [0,1]"""
+        x, y, z = (float(c) for c in self.compute_array([param])[0])
+        return Point3D(x, y, z)
+
+    def compute_array(self, params):
+        """Returns (N,3) float32 array of points on the curve
+
+        Args:
+            params: parameters from [0,1] (clamped), or number of uniformly spaced parameters
+        """
+        t = parameters(params)
+        return (power_basis(t) @ self.controlMat).astype(np.float32)
+
+    def tangent_array(self, params):
+        """Returns (N,3) float32 array of derivatives of the curve with respect to the parameter"""
+        t = parameters(params)
+        return (power_basis_derivative(t) @ self.controlMat).astype(np.float32)
+
+    @staticmethod
+    def compute_segments(baseMat, points, params, step = 1):
+        """Evaluates a piecewise cubic curve given by a control polygon, all segments at once
+
+        Args:
+            baseMat (Mat4): base matrix, for instance Cubic.COONS
+            points: sequence or (M,3) array of control points
+            params: parameters of every segment, or their number
+            step (int, optional): index difference of the first points of neighbouring segments,
+                1 for Coons splines, 3 for joined Bezier curves. Defaults to 1.
+
+        Returns:
+            (S*N,3) float32 array of points, segments one after another
+        """
+        p = control_points(points, 0, len(points))
+        count = (len(p) - 4) // step + 1
+        if count <= 0:
+            return np.zeros((0, 3), dtype=np.float32)
+        # (S,4,3) control points of all segments
+        index = np.arange(count)[:, None] * step + np.arange(4)
+        control = np.asarray(baseMat.mat, dtype=np.float64) @ p[index]
+        res = power_basis(parameters(params)) @ control
+        return res.reshape(-1, 3).astype(np.float32)
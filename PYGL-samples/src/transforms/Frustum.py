@@ -0,0 +1,84 @@
+import numpy as np
+from .AABB import matrix_array
+
+class Frustum:
+    """View frustum given by 6 planes extracted from a view-projection matrix,
+    tests whole arrays of bounding volumes at once
+
+    Planes (a, b, c, d) are normalized and point inside, a point p is inside
+    when a*x + b*y + c*z + d >= 0 for all planes. The matrix follows the Mat4
+    convention (row vectors), i.e. view.mul_mat4(projection), and maps the view
+    volume to [-1,1]x[-1,1]x[0,1] as Mat4PerspRH and Mat4OrthoRH do.
+
+    Tests count visible and culled objects until reset_stats is called, e.g.
+    once per frame, so the saved draw calls can be displayed.
+    """
+
+    def __init__(self, viewProj = None):
+        """Creates a frustum from the given view-projection Mat4 or 4x4 array
+
+        Args:
+            viewProj (optional): view * projection matrix, the planes are set later by update when None
+        """
+        self.planes = np.zeros((6, 4), dtype=np.float32)
+        self.visible_count = 0
+        self.culled_count = 0
+        if viewProj is not None:
+            self.update(viewProj)
+
+    @staticmethod
+    def from_view_projection(view, proj):
+        """Creates a frustum of the given view (e.g. Mat4ViewRH or Camera.view) and projection matrices"""
+        return Frustum(np.matmul(matrix_array(view), matrix_array(proj)))
+
+    def update(self, viewProj):
+        """Extracts the planes from the given view-projection matrix, e.g. after the camera moved"""
+        m = matrix_array(viewProj).astype(np.float64)
+        # clip coordinates are p * M, columns of M give x, y, z and w of the clip coordinates
+        x, y, z, w = m[:, 0], m[:, 1], m[:, 2], m[:, 3]
+        planes = np.array([w + x, w - x, w + y, w - y, z, w - z])
+        planes /= np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+        self.planes = planes.astype(np.float32)
+        return self
+
+    def reset_stats(self):
+        self.visible_count = 0
+        self.culled_count = 0
+
+    def count(self, visible):
+        self.visible_count += int(np.count_nonzero(visible))
+        self.culled_count += int(visible.size - np.count_nonzero(visible))
+        return visible
+
+    def distances(self, points):
+        """Returns (N,6) signed distances of (N,3) points from the planes"""
+        p = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        return p @ self.planes[:, :3].T + self.planes[:, 3]
+
+    def test_points(self, points):
+        """Returns (N,) bool mask of points inside the frustum"""
+        return self.count(np.all(self.distances(points) >= 0, axis=1))
+
+    def test_spheres(self, spheres):
+        """Returns (N,) bool mask of BoundingSphere spheres at least partially inside the frustum"""
+        return self.count(np.all(self.distances(spheres.center) >= -spheres.radius[:, None], axis=1))
+
+    def test_boxes(self, boxes):
+        """Returns (N,) bool mask of AABB boxes at least partially inside the frustum
+
+        A box is culled when it is entirely behind one of the planes, boxes close
+        to frustum corners may be reported visible (conservative test).
+        """
+        # distance of the box corner furthest along the plane normal
+        radius = boxes.extents() @ np.abs(self.planes[:, :3]).T
+        return self.count(np.all(self.distances(boxes.centers()) >= -radius, axis=1))
+
+    def visible_indices(self, volumes):
+        """Returns indices of visible AABB or BoundingSphere volumes"""
+        if hasattr(volumes, "radius"):
+            return np.flatnonzero(self.test_spheres(volumes))
+        return np.flatnonzero(self.test_boxes(volumes))
+
+    def stats_string(self):
+        total = self.visible_count + self.culled_count
+        return f"visible {self.visible_count}/{total}, culled {self.culled_count}"
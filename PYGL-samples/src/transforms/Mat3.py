@@ -0,0 +1,161 @@
+import numpy as np
+from .Vec3D import Vec3D
+
+class Mat3:
+    """A 3x3 matrix with common operations, immutable
+    Used as a 2D homogeneous transformation (row vector convention, translation
+    in row 2) or as a 3D linear transformation.
+    @author PGRF FIM UHK
+    rewrite PY: Matěj Kolář
+    @version 2022-PY
+    """
+
+    def __init__(self, val = 0):
+        """Creates a zero 3x3 matrix
+            Providing value will result in 3x3 matrix with given value in every position
+        """
+        self.mat = np.zeros((3,3), dtype=np.float64)
+        if val != 0:
+            self.mat.fill(val)
+
+    @staticmethod
+    def wrap(mat):
+        """Creates Mat3 around the given 3x3 array without copying"""
+        res = Mat3.__new__(Mat3)
+        res.mat = mat
+        return res
+
+    def __getitem__(self, row):
+        """Returns a row of the matrix, so the matrix can be used as a 3x3 sequence"""
+        return self.mat[row]
+
+    def __len__(self):
+        return 3
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.mat, dtype=dtype)
+
+    def from_raw_rows(self, p1, p2, p3):
+        """Creates a 3x3 matrix from row vectors (list, tuple, array or Vec3D)"""
+        self.mat[0] = tuple(p1)
+        self.mat[1] = tuple(p2)
+        self.mat[2] = tuple(p3)
+        return self
+
+    def from_mat3(self, m:"Mat3"):
+        """Creates a 3x3 matrix as a clone of the given 3x3 matrix"""
+        self.mat = np.copy(m.mat)
+        return self
+
+    def from_mat4(self, m):
+        """Creates a 3x3 matrix from the upper left 3x3 submatrix of the given 4x4 matrix"""
+        self.mat = np.array(m.mat[:3, :3], dtype=np.float64)
+        return self
+
+    def from_array(self, m):
+        """Creates a 3x3 matrix row-wise from a 9-element array"""
+        self.mat = np.array(m, dtype=np.float64).reshape((3,3))
+        return self
+
+    def add(self, m:"Mat3"):
+        """Returns the result of element-wise summation with the given 3x3 matrix"""
+        return Mat3.wrap(np.add(self.mat, m.mat))
+
+    def mul_scalar(self, d):
+        """Returns the result of element-wise multiplication by the given scalar value"""
+        return Mat3.wrap(np.multiply(self.mat, d))
+
+    def mul_mat3(self, m:"Mat3"):
+        """Returns the result of matrix multiplication by the given 3x3 matrix"""
+        return Mat3.wrap(np.matmul(self.mat, m.mat))
+
+    def copy(self):
+        """Returns a copy of itself"""
+        return Mat3.wrap(np.copy(self.mat))
+
+    def with_element(self, row:int, column:int, value):
+        """Returns a new matrix with the element on given coordinates set to given value"""
+        res = self.copy()
+        res.mat[row][column] = value
+        return res
+
+    def with_row(self, index:int, row):
+        """Returns a new matrix with the row at the given index set to given 3 values"""
+        res = self.copy()
+        res.mat[index] = tuple(row)
+        return res
+
+    def with_column(self, index:int, column):
+        """Returns a new matrix with the column at the given index set to given 3 values"""
+        res = self.copy()
+        res.mat[:, index] = tuple(column)
+        return res
+
+    def get(self, row:int, column:int):
+        """Returns a matrix element"""
+        return self.mat[row][column]
+
+    def get_row(self, row:int):
+        """Returns a row vector at the given index"""
+        return Vec3D(*self.mat[row].tolist())
+
+    def get_column(self, column:int):
+        """Returns a column vector at the given index"""
+        return Vec3D(*self.mat[:, column].tolist())
+
+    def transpose(self):
+        """Returns the transposition of this matrix"""
+        return Mat3.wrap(np.transpose(self.mat))
+
+    def det(self):
+        """Returns the determinant of this matrix"""
+        m = self.mat
+        return m[0][0] * (m[1][1] * m[2][2] - m[2][1] * m[1][2])\
+             - m[0][1] * (m[1][0] * m[2][2] - m[2][0] * m[1][2])\
+             + m[0][2] * (m[1][0] * m[2][1] - m[2][0] * m[1][1])
+
+    def inverse(self):
+        """Returns the inverse of this matrix if it exists or None"""
+        m = self.mat
+        # rows of the adjugate transposed are cross-products of the rows
+        cof = np.array([np.cross(m[1], m[2]), np.cross(m[2], m[0]), np.cross(m[0], m[1])])
+        det = np.dot(m[0], cof[0])
+        if det == 0:
+            return None
+        return Mat3.wrap(cof.T / det)
+
+    def transform_points(self, points):
+        """Returns (N,2) float32 array of 2D points transformed as homogeneous (x, y, 1)
+        by this matrix and divided by the resulting w
+
+        Args:
+            points: (N,2) array-like of points
+        """
+        p = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        m = self.mat.astype(np.float32)
+        res = p @ m[:2, :] + m[2]
+        return np.ascontiguousarray(res[:, :2] / res[:, 2:])
+
+    def transform_vectors(self, vectors):
+        """Returns (N,3) float32 array of the given vectors multiplied by this matrix"""
+        v = np.asarray(vectors, dtype=np.float32).reshape(-1, 3)
+        return v @ self.mat.astype(np.float32)
+
+    def to_array(self):
+        """Returns this matrix stored row-wise in a array"""
+        return self.mat.flatten()
+
+    def to_3x3array(self):
+        """Returns this matrix stored as 3x3 array"""
+        return np.copy(self.mat)
+
+    def to_gl_array(self):
+        """Returns this matrix as contiguous float32 3x3 array for glUniformMatrix3fv"""
+        return np.ascontiguousarray(self.mat, dtype=np.float32)
+
+    def equals(self, obj):
+        """Compares this object against the specified object."""
+        return self is obj or isinstance(obj, Mat3) and np.array_equal(self.mat, obj.mat)
+
+    def __str__(self):
+        return str(self.mat)
@@ -0,0 +1,13 @@
+from .Mat3 import Mat3
+
+class Mat3Identity(Mat3):
+    """A 3x3 identity matrix
+        @author PGRF FIM UHK
+        rewrite PY: Matěj Kolář
+        @version 2022-PY
+    """
+    def __init__(self):
+        """Creates an identity 3x3 matrix"""
+        super().__init__()
+        for i in range(0,3):
+            self.mat[i][i] = 1
@@ -0,0 +1,20 @@
+from .Mat3Identity import Mat3Identity
+import math
+
+class Mat3Rot2D(Mat3Identity):
+    """A 3x3 matrix of rotation in 2D (about the origin)
+        @author PGRF FIM UHK
+        rewrite PY: Matěj Kolář
+        @version 2022-PY
+    """
+    def __init__(self, alpha):
+        """Creates a 3x3 transformation matrix equivalent to rotation in 2D (about the origin)
+
+        Args:
+            alpha : rotation angle in !radians!
+        """
+        super().__init__()
+        self.mat[0][0] = math.cos(alpha)
+        self.mat[1][1] = math.cos(alpha)
+        self.mat[1][0] = -math.sin(alpha)
+        self.mat[0][1] = math.sin(alpha)
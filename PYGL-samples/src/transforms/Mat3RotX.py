@@ -0,0 +1,20 @@
+from .Mat3Identity import Mat3Identity
+import math
+
+class Mat3RotX(Mat3Identity):
+    """A 3x3 matrix of right-handed rotation about x-axis
+        @author PGRF FIM UHK
+        rewrite PY: Matěj Kolář
+        @version 2022-PY
+    """
+    def __init__(self, alpha):
+        """Creates a 3x3 transformation matrix equivalent to right-handed rotation about x-axis
+
+        Args:
+            alpha : rotation angle in !radians!
+        """
+        super().__init__()
+        self.mat[1][1] = math.cos(alpha)
+        self.mat[2][2] = math.cos(alpha)
+        self.mat[2][1] = -math.sin(alpha)
+        self.mat[1][2] = math.sin(alpha)
@@ -0,0 +1,24 @@
+from .Mat3Identity import Mat3Identity
+
+class Mat3Scale2D(Mat3Identity):
+    """A 3x3 matrix of scaling in 2D
+        @author PGRF FIM UHK
+        rewrite PY: Matěj Kolář
+        @version 2022-PY
+    """
+
+    def __init__(self, x = 1, y = None):
+        """Creates a 3x3 transformation matrix equivalent to scaling in 2D
+
+        Args:
+            x: x-axis scale factor, or Vec2D of both factors
+            y: y-axis scale factor, same as x if not given
+        """
+        super().__init__()
+        if y is None:
+            if hasattr(x, "x"):
+                x, y = x.x, x.y
+            else:
+                y = x
+        self.mat[0][0] = x
+        self.mat[1][1] = y
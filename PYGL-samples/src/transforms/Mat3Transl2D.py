@@ -0,0 +1,24 @@
+from .Mat3Identity import Mat3Identity
+
+class Mat3Transl2D(Mat3Identity):
+    """A 3x3 matrix of translation in 2D
+        @author PGRF FIM UHK
+        rewrite PY: Matěj Kolář
+        @version 2022-PY
+    """
+
+    def __init__(self, x = 0, y = None):
+        """Creates a 3x3 transformation matrix equivalent to translation in 2D
+
+        Args:
+            x: translation along x-axis, or Vec2D of the translation
+            y: translation along y-axis
+        """
+        super().__init__()
+        if y is None:
+            if hasattr(x, "x"):
+                x, y = x.x, x.y
+            else:
+                y = x
+        self.mat[2][0] = x
+        self.mat[2][1] = y
@@ -1,21 +1,140 @@
 import numpy as np
 from .Vec3D import Vec3D
 
+def det_many(m):
+    """Returns (N,) determinants of (N,4,4) matrices"""
+    m = np.asarray(m)
+    s0 = m[..., 0, 0] * m[..., 1, 1] - m[..., 1, 0] * m[..., 0, 1]
+    s1 = m[..., 0, 0] * m[..., 1, 2] - m[..., 1, 0] * m[..., 0, 2]
+    s2 = m[..., 0, 0] * m[..., 1, 3] - m[..., 1, 0] * m[..., 0, 3]
+    s3 = m[..., 0, 1] * m[..., 1, 2] - m[..., 1, 1] * m[..., 0, 2]
+    s4 = m[..., 0, 1] * m[..., 1, 3] - m[..., 1, 1] * m[..., 0, 3]
+    s5 = m[..., 0, 2] * m[..., 1, 3] - m[..., 1, 2] * m[..., 0, 3]
+
+    c5 = m[..., 2, 2] * m[..., 3, 3] - m[..., 3, 2] * m[..., 2, 3]
+    c4 = m[..., 2, 1] * m[..., 3, 3] - m[..., 3, 1] * m[..., 2, 3]
+    c3 = m[..., 2, 1] * m[..., 3, 2] - m[..., 3, 1] * m[..., 2, 2]
+    c2 = m[..., 2, 0] * m[..., 3, 3] - m[..., 3, 0] * m[..., 2, 3]
+    c1 = m[..., 2, 0] * m[..., 3, 2] - m[..., 3, 0] * m[..., 2, 2]
+    c0 = m[..., 2, 0] * m[..., 3, 1] - m[..., 3, 0] * m[..., 2, 1]
+    return s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+
+def inverse_many(m):
+    """Returns inverses of (N,4,4) matrices, computed by the same cofactor
+    expansion as Mat4.inverse, singular matrices result in NaN"""
+    m = np.asarray(m)
+    if not np.issubdtype(m.dtype, np.floating):
+        m = m.astype(np.float64)
+    s0 = m[..., 0, 0] * m[..., 1, 1] - m[..., 1, 0] * m[..., 0, 1]
+    s1 = m[..., 0, 0] * m[..., 1, 2] - m[..., 1, 0] * m[..., 0, 2]
+    s2 = m[..., 0, 0] * m[..., 1, 3] - m[..., 1, 0] * m[..., 0, 3]
+    s3 = m[..., 0, 1] * m[..., 1, 2] - m[..., 1, 1] * m[..., 0, 2]
+    s4 = m[..., 0, 1] * m[..., 1, 3] - m[..., 1, 1] * m[..., 0, 3]
+    s5 = m[..., 0, 2] * m[..., 1, 3] - m[..., 1, 2] * m[..., 0, 3]
+
+    c5 = m[..., 2, 2] * m[..., 3, 3] - m[..., 3, 2] * m[..., 2, 3]
+    c4 = m[..., 2, 1] * m[..., 3, 3] - m[..., 3, 1] * m[..., 2, 3]
+    c3 = m[..., 2, 1] * m[..., 3, 2] - m[..., 3, 1] * m[..., 2, 2]
+    c2 = m[..., 2, 0] * m[..., 3, 3] - m[..., 3, 0] * m[..., 2, 3]
+    c1 = m[..., 2, 0] * m[..., 3, 2] - m[..., 3, 0] * m[..., 2, 2]
+    c0 = m[..., 2, 0] * m[..., 3, 1] - m[..., 3, 0] * m[..., 2, 1]
+    det = s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+
+    # singular matrices get inf * 0, they are replaced by NaN below
+    with np.errstate(divide="ignore", invalid="ignore"):
+        iDet = 1 / det
+        res = np.empty_like(m)
+        res[..., 0, 0] = ( m[..., 1, 1] * c5 - m[..., 1, 2] * c4 + m[..., 1, 3] * c3) * iDet
+        res[..., 0, 1] = (-m[..., 0, 1] * c5 + m[..., 0, 2] * c4 - m[..., 0, 3] * c3) * iDet
+        res[..., 0, 2] = ( m[..., 3, 1] * s5 - m[..., 3, 2] * s4 + m[..., 3, 3] * s3) * iDet
+        res[..., 0, 3] = (-m[..., 2, 1] * s5 + m[..., 2, 2] * s4 - m[..., 2, 3] * s3) * iDet
+
+        res[..., 1, 0] = (-m[..., 1, 0] * c5 + m[..., 1, 2] * c2 - m[..., 1, 3] * c1) * iDet
+        res[..., 1, 1] = ( m[..., 0, 0] * c5 - m[..., 0, 2] * c2 + m[..., 0, 3] * c1) * iDet
+        res[..., 1, 2] = (-m[..., 3, 0] * s5 + m[..., 3, 2] * s2 - m[..., 3, 3] * s1) * iDet
+        res[..., 1, 3] = ( m[..., 2, 0] * s5 - m[..., 2, 2] * s2 + m[..., 2, 3] * s1) * iDet
+
+        res[..., 2, 0] = ( m[..., 1, 0] * c4 - m[..., 1, 1] * c2 + m[..., 1, 3] * c0) * iDet
+        res[..., 2, 1] = (-m[..., 0, 0] * c4 + m[..., 0, 1] * c2 - m[..., 0, 3] * c0) * iDet
+        res[..., 2, 2] = ( m[..., 3, 0] * s4 - m[..., 3, 1] * s2 + m[..., 3, 3] * s0) * iDet
+        res[..., 2, 3] = (-m[..., 2, 0] * s4 + m[..., 2, 1] * s2 - m[..., 2, 3] * s0) * iDet
+
+        res[..., 3, 0] = (-m[..., 1, 0] * c3 + m[..., 1, 1] * c1 - m[..., 1, 2] * c0) * iDet
+        res[..., 3, 1] = ( m[..., 0, 0] * c3 - m[..., 0, 1] * c1 + m[..., 0, 2] * c0) * iDet
+        res[..., 3, 2] = (-m[..., 3, 0] * s3 + m[..., 3, 1] * s1 - m[..., 3, 2] * s0) * iDet
+        res[..., 3, 3] = ( m[..., 2, 0] * s3 - m[..., 2, 1] * s1 + m[..., 2, 2] * s0) * iDet
+    res[det == 0] = np.nan
+    return res
+
+def cofactors3_many(m):
+    """Returns cofactor rows of the upper 3x3 submatrices of (N,4,4) matrices and their determinants"""
+    a = np.asarray(m)[..., :3, :3]
+    cof = np.stack([np.cross(a[..., 1, :], a[..., 2, :]),
+                    np.cross(a[..., 2, :], a[..., 0, :]),
+                    np.cross(a[..., 0, :], a[..., 1, :])], axis=-2)
+    det = np.einsum("...j,...j->...", a[..., 0, :], cof[..., 0, :])
+    return cof, det
+
+def inverse_affine_many(m):
+    """Returns inverses of (N,4,4) affine matrices (last column 0, 0, 0, 1),
+    the 3x3 part is inverted by cross-products, singular matrices result in NaN"""
+    m = np.asarray(m)
+    cof, det = cofactors3_many(m)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv3 = np.swapaxes(cof, -1, -2) / det[..., None, None]
+    res = np.zeros_like(m, dtype=inv3.dtype)
+    res[..., :3, :3] = inv3
+    res[..., 3, :3] = -np.einsum("...j,...jk->...k", m[..., 3, :3], inv3)
+    res[..., 3, 3] = 1
+    return res
+
+def inverse_rigid_many(m):
+    """Returns inverses of (N,4,4) rigid matrices (orthonormal rotation and translation,
+    e.g. Mat4ViewRH), the rotation is only transposed"""
+    m = np.asarray(m)
+    rot = np.swapaxes(m[..., :3, :3], -1, -2)
+    res = np.zeros_like(m)
+    res[..., :3, :3] = rot
+    res[..., 3, :3] = -np.einsum("...j,...jk->...k", m[..., 3, :3], rot)
+    res[..., 3, 3] = 1
+    return res
+
+def normal_matrix_many(m):
+    """Returns (N,3,3) matrices transforming normals by the given (N,4,4) matrices,
+    i.e. transposed inverses of their 3x3 parts"""
+    cof, det = cofactors3_many(m)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cof / det[..., None, None]
+
 class Mat4:
     """A 4x4 matrix with common operations, immutable 
     @author PGRF FIM UHK 
     rewrite PY: Matěj Kolář
     @version 2022-PY
     """
+
+    # float32 copy of mat returned by to_gl_array, cleared by the setters
+    gl_cache = None
     
-    def __init__ (self, val = 0):
+    def __init__ (self, val = 0, dtype = np.float64):
         """Creates a zero 4x4 matrix
-            Providing value will result in 4x4 matrix with given value in every position
+            Providing value will result in 4x4 matrix with given value in every position,
+            a float32 matrix is uploaded to OpenGL without conversion
         """
-        self.mat = np.zeros((4,4))
+        self.mat = np.zeros((4,4), dtype=dtype)
         if val != 0:
             self.mat.fill(val)
 
+    def changed(self):
+        self.gl_cache = None
+
+    @staticmethod
+    def wrap(mat):
+        """Creates Mat4 around the given 4x4 array without copying"""
+        res = Mat4.__new__(Mat4)
+        res.mat = mat
+        return res
+
     def from_raw_rows(self, p1, p2, p3, p4):
         """Creates a 4x4 matrix from row vectors
             Rows should be list,tuple, or array
@@ -30,6 +149,7 @@ class Mat4:
         self.mat[1] = p2
         self.mat[2] = p3
         self.mat[3] = p4
+        self.changed()
         return self
 
     def from_mat4(self,m:"Mat4"):
@@ -37,7 +157,8 @@ class Mat4:
         Args:
             m (Mat4): 4x4 matrix to be cloned
         """
-        self.mat = np.copy(m)
+        self.mat = np.copy(m.mat)
+        self.changed()
         return self
     
     def from_mat3(self, m:"Mat3"):
@@ -50,12 +171,14 @@ class Mat4:
         self.mat[1] = [*m[1],0]
         self.mat[2] = [*m[2],0]
         self.mat[3][3] = 1
+        self.changed()
         return self
 
     def from_array(self, m):
         """Creates a 4x4 matrix row-wise from a 16-element array"""
         arr = np.asarray(m)
         self.mat = arr.reshape((4,4))
+        self.changed()
         return self
 
     def from_2darray(self, m):
@@ -65,35 +188,29 @@ class Mat4:
 
     def add(self, m:"Mat4"):
         """Returns the result of element-wise summation with the given 4x4 matrix"""
-        new_mat = Mat4()
-        new_mat.mat = np.add(self.mat,m.mat)
-        return new_mat
+        return Mat4.wrap(np.add(self.mat,m.mat))
 
     def mul_scalar(self, d):
         """Returns the result of element-wise multiplication by the given scalar value"""
-        new_mat = Mat4()
-        new_mat.mat = np.multiply(self.mat,d)
-        return new_mat
+        return Mat4.wrap(np.multiply(self.mat,d))
 
     def mul_mat4(self, m:"Mat4"):
         """Returns the result of matrix multiplication by the given 4x4 matrix"""
-        new_mat = Mat4()
-        new_mat.mat = np.matmul(self.mat,m.mat)
-        return new_mat
+        return Mat4.wrap(np.matmul(self.mat,m.mat))
     
     def copy(self):
         """Returns a copy of itself"""
-        new_mat = Mat4()
-        new_mat.mat = np.copy(self.mat)
-        return new_mat
+        return Mat4.wrap(np.copy(self.mat))
 
     def set_element(self, row:int, column:int, value):
         """Sets element on given coordinates to given value"""
         self.mat[row][column] = value
+        self.changed()
 
     def set_Row(self, index:int, row):
         """Sets row to given array of 4 values"""
         self.mat[index] = row
+        self.changed()
 
     def set_column(self, index:int, column):
         """Sets column to given array of 4 values"""
@@ -101,6 +218,7 @@ class Mat4:
         self.mat[1][index] = column[1]
         self.mat[2][index] = column[2]
         self.mat[3][index] = column[3]
+        self.changed()
 
     def get(self, row:int, column:int):
         """Returns a matrix element"""
@@ -120,9 +238,7 @@ class Mat4:
 
     def transpose(self):
         """Returns the transposition of this matrix"""
-        result = Mat4()
-        result.mat = np.transpose(self.mat)
-        return result
+        return Mat4.wrap(np.transpose(self.mat))
 
     def det(self):
         """Returns the determinant of this matrix"""
@@ -184,6 +300,17 @@ class Mat4:
         res.mat[3][3] = ( self.mat[2][0] * s3 - self.mat[2][1] * s1 + self.mat[2][2] * s0) * iDet
         return res
 
+    def inverse_affine(self):
+        """Returns the inverse of this affine matrix (last column 0, 0, 0, 1) if it exists or None"""
+        res = Mat4.wrap(inverse_affine_many(self.mat))
+        if np.isnan(res.mat[0][0]):
+            return None
+        return res
+
+    def inverse_rigid(self):
+        """Returns the inverse of this matrix composed only of rotation and translation"""
+        return Mat4.wrap(inverse_rigid_many(self.mat))
+
     def to_array(self):
         """Returns this matrix stored row-wise in a array"""
         return self.copy().mat.flatten()
@@ -192,6 +319,16 @@ class Mat4:
         """Returns this matrix stored as 4x4 array"""
         return self.copy().mat
 
+    def to_gl_array(self):
+        """Returns this matrix as contiguous float32 4x4 array for glUniformMatrix4fv,
+        without copying when the matrix is stored in float32, otherwise converted once
+        and kept until a setter changes the matrix. The result must not be modified."""
+        if self.mat.dtype == np.float32 and self.mat.flags.c_contiguous:
+            return self.mat
+        if self.gl_cache is None:
+            self.gl_cache = np.ascontiguousarray(self.mat, dtype=np.float32)
+        return self.gl_cache
+
     def equals(self,obj):
         """Compares this object against the specified object."""
         return self == obj or obj is not None and isinstance(self,Mat4)\
@@ -0,0 +1,133 @@
+import numpy as np
+from .Mat4 import Mat4, det_many, inverse_many, inverse_affine_many, inverse_rigid_many, normal_matrix_many
+from .Vec3Array import Vec3Array
+
+class Mat4Array:
+    """Array of 4x4 matrices stored as contiguous (N,4,4) float32 array,
+    operations are evaluated for all matrices at once, immutable
+
+    Matrices use the same row-vector convention as Mat4 (translation in the last row),
+    to_array() can be passed directly to glUniformMatrix4fv(loc, N, False, ...).
+    """
+
+    def __init__(self, data = None):
+        """Creates an array of matrices
+
+        Args:
+            data (optional): (N,4,4) array-like, list of Mat4 or number of identity matrices. Defaults to empty array.
+        """
+        if data is None:
+            data = np.zeros((0, 4, 4), dtype=np.float32)
+        elif isinstance(data, int):
+            data = np.tile(np.identity(4, dtype=np.float32), (data, 1, 1))
+        elif len(data) > 0 and isinstance(data[0], Mat4):
+            data = [m.mat for m in data]
+        self.data = np.ascontiguousarray(np.asarray(data, dtype=np.float32).reshape(-1, 4, 4))
+
+    @staticmethod
+    def wrap(data):
+        """Creates Mat4Array around a float32 (N,4,4) array without copying"""
+        res = Mat4Array.__new__(Mat4Array)
+        res.data = data
+        return res
+
+    @staticmethod
+    def operand(m):
+        """Returns operand as array broadcastable to (N,4,4)"""
+        if isinstance(m, Mat4Array):
+            return m.data
+        if isinstance(m, Mat4):
+            return m.to_gl_array()
+        return np.asarray(m, dtype=np.float32)
+
+    @staticmethod
+    def operand_array(m):
+        """Returns operand as Mat4Array, a single matrix becomes array of length 1"""
+        if isinstance(m, Mat4Array):
+            return m
+        return Mat4Array.wrap(Mat4Array.operand(m).reshape(-1, 4, 4))
+
+    @staticmethod
+    def translation(offsets):
+        """Creates translation matrices from (N,3) offsets or Vec3Array"""
+        offsets = Vec3Array.operand(offsets).reshape(-1, 3)
+        res = Mat4Array(len(offsets))
+        res.data[:, 3, :3] = offsets
+        return res
+
+    @staticmethod
+    def scale(factors):
+        """Creates scaling matrices from (N,3) scale factors or Vec3Array"""
+        factors = Vec3Array.operand(factors).reshape(-1, 3)
+        res = Mat4Array(len(factors))
+        res.data[:, [0, 1, 2], [0, 1, 2]] = factors
+        return res
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """Returns matrix at the given index as Mat4, or Mat4Array for slices and index arrays"""
+        if isinstance(index, (int, np.integer)):
+            return Mat4().from_2darray(self.data[index])
+        return Mat4Array.wrap(np.ascontiguousarray(self.data[index]))
+
+    def to_array(self):
+        """Returns the underlying (N,4,4) float32 array"""
+        return self.data
+
+    def mul_mat4(self, m):
+        """Returns the composition with the given matrix (Mat4) or matrices (Mat4Array, one per matrix),
+        i.e. this transformation followed by the given one"""
+        return Mat4Array.wrap(np.matmul(self.data, Mat4Array.operand(m)))
+
+    def transpose(self):
+        return Mat4Array.wrap(np.ascontiguousarray(self.data.transpose(0, 2, 1)))
+
+    def det(self):
+        """Returns (N,) array of determinants"""
+        return det_many(self.data)
+
+    def inverse(self):
+        """Returns the inverses of all matrices, singular matrices result in NaN"""
+        return Mat4Array.wrap(inverse_many(self.data))
+
+    def inverse_affine(self):
+        """Returns the inverses of affine matrices (last column 0, 0, 0, 1)"""
+        return Mat4Array.wrap(inverse_affine_many(self.data))
+
+    def inverse_rigid(self):
+        """Returns the inverses of matrices composed only of rotation and translation"""
+        return Mat4Array.wrap(inverse_rigid_many(self.data))
+
+    def normal_matrix(self):
+        """Returns (N,3,3) float32 array of matrices for transforming normals"""
+        return np.ascontiguousarray(normal_matrix_many(self.data), dtype=np.float32)
+
+    def transform_points(self, points):
+        """Returns points (w = 1) transformed by the matrices including the homogeneous division
+
+        Args:
+            points: Vec3Array or (N,3) array, one matrix is applied to all points, N matrices one per point
+        """
+        p = Vec3Array.operand(points).reshape(-1, 3)
+        if len(self.data) == 1:
+            res = p @ self.data[0, :3, :] + self.data[0, 3, :]
+        else:
+            res = np.einsum("ij,ijk->ik", p, self.data[:, :3, :]) + self.data[:, 3, :]
+        w = res[:, 3:]
+        if np.all(w == 1):
+            return Vec3Array.wrap(np.ascontiguousarray(res[:, :3]))
+        return Vec3Array.wrap(res[:, :3] / w)
+
+    def transform_vectors(self, vectors):
+        """Returns directions (w = 0) transformed by the matrices, translation is ignored"""
+        v = Vec3Array.operand(vectors).reshape(-1, 3)
+        if len(self.data) == 1:
+            res = v @ self.data[0, :3, :3]
+        else:
+            res = np.einsum("ij,ijk->ik", v, self.data[:, :3, :3])
+        return Vec3Array.wrap(np.ascontiguousarray(res, dtype=np.float32))
+
+    def __str__(self):
+        return str(self.data)
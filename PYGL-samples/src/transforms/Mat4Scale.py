@@ -35,4 +35,5 @@ class Mat4Scale(Mat4Identity):
         self.mat[0][0] = v.x
         self.mat[1][1] = v.y
         self.mat[2][2] = v.z
+        self.changed()
         return self
\ No newline at end of file
@@ -32,4 +32,5 @@ class Mat4Transl(Mat4Identity):
         self.mat[3][0] = v.x
         self.mat[3][1] = v.y
         self.mat[3][2] = v.z
+        self.changed()
         return self
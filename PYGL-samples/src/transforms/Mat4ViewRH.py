@@ -51,3 +51,7 @@ class Mat4ViewRH(Mat4Identity):
         self.mat[1][2] = z.y
         self.mat[2][2] = z.z
         self.mat[3][2] = -e.dot(z)
+
+    def inverse(self):
+        """Returns the inverse of this view matrix, it is rigid so the rotation is only transposed"""
+        return self.inverse_rigid()
@@ -0,0 +1,108 @@
+import numpy as np
+from .Vec2D import Vec2D
+
+class Point2D:
+    """
+    2D point in homogeneous coordinates, immutable
+
+    @author PGRF FIM UHK
+    PY rewrite: Kolář Matěj
+    @version 2022-PY
+    """
+    __slots__ = ("x", "y", "w")
+
+    def __init__(self, x = 0.0, y = 0.0, w = 1.0):
+        """Creates a homogeneous point, the origin (0, 0, 1) by default"""
+        self.x = x
+        self.y = y
+        self.w = w
+
+    @staticmethod
+    def from_vec2(v:"Vec2D", w = 1.0):
+        """Creates a homogeneous point from the given vector and w"""
+        return Point2D(v.x, v.y, w)
+
+    @staticmethod
+    def from_point3(p):
+        """Creates a homogeneous 2D point from x, y and w of the given homogeneous 3D point"""
+        return Point2D(p.x, p.y, p.w)
+
+    @staticmethod
+    def from_list(l):
+        """Creates a point from 2 or 3 coordinates, w is 1 when not given"""
+        return Point2D(*l)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.w))
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.w)[index]
+
+    def __eq__(self, obj):
+        if not isinstance(obj, Point2D):
+            return NotImplemented
+        return tuple(self) == tuple(obj)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return f"Point2D({self.x}, {self.y}, {self.w})"
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(tuple(self), dtype=dtype or np.float32)
+
+    def to_array(self):
+        return [self.x, self.y, self.w]
+
+    def with_x(self, x):
+        return Point2D(x, self.y, self.w)
+
+    def with_y(self, y):
+        return Point2D(self.x, y, self.w)
+
+    def with_w(self, w):
+        return Point2D(self.x, self.y, w)
+
+    def mul_mat3(self, m):
+        """Returns the result of multiplication by the given 3x3 matrix (this point as a row vector)"""
+        x, y, w = (float(c) for c in np.asarray(self.to_array()) @ m.mat)
+        return Point2D(x, y, w)
+
+    def mul_scalar(self, d):
+        """Returns the result of element-wise multiplication by the given scalar value"""
+        return Point2D(self.x * d, self.y * d, self.w * d)
+
+    def mul(self, m):
+        """Multiplication by Mat3 or a scalar"""
+        if hasattr(m, "mat"):
+            return self.mul_mat3(m)
+        return self.mul_scalar(m)
+
+    def add(self, p):
+        """Returns the result of element-wise summation with the given homogeneous point,
+        Vec2D is added to x and y only"""
+        if isinstance(p, Vec2D):
+            return Point2D(self.x + p.x, self.y + p.y, self.w)
+        return Point2D(self.x + p.x, self.y + p.y, self.w + p.w)
+
+    def dehomog(self):
+        """Returns the affine point (x, y divided by w) as Vec2D,
+        None if the point is in infinity"""
+        if self.w == 0.0:
+            return None
+        return Vec2D(self.x / self.w, self.y / self.w)
+
+    def ignore_w(self):
+        """Returns x, y as Vec2D, the homogeneous coordinate w is ignored"""
+        return Vec2D(self.x, self.y)
+
+    def equals(self, obj):
+        """Compares this object against the specified object."""
+        return self is obj or isinstance(obj, Point2D) and tuple(self) == tuple(obj)
+
+    def __str__(self):
+        return f"({self.x:4.1f},{self.y:4.1f},{self.w:4.1f})"
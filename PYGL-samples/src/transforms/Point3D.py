@@ -0,0 +1,119 @@
+import numpy as np
+from .Vec3D import Vec3D
+
+class Point3D:
+    """
+    3D point in homogeneous coordinates, immutable
+
+    @author PGRF FIM UHK
+    PY rewrite: Kolář Matěj
+    @version 2022-PY
+    """
+    __slots__ = ("x", "y", "z", "w")
+
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0, w = 1.0):
+        """Creates a homogeneous point, the origin (0, 0, 0, 1) by default"""
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = w
+
+    @staticmethod
+    def from_vec3(v:"Vec3D", w = 1.0):
+        """Creates a homogeneous point from the given vector and w"""
+        return Point3D(v.x, v.y, v.z, w)
+
+    @staticmethod
+    def from_point2(p, z = 0.0):
+        """Creates a homogeneous 3D point from the given homogeneous 2D point and z"""
+        return Point3D(p.x, p.y, z, p.w)
+
+    @staticmethod
+    def from_list(l):
+        """Creates a point from 3 or 4 coordinates, w is 1 when not given"""
+        return Point3D(*l)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z, self.w))
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z, self.w)[index]
+
+    def __eq__(self, obj):
+        if not isinstance(obj, Point3D):
+            return NotImplemented
+        return tuple(self) == tuple(obj)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return f"Point3D({self.x}, {self.y}, {self.z}, {self.w})"
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(tuple(self), dtype=dtype or np.float32)
+
+    def to_array(self):
+        return [self.x, self.y, self.z, self.w]
+
+    def with_x(self, x):
+        return Point3D(x, self.y, self.z, self.w)
+
+    def with_y(self, y):
+        return Point3D(self.x, y, self.z, self.w)
+
+    def with_z(self, z):
+        return Point3D(self.x, self.y, z, self.w)
+
+    def with_w(self, w):
+        return Point3D(self.x, self.y, self.z, w)
+
+    def mul_mat4(self, m):
+        """Returns the result of multiplication by the given 4x4 matrix (this point as a row vector)"""
+        x, y, z, w = (float(c) for c in np.asarray(self.to_array()) @ m.mat)
+        return Point3D(x, y, z, w)
+
+    def mul_quat(self, q):
+        """Returns the result of applying the given quaternion to the affine point
+        defined by this point, None if the point is in infinity"""
+        v = self.dehomog()
+        if v is None:
+            return None
+        return Point3D.from_vec3(v.mul_quat(q))
+
+    def mul_scalar(self, d):
+        """Returns the result of element-wise multiplication by the given scalar value"""
+        return Point3D(self.x * d, self.y * d, self.z * d, self.w * d)
+
+    def mul(self, m):
+        """Multiplication by Mat4, quaternion (None for a point in infinity) or a scalar"""
+        if hasattr(m, "mat"):
+            return self.mul_mat4(m)
+        if hasattr(m, "get_ijk"):
+            return self.mul_quat(m)
+        return self.mul_scalar(m)
+
+    def add(self, p:"Point3D"):
+        """Returns the result of element-wise summation with the given homogeneous point"""
+        return Point3D(self.x + p.x, self.y + p.y, self.z + p.z, self.w + p.w)
+
+    def dehomog(self):
+        """Returns the affine point (x, y, z divided by w) as Vec3D,
+        None if the point is in infinity"""
+        if self.w == 0.0:
+            return None
+        return Vec3D(self.x / self.w, self.y / self.w, self.z / self.w)
+
+    def ignore_w(self):
+        """Returns x, y, z as Vec3D, the homogeneous coordinate w is ignored"""
+        return Vec3D(self.x, self.y, self.z)
+
+    def equals(self, obj):
+        """Compares this object against the specified object."""
+        return self is obj or isinstance(obj, Point3D) and tuple(self) == tuple(obj)
+
+    def __str__(self):
+        return f"({self.x:4.1f},{self.y:4.1f},{self.z:4.1f},{self.w:4.1f})"
@@ -0,0 +1,232 @@
+import math
+from .Vec3D import Vec3D
+from .Mat4 import Mat4
+from .Mat4Identity import Mat4Identity
+
+class Quat:
+    """A quaternion with common operations, immutable
+
+    Rotations are applied as q * v * q^-1, so q2.mul(q1) rotates by q1 first and
+    then by q2, which corresponds to q1.to_rotation_matrix().mul_mat4(q2.to_rotation_matrix()).
+    @author PGRF FIM UHK
+    rewrite PY: Matěj Kolář
+    @version 2022-PY
+    """
+    __slots__ = ("r", "i", "j", "k")
+
+    def __init__(self, r = 0.0, i = 0.0, j = 0.0, k = 0.0):
+        """Creates a quaternion with the given coordinates, zero quaternion by default"""
+        self.r = r
+        self.i = i
+        self.j = j
+        self.k = k
+
+    @staticmethod
+    def from_vec3(r, v:"Vec3D"):
+        """Creates a quaternion from r coordinate and ijk coordinates given by vector"""
+        return Quat(r, v.x, v.y, v.z)
+
+    @staticmethod
+    def from_axis_angle(angle, x, y = None, z = None):
+        """Creates a quaternion equivalent to right-handed rotation about the given axis
+
+        Args:
+            angle: rotation angle in radians
+            x: x coordinate of unit rotation axis, or the axis as Vec3D
+            y: y coordinate of unit rotation axis
+            z: z coordinate of unit rotation axis
+        """
+        if y is None and z is None:
+            x, y, z = x
+        s = math.sin(angle / 2)
+        return Quat(math.cos(angle / 2), s * x, s * y, s * z)
+
+    @staticmethod
+    def from_euler_angles(alpha, beta, gamma):
+        """Creates a quaternion equivalent to right-handed rotations about x, y and z axes
+        chained in sequence in this order, angles in radians"""
+        qi = Quat.from_axis_angle(alpha, 1, 0, 0)
+        qj = Quat.from_axis_angle(beta, 0, 1, 0)
+        qk = Quat.from_axis_angle(gamma, 0, 0, 1)
+        return qk.mul(qj).mul(qi)
+
+    @staticmethod
+    def from_rotation_matrix(m:"Mat4"):
+        """Creates a quaternion equivalent to the rotation given by 4x4 matrix (as built by to_rotation_matrix)"""
+        mat = m.mat
+        diagonal = mat[0][0] + mat[1][1] + mat[2][2]
+        if diagonal > 0.0:
+            r = 0.5 * math.sqrt(diagonal + 1)
+            return Quat(r, (mat[1][2] - mat[2][1]) / (4 * r), (mat[2][0] - mat[0][2]) / (4 * r), (mat[0][1] - mat[1][0]) / (4 * r))
+        # the biggest diagonal element gives the most precise coordinate
+        a = 0
+        if mat[1][1] > mat[0][0]:
+            a = 1
+        if mat[2][2] > mat[a][a]:
+            a = 2
+        b = (a + 1) % 3
+        c = (b + 1) % 3
+        s = 0.5 * math.sqrt(mat[a][a] - mat[b][b] - mat[c][c] + 1)
+        ijk = [0.0, 0.0, 0.0]
+        ijk[a] = s
+        ijk[b] = (mat[a][b] + mat[b][a]) / (4 * s)
+        ijk[c] = (mat[a][c] + mat[c][a]) / (4 * s)
+        return Quat((mat[b][c] - mat[c][b]) / (4 * s), *ijk)
+
+    def __iter__(self):
+        return iter((self.r, self.i, self.j, self.k))
+
+    def __mul__(self, q):
+        return self.mul(q)
+
+    def __repr__(self):
+        return f"Quat({self.r}, {self.i}, {self.j}, {self.k})"
+
+    def get_ijk(self):
+        """Returns the ijk coordinates as Vec3D"""
+        return Vec3D(self.i, self.j, self.k)
+
+    def to_array(self):
+        return [self.r, self.i, self.j, self.k]
+
+    def add(self, q):
+        return Quat(self.r + q.r, self.i + q.i, self.j + q.j, self.k + q.k)
+
+    def sub(self, q):
+        return Quat(self.r - q.r, self.i - q.i, self.j - q.j, self.k - q.k)
+
+    def mul_scal(self, a):
+        """Scalar multiplication"""
+        return Quat(a * self.r, a * self.i, a * self.j, a * self.k)
+
+    def mul(self, q):
+        """Returns the result of right side quaternion multiplication (self * q),
+        or scalar multiplication when q is a number"""
+        if not isinstance(q, Quat):
+            return self.mul_scal(q)
+        return Quat(self.r * q.r - self.i * q.i - self.j * q.j - self.k * q.k,
+                    self.r * q.i + self.i * q.r + self.j * q.k - self.k * q.j,
+                    self.r * q.j - self.i * q.k + self.j * q.r + self.k * q.i,
+                    self.r * q.k + self.i * q.j - self.j * q.i + self.k * q.r)
+
+    def mulL(self, q):
+        """Returns the result of left side quaternion multiplication (q * self)"""
+        return q.mul(self)
+
+    def conjugate(self):
+        return Quat(self.r, -self.i, -self.j, -self.k)
+
+    def inverse(self):
+        """Returns the inverse of this quaternion if it exists or a zero quaternion"""
+        norm = self.dot(self)
+        if norm > 0:
+            return Quat(self.r / norm, -self.i / norm, -self.j / norm, -self.k / norm)
+        return Quat()
+
+    def log(self):
+        """Returns logarithm of this quaternion"""
+        s = math.sqrt(self.i * self.i + self.j * self.j + self.k * self.k)
+        if s == 0:
+            if self.r > 0:
+                return Quat(math.log(self.r))
+            if self.r < 0:
+                return Quat(math.log(-self.r), 1, 0, 0)
+            # error log(0)
+            return Quat()
+        a = math.atan2(s, self.r) / s
+        return Quat(math.log(self.norm()), a * self.i, a * self.j, a * self.k)
+
+    def exp(self):
+        """Returns exponential of this quaternion"""
+        s = math.sqrt(self.i * self.i + self.j * self.j + self.k * self.k)
+        e = math.exp(self.r)
+        if s == 0:
+            return Quat(e)
+        a = e * math.sin(s) / s
+        return Quat(e * math.cos(s), a * self.i, a * self.j, a * self.k)
+
+    def opposite(self):
+        return Quat(-self.r, -self.i, -self.j, -self.k)
+
+    def norm(self):
+        return math.sqrt(self.dot(self))
+
+    def dot(self, q):
+        return self.r * q.r + self.i * q.i + self.j * q.j + self.k * q.k
+
+    def normalized(self):
+        """Returns a normalized quaternion if possible (nonzero norm), zero quaternion otherwise"""
+        norm = self.norm()
+        if norm > 0:
+            return Quat(self.r / norm, self.i / norm, self.j / norm, self.k / norm)
+        return Quat()
+
+    def rotate(self, v:"Vec3D"):
+        """Returns the given vector rotated by this unit quaternion"""
+        # v + 2r (ijk x v) + 2 ijk x (ijk x v)
+        tx = 2 * (self.j * v.z - self.k * v.y)
+        ty = 2 * (self.k * v.x - self.i * v.z)
+        tz = 2 * (self.i * v.y - self.j * v.x)
+        return Vec3D(v.x + self.r * tx + self.j * tz - self.k * ty,
+                     v.y + self.r * ty + self.k * tx - self.i * tz,
+                     v.z + self.r * tz + self.i * ty - self.j * tx)
+
+    def to_rotation_matrix(self):
+        """Creates a 4x4 transformation matrix equivalent to rotation defined by this quaternion"""
+        q = self.normalized()
+        r, i, j, k = q.r, q.i, q.j, q.k
+        res = Mat4Identity()
+        res.mat[0][0] = 1 - 2 * (j * j + k * k)
+        res.mat[1][0] = 2 * (i * j - r * k)
+        res.mat[2][0] = 2 * (r * j + i * k)
+
+        res.mat[0][1] = 2 * (i * j + r * k)
+        res.mat[1][1] = 1 - 2 * (i * i + k * k)
+        res.mat[2][1] = 2 * (k * j - i * r)
+
+        res.mat[0][2] = 2 * (i * k - r * j)
+        res.mat[1][2] = 2 * (k * j + i * r)
+        res.mat[2][2] = 1 - 2 * (i * i + j * j)
+        return res
+
+    def to_axis_angle(self):
+        """Returns rotation as tuple (angle, x, y, z) with unit axis"""
+        angle = 2 * math.acos(max(-1.0, min(self.r, 1.0)))
+        s = math.sqrt(self.i * self.i + self.j * self.j + self.k * self.k)
+        if s < 0.0001:
+            return (angle, 1.0, 0.0, 0.0)
+        return (angle, self.i / s, self.j / s, self.k / s)
+
+    def lerp(self, q, t):
+        """Linear interpolation between this and the given quaternion, t in <0;1>"""
+        if t >= 1:
+            return Quat(*q)
+        if t <= 0:
+            return Quat(*self)
+        return self.mul_scal(1 - t).add(q.mul_scal(t))
+
+    def slerp(self, q, t):
+        """Spherical interpolation between this and the given unit quaternion along
+        the shorter arc, t in <0;1>"""
+        if t <= 0:
+            return Quat(*self)
+        if t >= 1:
+            return Quat(*q)
+        c = self.dot(q)
+        if c < 0:
+            # q and -q are the same rotation
+            q = q.opposite()
+            c = -c
+        if c > 0.9995:
+            # nearly identical, sin of the angle is too small to divide by
+            return self.lerp(q, t).normalized()
+        angle = math.acos(c)
+        s = 1 / math.sin(angle)
+        return self.mul_scal(math.sin((1 - t) * angle) * s).add(q.mul_scal(math.sin(t * angle) * s))
+
+    def equals(self, obj):
+        """Compares this object against the specified object."""
+        return self is obj or isinstance(obj, Quat) and tuple(self) == tuple(obj)
+
+    def __str__(self):
+        return f"({self.r:4.1f},{self.i:4.1f},{self.j:4.1f},{self.k:4.1f})"
@@ -0,0 +1,154 @@
+import numpy as np
+from .Quat import Quat
+from .Vec3Array import Vec3Array
+from .Mat4Array import Mat4Array
+
+class QuatArray:
+    """Array of quaternions stored as contiguous (N,4) float32 array in order r, i, j, k,
+    operations are evaluated for all quaternions at once, immutable
+
+    Same conventions as Quat, a single Quat operand is applied to all quaternions.
+    """
+
+    def __init__(self, data = None):
+        """Creates an array of quaternions
+
+        Args:
+            data (optional): (N,4) array-like, list of Quat or number of identity quaternions. Defaults to empty array.
+        """
+        if data is None:
+            data = np.zeros((0, 4), dtype=np.float32)
+        elif isinstance(data, int):
+            data = np.zeros((data, 4), dtype=np.float32)
+            data[:, 0] = 1
+        elif len(data) > 0 and isinstance(data[0], Quat):
+            data = [q.to_array() for q in data]
+        self.data = np.ascontiguousarray(np.asarray(data, dtype=np.float32).reshape(-1, 4))
+
+    @staticmethod
+    def wrap(data):
+        """Creates QuatArray around a float32 (N,4) array without copying"""
+        res = QuatArray.__new__(QuatArray)
+        res.data = data
+        return res
+
+    @staticmethod
+    def operand(q):
+        """Returns operand as array broadcastable to (N,4)"""
+        if isinstance(q, QuatArray):
+            return q.data
+        if isinstance(q, Quat):
+            return np.array(q.to_array(), dtype=np.float32)
+        return np.asarray(q, dtype=np.float32)
+
+    @staticmethod
+    def from_axis_angle(axes, angles):
+        """Creates quaternions of right-handed rotations about unit axes ((N,3) or Vec3Array) by angles ((N,) radians)"""
+        axes = Vec3Array.operand(axes).reshape(-1, 3)
+        half = np.asarray(angles, dtype=np.float32) / 2
+        res = np.empty((max(len(axes), half.size), 4), dtype=np.float32)
+        res[:, 0] = np.cos(half)
+        res[:, 1:] = axes * np.sin(half).reshape(-1, 1)
+        return QuatArray.wrap(res)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """Returns quaternion at the given index as Quat, or QuatArray for slices and index arrays"""
+        if isinstance(index, (int, np.integer)):
+            return Quat(*(float(c) for c in self.data[index]))
+        return QuatArray.wrap(np.ascontiguousarray(self.data[index]))
+
+    def to_array(self):
+        """Returns the underlying (N,4) float32 array"""
+        return self.data
+
+    def mul(self, q):
+        """Returns the result of right side quaternion multiplication (self * q)"""
+        a = self.data
+        b = np.broadcast_to(QuatArray.operand(q), a.shape)
+        ar, ai, aj, ak = a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+        br, bi, bj, bk = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+        res = np.empty(a.shape, dtype=np.float32)
+        res[:, 0] = ar * br - ai * bi - aj * bj - ak * bk
+        res[:, 1] = ar * bi + ai * br + aj * bk - ak * bj
+        res[:, 2] = ar * bj - ai * bk + aj * br + ak * bi
+        res[:, 3] = ar * bk + ai * bj - aj * bi + ak * br
+        return QuatArray.wrap(res)
+
+    def conjugate(self):
+        return QuatArray.wrap(self.data * np.array([1, -1, -1, -1], dtype=np.float32))
+
+    def dot(self, q):
+        """Returns (N,) array of dot-products with the given quaternions"""
+        return np.einsum("ij,ij->i", self.data, np.broadcast_to(QuatArray.operand(q), self.data.shape))
+
+    def norm(self):
+        return np.sqrt(self.dot(self.data))
+
+    def normalized(self):
+        """Returns normalized quaternions, zero quaternions stay zero"""
+        norm = self.norm()
+        norm[norm == 0] = 1
+        return QuatArray.wrap(self.data / norm[:, None])
+
+    def inverse(self):
+        """Returns the inverses, zero quaternions stay zero"""
+        norm = self.dot(self.data)
+        norm[norm == 0] = 1
+        return QuatArray.wrap(self.conjugate().data / norm[:, None])
+
+    def slerp(self, q, t):
+        """Spherical interpolation to the given unit quaternions along the shorter arc
+
+        Args:
+            q: QuatArray, Quat or (N,4) array
+            t: interpolation parameter in <0;1>, number or (N,) array
+        """
+        a = self.data
+        b = np.array(np.broadcast_to(QuatArray.operand(q), a.shape))
+        t = np.clip(np.asarray(t, dtype=np.float32), 0, 1).reshape(-1, 1)
+        c = np.einsum("ij,ij->i", a, b)
+        # q and -q are the same rotation, take the shorter arc
+        b[c < 0] *= -1
+        c = np.abs(c)[:, None]
+        angle = np.arccos(np.minimum(c, 1))
+        s = np.sin(angle)
+        # nearly identical quaternions are interpolated linearly
+        near = s < 1e-4
+        s[near] = 1
+        wa = np.where(near, 1 - t, np.sin((1 - t) * angle) / s)
+        wb = np.where(near, t, np.sin(t * angle) / s)
+        res = wa * a + wb * b
+        return QuatArray.wrap(res.astype(np.float32, copy=False)).normalized()
+
+    def rotate(self, vectors):
+        """Returns vectors rotated by the unit quaternions, one quaternion for all vectors or one per vector"""
+        v = Vec3Array.operand(vectors).reshape(-1, 3)
+        r = self.data[:, :1]
+        ijk = self.data[:, 1:]
+        t = 2 * np.cross(ijk, v)
+        return Vec3Array.wrap((v + r * t + np.cross(ijk, t)).astype(np.float32, copy=False))
+
+    def to_matrix(self):
+        """Returns Mat4Array of rotation matrices, same layout as Quat.to_rotation_matrix"""
+        q = self.normalized().data
+        r, i, j, k = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+        res = Mat4Array(len(q))
+        m = res.data
+        m[:, 0, 0] = 1 - 2 * (j * j + k * k)
+        m[:, 1, 0] = 2 * (i * j - r * k)
+        m[:, 2, 0] = 2 * (r * j + i * k)
+
+        m[:, 0, 1] = 2 * (i * j + r * k)
+        m[:, 1, 1] = 1 - 2 * (i * i + k * k)
+        m[:, 2, 1] = 2 * (k * j - i * r)
+
+        m[:, 0, 2] = 2 * (i * k - r * j)
+        m[:, 1, 2] = 2 * (k * j + i * r)
+        m[:, 2, 2] = 1 - 2 * (i * i + j * j)
+        return res
+
+    def __str__(self):
+        return str(self.data)
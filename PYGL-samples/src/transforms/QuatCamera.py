@@ -0,0 +1,158 @@
+# ##
+# Virtual camera with orientation kept as a unit quaternion, same interface as
+# Camera. Turning the camera multiplies the orientation by a small rotation
+# instead of recomputing the whole basis from azimuth and zenith, the view
+# matrix is built directly from the quaternion. In the free mode azimuth turns
+# about the camera up axis and zenith is not limited, so the camera can look
+# in any direction without gimbal lock (add_roll tilts it about the view
+# vector). Objects of the class are immutable.
+# #
+import math
+from .Vec3D import Vec3D
+from .Mat4 import Mat4
+from .Quat import Quat
+
+class QuatCamera:
+    def __init__(self, pos = (0,0,0), azimuth = 0, zenith = 0, radius = 1, first_person = True, orientation = None, free = False):
+        """Creates a camera with the given parameters
+
+        Args:
+            pos (tuple, optional): observer position. Defaults to (0, 0, 0).
+            azimuth (int, optional): angle (in radians) between the view vector projected to xy plane and x-axis. Defaults to 0.
+            zenith (int, optional): angle (in radians) between the view vector and xy plane. Defaults to 0.
+            radius (int, optional): distance between the eye (camera origin) and the observer position in the 3rd person camera mode. Defaults to 1.
+            first_person (bool, optional): boolean flag indicating 1st (true)/3rd (false) person camera mode. Defaults to True.
+            orientation (Quat, optional): unit quaternion rotating x-axis to the view vector and z-axis to the up vector,
+                   computed from azimuth and zenith when not given.
+            free (bool, optional): free mode, turns are relative to the camera axes and zenith is not limited. Defaults to False.
+        """
+        if isinstance(pos, Vec3D):
+            self.pos = Vec3D().from_vec3(pos)
+        else:
+            self.pos = Vec3D().from_list(pos)
+        self.azimuth = azimuth
+        self.zenith = zenith
+        self.radius = radius
+        self.first_person = first_person
+        self.free = free
+        if orientation is None:
+            orientation = Quat.from_axis_angle(azimuth, 0, 0, 1).mul(Quat.from_axis_angle(-zenith, 0, 1, 0))
+        self.orientation = orientation
+
+        # rows of the rotation matrix are the rotated x, y and z axes
+        q = orientation
+        r, i, j, k = q.r, q.i, q.j, q.k
+        self.view_vector = Vec3D(1 - 2 * (j * j + k * k), 2 * (i * j + r * k), 2 * (i * k - r * j))
+        left = Vec3D(2 * (i * j - r * k), 1 - 2 * (i * i + k * k), 2 * (k * j + i * r))
+        self.up_vector = Vec3D(2 * (r * j + i * k), 2 * (k * j - i * r), 1 - 2 * (i * i + j * j))
+        self.right_vector = left.opposite()
+
+        eye = self.pos if first_person else self.pos.add(self.view_vector.mul_scal(-radius))
+        # same matrix as Mat4ViewRH(eye, view_vector, up_vector), the basis is already orthonormal
+        x = self.right_vector
+        y = self.up_vector
+        z = self.view_vector.opposite()
+        self.view = Mat4().from_raw_rows(
+                (x.x, y.x, z.x, 0),
+                (x.y, y.y, z.y, 0),
+                (x.z, y.z, z.z, 0),
+                (-eye.dot(x), -eye.dot(y), -eye.dot(z), 1))
+
+    def copy_with(self, pos = None, orientation = None, azimuth = None, zenith = None, radius = None, first_person = None):
+        return QuatCamera(self.pos if pos is None else pos,
+                self.azimuth if azimuth is None else azimuth,
+                self.zenith if zenith is None else zenith,
+                self.radius if radius is None else radius,
+                self.first_person if first_person is None else first_person,
+                self.orientation if orientation is None else orientation.normalized(),
+                self.free)
+
+    def add_azimuth(self, ang):
+        """Returns a new camera turned left by the given angle (in radians), about z-axis,
+            or about the camera up vector in the free mode
+        """
+        turn = Quat.from_axis_angle(ang, 0, 0, 1)
+        orientation = self.orientation.mul(turn) if self.free else turn.mul(self.orientation)
+        return self.copy_with(orientation = orientation, azimuth = self.azimuth + ang)
+
+    def add_zenith(self, ang):
+        """Returns a new camera turned up by the given angle (in radians) about its right vector.
+            Zenith is kept in [-pi/2, pi/2] unless in the free mode
+        """
+        zenith = self.zenith + ang
+        if not self.free:
+            zenith = max(-math.pi / 2, min(zenith, math.pi / 2))
+        orientation = self.orientation.mul(Quat.from_axis_angle(self.zenith - zenith, 0, 1, 0))
+        return self.copy_with(orientation = orientation, zenith = zenith)
+
+    def add_roll(self, ang):
+        """Returns a new camera rotated by the given angle (in radians) about its view vector"""
+        return self.copy_with(orientation = self.orientation.mul(Quat.from_axis_angle(ang, 1, 0, 0)))
+
+    def add_radius(self, dist):
+        """Returns a new camera with radius summed with the given value. Radius is kept >= 0.1"""
+        return self.copy_with(radius = max(self.radius + dist, 0.1))
+
+    def mul_radius(self, scale):
+        """Returns a new camera with radius multiplied by the given coefficient. Radius is kept >= 0.1"""
+        return self.copy_with(radius = max(self.radius * scale, 0.1))
+
+    def forward(self, speed):
+        """Returns a new camera moved in the direction of the view vector by the given distance"""
+        return self.copy_with(pos = self.pos.add(self.view_vector.mul_scal(speed)))
+
+    def backward(self, speed):
+        return self.forward(-speed)
+
+    def right(self, speed):
+        """Returns a new camera moved to the right from the observer's perspective by the given distance"""
+        return self.copy_with(pos = self.pos.add(self.right_vector.mul_scal(speed)))
+
+    def left(self, speed):
+        return self.right(-speed)
+
+    def up(self, speed):
+        """Returns a new camera moved in the direction of z-axis, or of the camera up vector
+            in the free mode, by the given distance
+        """
+        direction = self.up_vector if self.free else Vec3D(0, 0, 1)
+        return self.copy_with(pos = self.pos.add(direction.mul_scal(speed)))
+
+    def down(self, speed):
+        return self.up(-speed)
+
+    def move(self, dir):
+        """Returns a new camera moved by the given vector"""
+        return self.copy_with(pos = self.pos.add(dir))
+
+    def with_azimuth(self, ang):
+        """Returns a new camera with azimuth set to the given value, roll is discarded"""
+        return QuatCamera(self.pos, ang, self.zenith, self.radius, self.first_person, None, self.free)
+
+    def with_zenith(self, ang):
+        """Returns a new camera with zenith set to the given value, roll is discarded"""
+        return QuatCamera(self.pos, self.azimuth, ang, self.radius, self.first_person, None, self.free)
+
+    def with_first_person(self, first_person):
+        return self.copy_with(first_person = first_person)
+
+    def with_position(self, pos):
+        return self.copy_with(pos = pos)
+
+    def with_radius(self, radius):
+        return self.copy_with(radius = radius)
+
+    def with_orientation(self, orientation):
+        """Returns a new camera with orientation set to the given quaternion"""
+        return self.copy_with(orientation = orientation)
+
+    def slerp(self, camera, t):
+        """Returns a camera between this and the given camera, orientation is interpolated spherically"""
+        pos = self.pos.add(camera.pos.sub(self.pos).mul_scal(t))
+        return self.copy_with(pos = pos, orientation = self.orientation.slerp(camera.orientation, t),
+                azimuth = self.azimuth + (camera.azimuth - self.azimuth) * t,
+                zenith = self.zenith + (camera.zenith - self.zenith) * t,
+                radius = self.radius + (camera.radius - self.radius) * t)
+
+    def to_string(self):
+        return f"QuatCamera()\n .withFirst_person({self.first_person})\n .withPosition({self.pos})\n .with_orientation({self.orientation})\n.withRadius({self.radius})"
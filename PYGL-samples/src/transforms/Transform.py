@@ -0,0 +1,155 @@
+import math
+import numpy as np
+from .Mat4 import Mat4
+
+STEP_SCALE = 0
+STEP_TRANSLATE = 1
+STEP_ROTATE = 2
+STEP_MATRIX = 3
+
+# columns mixed by rotation about x, y and z axis, same orientation as Mat4RotX/Y/Z
+ROTATION_AXES = {"x": (1, 2), "y": (2, 0), "z": (0, 1)}
+
+class Transform:
+    """Lazily evaluated chain of transformations
+
+    Steps are only recorded, they are folded into one 4x4 matrix when the result
+    is read and the matrix is kept until the recorded steps change. Steps follow the
+    Mat4 convention: Transform().scale(2).translate(1, 0, 0) equals
+    Mat4Scale(2).mul_mat4(Mat4Transl(1, 0, 0)). A Transform can be used as a step
+    of another one, e.g. a constant projection * aspect scale sub-chain, and it is
+    then folded again only when it changes.
+
+    The usual pattern is to keep the Transform and record it again every frame:
+        self.model.reset().scale(s).rotate_z(angle).translate(x, y, 0)
+    unchanged steps reuse the cached matrix.
+    """
+
+    def __init__(self):
+        self.steps = []
+        self.folded = None
+        self.cache = None
+        self.gl_cache = None
+
+    def reset(self):
+        """Removes all steps, the cached matrix is kept for comparison with the new steps"""
+        self.steps = []
+        return self
+
+    def scale(self, x, y = None, z = None):
+        if y is None and z is None:
+            y = x
+            z = x
+        self.steps.append((STEP_SCALE, x, y, z))
+        return self
+
+    def translate(self, x, y = None, z = None):
+        if y is None and z is None:
+            y = x
+            z = x
+        self.steps.append((STEP_TRANSLATE, x, y, z))
+        return self
+
+    def rotate_x(self, alpha):
+        """Right-handed rotation about x-axis, angle in radians"""
+        self.steps.append((STEP_ROTATE, "x", alpha))
+        return self
+
+    def rotate_y(self, alpha):
+        """Right-handed rotation about y-axis, angle in radians"""
+        self.steps.append((STEP_ROTATE, "y", alpha))
+        return self
+
+    def rotate_z(self, alpha):
+        """Right-handed rotation about z-axis, angle in radians"""
+        self.steps.append((STEP_ROTATE, "z", alpha))
+        return self
+
+    def mul(self, m):
+        """Multiplication by Mat4, 4x4 array or another Transform"""
+        self.steps.append((STEP_MATRIX, m))
+        return self
+
+    def view(self, camera):
+        """View transformation given by Camera or its view matrix"""
+        return self.mul(camera.view if hasattr(camera, "view") and not isinstance(camera, Transform) else camera)
+
+    def projection(self, proj):
+        """Projection given by Mat4 (e.g. Mat4PerspRH)"""
+        return self.mul(proj)
+
+    @staticmethod
+    def resolve(m):
+        if isinstance(m, Transform):
+            return m.to_array()
+        if isinstance(m, Mat4):
+            return m.mat
+        return np.asarray(m)
+
+    @staticmethod
+    def same_steps(steps, folded):
+        if folded is None or len(steps) != len(folded):
+            return False
+        for step, old in zip(steps, folded):
+            if step[0] != old[0]:
+                return False
+            if step[0] == STEP_MATRIX:
+                # Mat4 setters change the array in place, so the values are compared
+                if not np.array_equal(step[1], old[1]):
+                    return False
+            elif step != old:
+                return False
+        return True
+
+    def to_array(self):
+        """Returns the folded 4x4 matrix, the array is shared and must not be modified"""
+        steps = [(STEP_MATRIX, Transform.resolve(step[1])) if step[0] == STEP_MATRIX else step for step in self.steps]
+        if self.cache is not None and Transform.same_steps(steps, self.folded):
+            return self.cache
+
+        # primitive steps are folded on plain floats, numpy is used only for matrix steps
+        res = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+        for step in steps:
+            kind = step[0]
+            if kind == STEP_MATRIX:
+                res = (np.array(res) @ step[1]).tolist()
+            elif kind == STEP_SCALE:
+                _, x, y, z = step
+                for row in res:
+                    row[0] *= x
+                    row[1] *= y
+                    row[2] *= z
+            elif kind == STEP_TRANSLATE:
+                _, x, y, z = step
+                for row in res:
+                    w = row[3]
+                    row[0] += w * x
+                    row[1] += w * y
+                    row[2] += w * z
+            else:
+                a, b = ROTATION_AXES[step[1]]
+                c = math.cos(step[2])
+                s = math.sin(step[2])
+                for row in res:
+                    ra = row[a]
+                    rb = row[b]
+                    row[a] = ra * c - rb * s
+                    row[b] = ra * s + rb * c
+        res = np.array(res)
+
+        self.cache = res
+        # copies of the matrices, the originals may be modified later
+        self.folded = [(STEP_MATRIX, np.array(step[1])) if step[0] == STEP_MATRIX else step for step in steps]
+        self.gl_cache = None
+        return res
+
+    def to_mat4(self):
+        """Returns the folded matrix as Mat4 sharing the cached array"""
+        return Mat4.wrap(self.to_array())
+
+    def to_gl_array(self):
+        """Returns the folded matrix as contiguous float32 array for glUniformMatrix4fv"""
+        res = self.to_array()
+        if self.gl_cache is None:
+            self.gl_cache = np.ascontiguousarray(res, dtype=np.float32)
+        return self.gl_cache
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
  
 class Vec2D:
@@ -7,6 +8,7 @@ class Vec2D:
         PY rewrite: Kolář Matěj
         @version 2022-PY
     """
+    __slots__ = ("x", "y")
     
     def __init__(self,x = None, y = None):
         """Creates a 2D vector"""
@@ -23,6 +25,81 @@ class Vec2D:
     def __iter__(self):
         return iter((self.x, self.y))
 
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __add__(self, v):
+        return Vec2D(self.x + v.x, self.y + v.y)
+
+    def __sub__(self, v):
+        return Vec2D(self.x - v.x, self.y - v.y)
+
+    def __mul__(self, d):
+        """Scalar multiplication, or element-wise multiplication by Vec2D"""
+        if isinstance(d, Vec2D):
+            return Vec2D(self.x * d.x, self.y * d.y)
+        return Vec2D(self.x * d, self.y * d)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, d):
+        return Vec2D(self.x / d, self.y / d)
+
+    def __neg__(self):
+        return Vec2D(-self.x, -self.y)
+
+    def __abs__(self):
+        return self.length()
+
+    def __eq__(self, obj):
+        if not isinstance(obj, Vec2D):
+            return NotImplemented
+        return self.x == obj.x and self.y == obj.y
+
+    # mutable through the in-place operations, not hashable
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Vec2D({self.x}, {self.y})"
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array((self.x, self.y), dtype=dtype or np.float32)
+
+    def to_buffer(self):
+        """Returns components as float32 array, can be passed directly to glUniform2fv"""
+        return np.array((self.x, self.y), dtype=np.float32)
+
+    def set(self, x, y):
+        """Sets components in place"""
+        self.x = x
+        self.y = y
+        return self
+
+    def iadd(self, v):
+        """Adds the given vector in place"""
+        self.x += v.x
+        self.y += v.y
+        return self
+
+    __iadd__ = iadd
+
+    def isub(self, v):
+        """Subtracts the given vector in place"""
+        self.x -= v.x
+        self.y -= v.y
+        return self
+
+    __isub__ = isub
+
+    def imul_scalar(self, d):
+        """Scalar multiplication in place"""
+        self.x *= d
+        self.y *= d
+        return self
+
     def from_vec2d(self, v):
         """Creates a vector by cloning the give one"""
         self.x = v.x
@@ -75,4 +152,4 @@ class Vec2D:
     
     def equals(self, obj):
         """Compares this object against the specified object."""
-        return self == obj or obj != None and isinstance(obj,Vec2D) and self.x == obj.x and self.y == obj.y
\ No newline at end of file
+        return self is obj or obj is not None and isinstance(obj,Vec2D) and self.x == obj.x and self.y == obj.y
\ No newline at end of file
@@ -0,0 +1,108 @@
+import numpy as np
+from .Vec3D import Vec3D
+
+class Vec3Array:
+    """Array of 3D vectors stored as contiguous (N,3) float32 array,
+    operations are evaluated for all vectors at once, immutable
+
+    Operands of binary operations can be Vec3Array, Vec3D (applied to all
+    vectors) or anything numpy can broadcast to (N,3).
+    """
+
+    def __init__(self, data = None):
+        """Creates an array of vectors
+
+        Args:
+            data (optional): (N,3) array-like, list of Vec3D or number of zero vectors. Defaults to empty array.
+        """
+        if data is None:
+            data = np.zeros((0, 3), dtype=np.float32)
+        elif isinstance(data, int):
+            data = np.zeros((data, 3), dtype=np.float32)
+        elif len(data) > 0 and isinstance(data[0], Vec3D):
+            data = [v.to_array() for v in data]
+        self.data = np.ascontiguousarray(np.asarray(data, dtype=np.float32).reshape(-1, 3))
+
+    @staticmethod
+    def operand(v):
+        """Returns operand as array broadcastable to (N,3)"""
+        if isinstance(v, Vec3Array):
+            return v.data
+        if isinstance(v, Vec3D):
+            return np.array(v.to_array(), dtype=np.float32)
+        return np.asarray(v, dtype=np.float32)
+
+    @staticmethod
+    def wrap(data):
+        """Creates Vec3Array around a float32 (N,3) array without copying"""
+        res = Vec3Array.__new__(Vec3Array)
+        res.data = data
+        return res
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """Returns vector at the given index as Vec3D, or Vec3Array for slices and index arrays"""
+        if isinstance(index, (int, np.integer)):
+            return Vec3D(*(float(c) for c in self.data[index]))
+        return Vec3Array.wrap(np.ascontiguousarray(self.data[index]))
+
+    def __iter__(self):
+        return (Vec3D(*v) for v in self.data.tolist())
+
+    def to_array(self):
+        """Returns the underlying (N,3) float32 array"""
+        return self.data
+
+    def add(self, v):
+        return Vec3Array.wrap(self.data + Vec3Array.operand(v))
+
+    def sub(self, v):
+        return Vec3Array.wrap(self.data - Vec3Array.operand(v))
+
+    def mul_scal(self, d):
+        """Scalar multiplication, d is a number or (N,) array with a scalar per vector"""
+        d = np.asarray(d, dtype=np.float32)
+        if d.ndim == 1:
+            d = d[:, None]
+        return Vec3Array.wrap(self.data * d)
+
+    def mul_vec(self, v):
+        """Returns the result of element-wise multiplication with the given vectors"""
+        return Vec3Array.wrap(self.data * Vec3Array.operand(v))
+
+    def dot(self, v):
+        """Returns (N,) array of dot-products with the given vectors"""
+        return np.einsum("ij,ij->i", self.data, np.broadcast_to(Vec3Array.operand(v), self.data.shape))
+
+    def cross(self, v):
+        """Returns the result of right-handed cross-product with the given vectors"""
+        return Vec3Array.wrap(np.cross(self.data, Vec3Array.operand(v)).astype(np.float32, copy=False))
+
+    def length(self):
+        """Returns (N,) array of vector lengths"""
+        return np.sqrt(self.dot(self.data))
+
+    def normalized(self):
+        """Returns collinear unit vectors, zero vectors stay zero"""
+        length = self.length()
+        length[length == 0] = 1
+        return Vec3Array.wrap(self.data / length[:, None])
+
+    def opposite(self):
+        return Vec3Array.wrap(-self.data)
+
+    def mul_mat4(self, m):
+        """Returns points transformed by the given 4x4 matrix (Mat4) or matrices (Mat4Array, one per point)
+        including the homogeneous division"""
+        from .Mat4Array import Mat4Array
+        return Mat4Array.operand_array(m).transform_points(self)
+
+    def mul_mat4_dir(self, m):
+        """Returns directions (w = 0) transformed by the given 4x4 matrix or matrices"""
+        from .Mat4Array import Mat4Array
+        return Mat4Array.operand_array(m).transform_vectors(self)
+
+    def __str__(self):
+        return str(self.data)
@@ -1,5 +1,6 @@
 import math
-from . import Vec2D
+import numpy as np
+from .Vec2D import Vec2D
 
 class Vec3D:
     """
@@ -10,6 +11,7 @@ class Vec3D:
     PY rewrite: Kolář Matěj
     @version 2022-PY
     """
+    __slots__ = ("x", "y", "z")
 
     def __init__(self, x=None, y=None, z=None):
         """Creates a 3D vector"""
@@ -29,6 +31,92 @@ class Vec3D:
             
     def __iter__(self):
         return iter((self.x, self.y, self.z))
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __add__(self, v):
+        return Vec3D(self.x + v.x, self.y + v.y, self.z + v.z)
+
+    def __sub__(self, v):
+        return Vec3D(self.x - v.x, self.y - v.y, self.z - v.z)
+
+    def __mul__(self, d):
+        """Scalar multiplication, or element-wise multiplication by Vec3D"""
+        if isinstance(d, Vec3D):
+            return Vec3D(self.x * d.x, self.y * d.y, self.z * d.z)
+        return Vec3D(self.x * d, self.y * d, self.z * d)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, d):
+        return Vec3D(self.x / d, self.y / d, self.z / d)
+
+    def __neg__(self):
+        return Vec3D(-self.x, -self.y, -self.z)
+
+    def __abs__(self):
+        return self.length()
+
+    def __eq__(self, obj):
+        if not isinstance(obj, Vec3D):
+            return NotImplemented
+        return self.x == obj.x and self.y == obj.y and self.z == obj.z
+
+    # mutable through the in-place operations, not hashable
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Vec3D({self.x}, {self.y}, {self.z})"
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array((self.x, self.y, self.z), dtype=dtype or np.float32)
+
+    def to_buffer(self):
+        """Returns components as float32 array, can be passed directly to glUniform3fv"""
+        return np.array((self.x, self.y, self.z), dtype=np.float32)
+
+    def set(self, x, y, z):
+        """Sets components in place"""
+        self.x = x
+        self.y = y
+        self.z = z
+        return self
+
+    def iadd(self, v):
+        """Adds the given vector in place"""
+        self.x += v.x
+        self.y += v.y
+        self.z += v.z
+        return self
+
+    __iadd__ = iadd
+
+    def isub(self, v):
+        """Subtracts the given vector in place"""
+        self.x -= v.x
+        self.y -= v.y
+        self.z -= v.z
+        return self
+
+    __isub__ = isub
+
+    def imul_scal(self, d):
+        """Scalar multiplication in place"""
+        self.x *= d
+        self.y *= d
+        self.z *= d
+        return self
+
+    def inormalize(self):
+        """Normalizes this vector in place, zero vector stays zero"""
+        len = self.length()
+        if len != 0.0:
+            self.imul_scal(1 / len)
+        return self
         
     def from_vec3(self, vec3):
         self.x = vec3.x
@@ -71,8 +159,8 @@ class Vec3D:
         """Returns the result of applying the given quaternion to this vector"""
         #final Quat p = q.mulR(new Quat(0, x, y, z)).mulR(q.inverse());
         #return new Vec3D(p.i, p.j, p.k);
-        t = q.getIJK().mul(2).cross(self)
-        return self.add(t.mul(q.getR())).add(q.getIJK().cross(t))
+        t = q.get_ijk().mul_scal(2).cross(self)
+        return self.add(t.mul_scal(q.r)).add(q.get_ijk().cross(t))
 
     def mul_vec(self, v):
         """Returns the result of element-wise multiplication with the given vector"""
@@ -106,4 +194,4 @@ class Vec3D:
 
     def equals(self, obj):
         """Compares this object against the specified object."""
-        return self == obj or obj != None and isinstance(obj,Vec3D) and self.x == obj.x and self.y == obj.y and self.z == obj.z
\ No newline at end of file
+        return self is obj or obj is not None and isinstance(obj,Vec3D) and self.x == obj.x and self.y == obj.y and self.z == obj.z
\ No newline at end of file
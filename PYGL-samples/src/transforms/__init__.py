@@ -11,4 +11,29 @@ from .Mat4RotX import Mat4RotX
 from .Mat4RotY import Mat4RotY
 from .Mat4RotZ import Mat4RotZ
 from .Mat4RotXYZ import Mat4RotXYZ
-from .Mat4Rot import Mat4Rot
\ No newline at end of file
+from .Mat4Rot import Mat4Rot
+from .Vec3Array import Vec3Array
+from .Mat4Array import Mat4Array
+from .Transform import Transform
+from .Quat import Quat
+from .QuatArray import QuatArray
+from .QuatCamera import QuatCamera
+from .CameraController import CameraController
+from .Mat3 import Mat3
+from .Mat3Identity import Mat3Identity
+from .Mat3Rot2D import Mat3Rot2D
+from .Mat3RotX import Mat3RotX
+from .Mat3RotY import Mat3RotY
+from .Mat3RotZ import Mat3RotZ
+from .Mat3Scale2D import Mat3Scale2D
+from .Mat3Transl2D import Mat3Transl2D
+from .Point2D import Point2D
+from .Point3D import Point3D
+from .Cubic import Cubic
+from .Bicubic import Bicubic
+from .Col import Col
+from .ColArray import ColArray
+from .AABB import AABB
+from .BoundingSphere import BoundingSphere
+from .Frustum import Frustum
+from .BVH import BVH